@@ -0,0 +1,127 @@
+"""Compare adding geolocation entities one by one against a single batch.
+
+Run from the repository root with Home Assistant and
+pytest-homeassistant-custom-component installed:
+
+    python benchmarks/bench_entity_add.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from homeassistant.helpers.entity_platform import EntityPlatform  # noqa: E402
+from pytest_homeassistant_custom_component.common import (  # noqa: E402
+    async_test_home_assistant,
+)
+
+from custom_components.ingv_centro_nazionale_terremoti.const import (  # noqa: E402
+    DOMAIN,
+)
+from custom_components.ingv_centro_nazionale_terremoti.geo_location import (  # noqa: E402
+    IngvGeolocationEvent,
+)
+from custom_components.ingv_centro_nazionale_terremoti.parser import (  # noqa: E402
+    IngvEvent,
+)
+
+EVENTS = 1_000
+
+
+class StandInCoordinator:
+    """Coordinator stand-in holding a fixed set of events."""
+
+    last_update_success = True
+
+    def __init__(self, count: int) -> None:
+        """Create synthetic events."""
+        now = datetime.now(timezone.utc)
+        self.events = {
+            str(index): IngvEvent(
+                event_id=str(index),
+                latitude=42.0,
+                longitude=13.0,
+                depth=10.0,
+                magnitude=3.5,
+                time=now - timedelta(minutes=index),
+                status="reviewed",
+                mode="manual",
+                region="Synthetic (XX)",
+                distance=12.3,
+            )
+            for index in range(count)
+        }
+
+    def async_add_entity(self, event_id, entity):
+        """Accept an entity."""
+        return lambda: None
+
+    def async_index_entity(self, event_id, entity_id):
+        """Ignore indexing."""
+
+    def get_entry(self, event_id):
+        """Return an event."""
+        return self.events.get(event_id)
+
+    def entry_available(self, event_id):
+        """Return whether an event exists."""
+        return event_id in self.events
+
+
+def _platform(hass) -> EntityPlatform:
+    """Return a fresh geo_location platform for this integration."""
+    return EntityPlatform(
+        hass=hass,
+        logger=logging.getLogger(__name__),
+        domain="geo_location",
+        platform_name=DOMAIN,
+        platform=None,
+        scan_interval=timedelta(seconds=30),
+        entity_namespace=None,
+    )
+
+
+def _entities(coordinator: StandInCoordinator, prefix: str) -> list:
+    """Create one entity per event."""
+    return [
+        IngvGeolocationEvent(coordinator, prefix, event_id)
+        for event_id in coordinator.events
+    ]
+
+
+async def main() -> None:
+    """Run the benchmark."""
+    coordinator = StandInCoordinator(EVENTS)
+    async with async_test_home_assistant() as hass:
+        platform = _platform(hass)
+        entities = _entities(coordinator, "single")
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(platform.async_add_entities([entity], False) for entity in entities)
+        )
+        await hass.async_block_till_done()
+        single = time.perf_counter() - start
+        await platform.async_reset()
+
+        platform = _platform(hass)
+        entities = _entities(coordinator, "batch")
+        start = time.perf_counter()
+        await platform.async_add_entities(entities, False)
+        await hass.async_block_till_done()
+        batch = time.perf_counter() - start
+        await platform.async_reset()
+        await hass.async_stop(force=True)
+
+    print(f"{EVENTS} entities, one add per entity: {single * 1000:.1f} ms")
+    print(f"{EVENTS} entities, single batch add:   {batch * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
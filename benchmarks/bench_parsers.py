@@ -0,0 +1,171 @@
+"""Compare parse time and peak memory of the supported feed formats.
+
+Run from the repository root in an environment with Home Assistant installed:
+
+    python benchmarks/bench_parsers.py
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from custom_components.ingv_centro_nazionale_terremoti.parser import (  # noqa: E402
+    parse_geojson,
+    parse_quakeml,
+    parse_text,
+)
+
+SIZES = (100, 1_000, 10_000)
+REPEAT = 5
+
+QUAKEML_EVENT = """<event publicID="smi:webservices.ingv.it/fdsnws/event/1/query?eventId={id}">
+<type>earthquake</type>
+<description><type>region name</type><text>{region}</text></description>
+<preferredOriginID>smi:webservices.ingv.it/fdsnws/event/1/query?originId={id}</preferredOriginID>
+<preferredMagnitudeID>smi:webservices.ingv.it/fdsnws/event/1/query?magnitudeId={id}</preferredMagnitudeID>
+<origin publicID="smi:webservices.ingv.it/fdsnws/event/1/query?originId={id}">
+<time><value>{time}</value></time>
+<latitude><value>{lat}</value><uncertainty>1.2</uncertainty></latitude>
+<longitude><value>{lon}</value><uncertainty>1.2</uncertainty></longitude>
+<depth><value>{depth_m}</value><uncertainty>800</uncertainty></depth>
+<depthType>from location</depthType>
+<quality><associatedPhaseCount>12</associatedPhaseCount><usedPhaseCount>10</usedPhaseCount></quality>
+<evaluationMode>manual</evaluationMode>
+<evaluationStatus>reviewed</evaluationStatus>
+<creationInfo><agencyID>INGV</agencyID><author>SURVEY-INGV</author><creationTime>{time}</creationTime></creationInfo>
+</origin>
+<magnitude publicID="smi:webservices.ingv.it/fdsnws/event/1/query?magnitudeId={id}">
+<mag><value>{mag}</value><uncertainty>0.2</uncertainty></mag>
+<type>ML</type>
+<stationCount>8</stationCount>
+<creationInfo><agencyID>INGV</agencyID><creationTime>{time}</creationTime></creationInfo>
+</magnitude>
+<creationInfo><agencyID>INGV</agencyID><creationTime>{time}</creationTime></creationInfo>
+</event>
+"""
+
+
+def generate_events(count: int) -> list[dict]:
+    """Return synthetic event data."""
+    rnd = random.Random(count)
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "id": 40_000_000 + index,
+            "time": (now - timedelta(seconds=index * 60)).strftime(
+                "%Y-%m-%dT%H:%M:%S.%f"
+            ),
+            "lat": round(rnd.uniform(36.0, 47.0), 4),
+            "lon": round(rnd.uniform(6.0, 19.0), 4),
+            "depth_km": round(rnd.uniform(1.0, 30.0), 1),
+            "depth_m": 0,
+            "mag": round(rnd.uniform(0.5, 5.0), 1),
+            "region": f"{rnd.randint(1, 20)} km N Synthetic (XX)",
+        }
+        for index in range(count)
+    ]
+
+
+def as_quakeml(events: list[dict]) -> bytes:
+    """Serialize events as an INGV QuakeML document."""
+    body = "".join(
+        QUAKEML_EVENT.format(**{**event, "depth_m": int(event["depth_km"] * 1000)})
+        for event in events
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<q:quakeml xmlns="http://quakeml.org/xmlns/bed/1.2" '
+        'xmlns:q="http://quakeml.org/xmlns/quakeml/1.2">\n'
+        '<eventParameters publicID="smi:webservices.ingv.it/fdsnws/event/1/query">\n'
+        f"{body}</eventParameters>\n</q:quakeml>\n"
+    ).encode()
+
+
+def as_text(events: list[dict]) -> bytes:
+    """Serialize events as an FDSN text document."""
+    lines = [
+        "#EventID|Time|Latitude|Longitude|Depth/Km|Author|Catalog|Contributor|"
+        "ContributorID|MagType|Magnitude|MagAuthor|EventLocationName|EventType"
+    ]
+    lines.extend(
+        f"{e['id']}|{e['time']}|{e['lat']}|{e['lon']}|{e['depth_km']}|SURVEY-INGV|"
+        f"|||ML|{e['mag']}|--|{e['region']}|earthquake"
+        for e in events
+    )
+    return "\n".join(lines).encode()
+
+
+def as_geojson(events: list[dict]) -> bytes:
+    """Serialize events as a GeoJSON document."""
+    return json.dumps(
+        {
+            "type": "FeatureCollection",
+            "features": [
+                {
+                    "type": "Feature",
+                    "properties": {
+                        "eventId": e["id"],
+                        "originId": e["id"],
+                        "time": e["time"],
+                        "author": "SURVEY-INGV",
+                        "magType": "ML",
+                        "mag": e["mag"],
+                        "magAuthor": "--",
+                        "type": "earthquake",
+                        "place": e["region"],
+                        "version": 100,
+                    },
+                    "geometry": {
+                        "type": "Point",
+                        "coordinates": [e["lon"], e["lat"], e["depth_km"]],
+                    },
+                }
+                for e in events
+            ],
+        }
+    ).encode()
+
+
+def measure(parse, data: bytes) -> tuple[float, int]:
+    """Return best parse time in ms and peak traced memory in KiB."""
+    best = min(_timed(parse, data) for _ in range(REPEAT))
+    tracemalloc.start()
+    parse(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best * 1000, peak // 1024
+
+
+def _timed(parse, data: bytes) -> float:
+    """Return the wall-clock time of one parse."""
+    start = time.perf_counter()
+    parse(data)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    """Run the benchmark and print a table."""
+    print(f"{'events':>7} {'format':>8} {'bytes':>10} {'parse ms':>10} {'peak KiB':>10}")
+    for size in SIZES:
+        events = generate_events(size)
+        for name, serialize, parse in (
+            ("xml", as_quakeml, parse_quakeml),
+            ("geojson", as_geojson, parse_geojson),
+            ("text", as_text, parse_text),
+        ):
+            data = serialize(events)
+            assert len(parse(data)) == size
+            elapsed, peak = measure(parse, data)
+            print(f"{size:>7} {name:>8} {len(data):>10} {elapsed:>10.2f} {peak:>10}")
+
+
+if __name__ == "__main__":
+    main()
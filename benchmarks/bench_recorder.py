@@ -0,0 +1,206 @@
+"""Estimate the recorder database growth of one day of polling.
+
+A stand-in feed hub serves a synthetic catalog of active events that gains new
+events and revises others on every poll, while the status sensor and the
+geolocation entities of one entry write their states. Every state change is
+counted as the recorder would store it: one state row, plus one attributes row
+for each distinct set of recorded attributes.
+
+Three modes are compared. The baseline mode replays the write pattern of the
+geolocation entities before attributes were cached: every entity was a
+coordinator listener with forced updates, so each of them wrote its state on
+every poll whether or not its event changed. The default mode writes an entity
+only when its event is revised, and the recorder friendly mode also turns off
+forced updates and leaves static attributes out of the recorder.
+
+The figures come from this model, not from a recorder database: no recorder
+runs, so indexes, statistics and the on-disk size of the database are not
+accounted for, and the attribute sizes are those of the serialized JSON.
+
+Run from the repository root with Home Assistant and
+pytest-homeassistant-custom-component installed:
+
+    python benchmarks/bench_recorder.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import sys
+from datetime import timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from homeassistant.const import (  # noqa: E402
+    ATTR_ATTRIBUTION,
+    ATTR_RESTORED,
+    ATTR_SUPPORTED_FEATURES,
+    CONF_LATITUDE,
+    CONF_LOCATION,
+    CONF_LONGITUDE,
+    CONF_RADIUS,
+    EVENT_STATE_CHANGED,
+)
+from homeassistant.helpers.entity_platform import EntityPlatform  # noqa: E402
+from homeassistant.helpers.json import json_bytes  # noqa: E402
+from pytest_homeassistant_custom_component.common import (  # noqa: E402
+    MockConfigEntry,
+    async_test_home_assistant,
+)
+
+from bench_update_path import StandInHub, SyntheticCatalog  # noqa: E402
+from custom_components.ingv_centro_nazionale_terremoti import (  # noqa: E402
+    IngvDataUpdateCoordinator,
+    geo_location,
+    sensor,
+)
+from custom_components.ingv_centro_nazionale_terremoti.const import (  # noqa: E402
+    CONF_MAX_ENTITIES,
+    CONF_MINIMUM_MAGNITUDE,
+    CONF_RECORDER_FRIENDLY,
+    DEFAULT_SCAN_INTERVAL,
+    DOMAIN,
+    FEED,
+    HUB,
+)
+
+MODES = ("baseline", "default", "recorder_friendly")
+
+# Attributes the recorder never stores, whatever the entity.
+EXCLUDED_ATTRIBUTES = {ATTR_ATTRIBUTION, ATTR_RESTORED, ATTR_SUPPORTED_FEATURES}
+
+
+class RecorderModel:
+    """Count the rows the recorder would write for state changes."""
+
+    def __init__(self) -> None:
+        """Initialize the counts."""
+        self.states = 0
+        self.attributes = 0
+        self.attribute_bytes = 0
+        self._shared: set[bytes] = set()
+
+    def record(self, event) -> None:
+        """Account for one state_changed event."""
+        if (state := event.data["new_state"]) is None:
+            return
+        excluded = EXCLUDED_ATTRIBUTES
+        if state.state_info:
+            excluded = excluded | state.state_info["unrecorded_attributes"]
+        shared = json_bytes(
+            {key: value for key, value in state.attributes.items() if key not in excluded}
+        )
+        self.states += 1
+        if shared not in self._shared:
+            self._shared.add(shared)
+            self.attributes += 1
+            self.attribute_bytes += len(shared)
+
+    def as_dict(self) -> dict[str, float]:
+        """Return the counts."""
+        return {
+            "state_rows": self.states,
+            "attribute_rows": self.attributes,
+            "attribute_kib": self.attribute_bytes / 1024,
+        }
+
+
+def _platform(hass, domain: str, entry) -> EntityPlatform:
+    """Return an entity platform of the integration for a config entry."""
+    platform = EntityPlatform(
+        hass=hass,
+        logger=logging.getLogger(__name__),
+        domain=domain,
+        platform_name=DOMAIN,
+        platform=None,
+        scan_interval=timedelta(seconds=30),
+        entity_namespace=None,
+    )
+    platform.config_entry = entry
+    return platform
+
+
+async def measure(
+    count: int, churn: float, revision: float, mode: str
+) -> dict[str, float]:
+    """Return the modelled rows of the initial refresh and of one day of polls."""
+    hub = StandInHub(SyntheticCatalog(count, churn, revision))
+    async with async_test_home_assistant() as hass:
+        hass.data.setdefault(DOMAIN, {})[HUB] = hub
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            version=3,
+            unique_id=f"bench_{count}",
+            data={CONF_LOCATION: "bench", CONF_LATITUDE: 42.0, CONF_LONGITUDE: 12.5},
+            options={
+                CONF_MINIMUM_MAGNITUDE: 0.0,
+                CONF_RADIUS: 2_000.0,
+                CONF_MAX_ENTITIES: 0,
+                CONF_RECORDER_FRIENDLY: mode == "recorder_friendly",
+            },
+        )
+        entry.add_to_hass(hass)
+        coordinator = IngvDataUpdateCoordinator(hass, entry, 2_000.0)
+        hass.data[DOMAIN].setdefault(FEED, {})[entry.entry_id] = coordinator
+        platforms = []
+        for domain, module in (("sensor", sensor), ("geo_location", geo_location)):
+            platform = _platform(hass, domain, entry)
+            await module.async_setup_entry(
+                hass, entry, platform._async_schedule_add_entities
+            )
+            platforms.append(platform)
+        if mode == "baseline":
+
+            def write_all() -> None:
+                for entity in coordinator._entities.values():
+                    entity.async_write_ha_state()
+
+            coordinator.async_add_listener(write_all)
+
+        model = RecorderModel()
+        hass.bus.async_listen(EVENT_STATE_CHANGED, model.record)
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+        initial = model.as_dict()
+
+        model = RecorderModel()
+        hass.bus.async_listen(EVENT_STATE_CHANGED, model.record)
+        for _ in range(int(timedelta(days=1).total_seconds() // DEFAULT_SCAN_INTERVAL)):
+            hub.step()
+            await coordinator.async_refresh()
+            await hass.async_block_till_done()
+        day = model.as_dict()
+
+        await coordinator.async_stop()
+        for platform in platforms:
+            await platform.async_reset()
+        await hass.async_stop(force=True)
+
+    result = {f"initial_{key}": value for key, value in initial.items()}
+    result.update({f"day_{key}": value for key, value in day.items()})
+    return result
+
+
+async def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--churn", type=float, default=0.005)
+    parser.add_argument("--revision", type=float, default=0.01)
+    args = parser.parse_args()
+
+    for mode in MODES:
+        metrics = await measure(args.events, args.churn, args.revision, mode)
+        print(
+            f"{args.events} events, {mode} mode"
+            " (modelled rows, not a database measurement)"
+        )
+        for key, value in metrics.items():
+            print(f"  {key:<26} {value:>12.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
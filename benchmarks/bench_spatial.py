@@ -0,0 +1,97 @@
+"""Compare spatial index radius queries with a full scan of the event store.
+
+Events are spread over Italy like the INGV catalog. Each query looks for the
+events within a radius of a random point and is checked against the scan.
+
+Run from the repository root in an environment with Home Assistant installed:
+
+    python benchmarks/bench_spatial.py
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from custom_components.ingv_centro_nazionale_terremoti.parser import (  # noqa: E402
+    IngvEvent,
+)
+from custom_components.ingv_centro_nazionale_terremoti.spatial import (  # noqa: E402
+    SpatialIndex,
+    haversine_km,
+)
+
+SIZES = (1_000, 10_000, 100_000)
+RADII = (10.0, 50.0, 200.0)
+QUERIES = 200
+
+
+def generate_events(count: int) -> list[IngvEvent]:
+    """Return synthetic events."""
+    rnd = random.Random(count)
+    now = datetime.now(timezone.utc)
+    return [
+        IngvEvent(
+            str(40_000_000 + index),
+            round(rnd.uniform(36.0, 47.0), 4),
+            round(rnd.uniform(6.0, 19.0), 4),
+            round(rnd.uniform(1.0, 30.0), 1),
+            round(rnd.uniform(0.5, 5.0), 1),
+            now,
+        )
+        for index in range(count)
+    ]
+
+
+def scan(
+    events: list[IngvEvent], latitude: float, longitude: float, radius: float
+) -> list[tuple[float, IngvEvent]]:
+    """Return the events within radius of a point by measuring every event."""
+    matches = []
+    for event in events:
+        distance = haversine_km(latitude, longitude, event.latitude, event.longitude)
+        if distance <= radius:
+            matches.append((distance, event))
+    return matches
+
+
+def main() -> None:
+    """Run the benchmark and print a table."""
+    print(
+        f"{'events':>7} {'radius':>7} {'matches':>8} {'scan ms':>9}"
+        f" {'index ms':>9} {'speedup':>8}"
+    )
+    for size in SIZES:
+        events = generate_events(size)
+        index = SpatialIndex()
+        index.update(events)
+        rnd = random.Random(0)
+        for radius in RADII:
+            points = [
+                (rnd.uniform(37.0, 46.0), rnd.uniform(7.0, 18.0))
+                for _ in range(QUERIES)
+            ]
+            start = time.perf_counter()
+            expected = [scan(events, *point, radius) for point in points]
+            scan_ms = (time.perf_counter() - start) * 1000 / QUERIES
+            start = time.perf_counter()
+            found = [index.query(*point, radius) for point in points]
+            index_ms = (time.perf_counter() - start) * 1000 / QUERIES
+            for scanned, indexed in zip(expected, found):
+                assert {event.event_id for _, event in scanned} == {
+                    event.event_id for _, event in indexed
+                }
+            matches = sum(map(len, found)) / QUERIES
+            print(
+                f"{size:>7} {radius:>7.0f} {matches:>8.1f} {scan_ms:>9.3f}"
+                f" {index_ms:>9.3f} {scan_ms / index_ms:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
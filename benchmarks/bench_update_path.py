@@ -0,0 +1,439 @@
+"""Measure the coordinator update path against a synthetic catalog.
+
+A stand-in feed hub serves a synthetic catalog, so no network is used. Each
+size runs one initial refresh, which creates every entity, followed by steady
+refreshes in which a share of the events is replaced (churn) and another share
+is revised. Per-phase timings, peak traced memory and callback/state write
+counts are compared against ``benchmarks/baseline.json``.
+
+Only the counts gate: entities, creations, updates, removals, callbacks,
+internal state rebuilds and state writes do not depend on the machine, and
+must match the baseline exactly. Timings are divided by the time of a fixed
+calibration loop run in the same process, stored as such ratios, and only
+reported when they exceed the baseline by more than the tolerance, as is the
+peak memory.
+
+Run from the repository root with Home Assistant and
+pytest-homeassistant-custom-component installed:
+
+    python benchmarks/bench_update_path.py
+    python benchmarks/bench_update_path.py --save-baseline
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import functools
+import json
+import logging
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from homeassistant.const import (  # noqa: E402
+    CONF_LATITUDE,
+    CONF_LOCATION,
+    CONF_LONGITUDE,
+    CONF_RADIUS,
+)
+from homeassistant.helpers.entity_platform import EntityPlatform  # noqa: E402
+from pytest_homeassistant_custom_component.common import (  # noqa: E402
+    MockConfigEntry,
+    async_test_home_assistant,
+)
+
+from bench_parsers import as_quakeml, generate_events  # noqa: E402
+from custom_components.ingv_centro_nazionale_terremoti import (  # noqa: E402
+    IngvDataUpdateCoordinator,
+    geo_location,
+)
+from custom_components.ingv_centro_nazionale_terremoti.const import (  # noqa: E402
+    CONF_MAX_ENTITIES,
+    CONF_MINIMUM_MAGNITUDE,
+    DOMAIN,
+    FEED,
+    HUB,
+    UPDATE_OK,
+)
+from custom_components.ingv_centro_nazionale_terremoti.geo_location import (  # noqa: E402
+    IngvGeolocationEvent,
+)
+from custom_components.ingv_centro_nazionale_terremoti.metrics import (  # noqa: E402
+    RollingMetrics,
+)
+from custom_components.ingv_centro_nazionale_terremoti.parser import (  # noqa: E402
+    IngvEvent,
+    extract_event_id,
+    parse_quakeml,
+)
+
+BASELINE = Path(__file__).with_name("baseline.json")
+SIZES = (100, 1_000, 10_000)
+CYCLES = 5
+# Metrics that must match the baseline exactly; the others are only reported.
+COUNTS = (
+    "parsed",
+    "entities",
+    "created",
+    "updated",
+    "removed",
+    "callbacks",
+    "internal_states",
+    "state_writes",
+)
+CALIBRATION_RUNS = 5
+
+
+class SyntheticCatalog:
+    """Deterministic catalog with configurable churn and revision rates."""
+
+    def __init__(self, count: int, churn: float, revision: float) -> None:
+        """Create the initial events."""
+        self._random = random.Random(count)
+        self._churn = churn
+        self._revision = revision
+        self._next_id = 0
+        self._now = datetime.now(timezone.utc)
+        self.events = [self._new_event() for _ in range(count)]
+
+    def _new_event(self) -> IngvEvent:
+        """Return a new event inside Italy within the last day."""
+        self._next_id += 1
+        return IngvEvent(
+            event_id=str(40_000_000 + self._next_id),
+            latitude=round(self._random.uniform(36.0, 47.0), 4),
+            longitude=round(self._random.uniform(6.0, 19.0), 4),
+            depth=round(self._random.uniform(1.0, 30.0), 1),
+            magnitude=round(self._random.uniform(0.5, 5.0), 1),
+            time=self._now - timedelta(seconds=self._random.uniform(0, 80_000)),
+            status="preliminary",
+            mode="automatic",
+            region="Synthetic (XX)",
+        )
+
+    def step(self) -> None:
+        """Replace the churned events and revise another share of them."""
+        count = len(self.events)
+        churned = int(count * self._churn)
+        self.events = self.events[churned:] + [
+            self._new_event() for _ in range(churned)
+        ]
+        for index in self._random.sample(range(count), int(count * self._revision)):
+            event = self.events[index]
+            self.events[index] = IngvEvent(
+                event.event_id,
+                event.latitude,
+                event.longitude,
+                event.depth,
+                round(event.magnitude + 0.1, 1),
+                event.time,
+                "reviewed",
+                "manual",
+                event.region,
+            )
+
+
+class StandInHub:
+    """Feed hub stand-in serving a synthetic catalog."""
+
+    retry_after = None
+
+    def __init__(self, catalog: SyntheticCatalog) -> None:
+        """Initialize the stand-in."""
+        self.catalog = catalog
+        self.generation = 0
+        self.metrics = RollingMetrics()
+
+    @property
+    def events(self) -> list[IngvEvent]:
+        """Return the catalog events."""
+        return self.catalog.events
+
+    def step(self) -> None:
+        """Advance the catalog."""
+        self.catalog.step()
+        self.generation += 1
+
+    def async_register(
+        self, entry_id, feed_filter, feed_format, catalog_days=None
+    ) -> None:
+        """Ignore registration."""
+
+    def async_unregister(self, entry_id) -> None:
+        """Ignore registration."""
+
+    def async_match_events(self, entry_id, starttime):
+        """Leave the filtering to the scalar path."""
+        return None
+
+    async def async_fetch(self, max_age):
+        """Return the catalog."""
+        return UPDATE_OK, self.catalog.events
+
+    def async_get_status(self, entry_id):
+        """Return no persisted status."""
+        return None
+
+    def async_set_status(self, entry_id, status) -> None:
+        """Ignore the status."""
+
+
+class Probe:
+    """Count calls of a function and the time spent in it."""
+
+    def __init__(self) -> None:
+        """Initialize the probe."""
+        self.calls = 0
+        self.seconds = 0.0
+
+    def wrap(self, func):
+        """Return func instrumented by this probe."""
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.seconds += time.perf_counter() - start
+                self.calls += 1
+
+        return wrapper
+
+    def reset(self) -> None:
+        """Clear the probe."""
+        self.calls = 0
+        self.seconds = 0.0
+
+
+PROBES = {
+    name: Probe()
+    for name in ("filter", "remove", "internal_state", "callbacks", "state_writes")
+}
+IngvGeolocationEvent._update_internal_state = PROBES["internal_state"].wrap(
+    IngvGeolocationEvent._update_internal_state
+)
+IngvGeolocationEvent.async_handle_event_update = PROBES["callbacks"].wrap(
+    IngvGeolocationEvent.async_handle_event_update
+)
+IngvGeolocationEvent.async_write_ha_state = PROBES["state_writes"].wrap(
+    IngvGeolocationEvent.async_write_ha_state
+)
+
+
+def measure_parse(count: int) -> dict[str, float]:
+    """Return parse and event id extraction timings for a QuakeML document."""
+    events = generate_events(count)
+    document = as_quakeml(events)
+    public_ids = [
+        f"smi:webservices.ingv.it/fdsnws/event/1/query?eventId={event['id']}"
+        for event in events
+    ]
+    start = time.perf_counter()
+    parsed = parse_quakeml(document)
+    parse_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    for public_id in public_ids:
+        extract_event_id(public_id)
+    extract_ms = (time.perf_counter() - start) * 1000
+    return {"parse_ms": parse_ms, "extract_ids_ms": extract_ms, "parsed": len(parsed)}
+
+
+async def _refresh(hass, coordinator) -> dict[str, float]:
+    """Run one refresh and the entity fan-out it triggers."""
+    for probe in PROBES.values():
+        probe.reset()
+    start = time.perf_counter()
+    await coordinator.async_update()
+    update_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    await hass.async_block_till_done()
+    fanout_ms = (time.perf_counter() - start) * 1000
+    status = coordinator.status_info()
+    return {
+        "update_ms": update_ms,
+        "fanout_ms": fanout_ms,
+        "filter_ms": PROBES["filter"].seconds * 1000,
+        "remove_ms": PROBES["remove"].seconds * 1000,
+        "internal_state_ms": PROBES["internal_state"].seconds * 1000,
+        "entities": len(coordinator.active_event_ids),
+        "created": status.created,
+        "updated": status.updated,
+        "removed": status.removed,
+        "callbacks": PROBES["callbacks"].calls,
+        "internal_states": PROBES["internal_state"].calls,
+        "state_writes": PROBES["state_writes"].calls,
+    }
+
+
+async def measure_updates(count: int, churn: float, revision: float) -> dict:
+    """Return initial and steady refresh metrics for a catalog size."""
+    hub = StandInHub(SyntheticCatalog(count, churn, revision))
+    async with async_test_home_assistant() as hass:
+        hass.data.setdefault(DOMAIN, {})[HUB] = hub
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            version=3,
+            unique_id=f"bench_{count}",
+            data={CONF_LOCATION: "bench", CONF_LATITUDE: 42.0, CONF_LONGITUDE: 12.5},
+            options={
+                CONF_MINIMUM_MAGNITUDE: 0.0,
+                CONF_RADIUS: 2_000.0,
+                CONF_MAX_ENTITIES: 0,
+            },
+        )
+        entry.add_to_hass(hass)
+        coordinator = IngvDataUpdateCoordinator(hass, entry, 2_000.0)
+        coordinator._filter_events = PROBES["filter"].wrap(coordinator._filter_events)
+        coordinator._async_remove_entities = PROBES["remove"].wrap(
+            coordinator._async_remove_entities
+        )
+        hass.data[DOMAIN].setdefault(FEED, {})[entry.entry_id] = coordinator
+        platform = EntityPlatform(
+            hass=hass,
+            logger=logging.getLogger(__name__),
+            domain="geo_location",
+            platform_name=DOMAIN,
+            platform=None,
+            scan_interval=timedelta(seconds=30),
+            entity_namespace=None,
+        )
+        platform.config_entry = entry
+        await geo_location.async_setup_entry(
+            hass, entry, platform._async_schedule_add_entities
+        )
+
+        initial = await _refresh(hass, coordinator)
+        steady = []
+        for _ in range(CYCLES):
+            hub.step()
+            steady.append(await _refresh(hass, coordinator))
+
+        hub.step()
+        tracemalloc.start()
+        await _refresh(hass, coordinator)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        await coordinator.async_stop()
+        await platform.async_reset()
+        await hass.async_stop(force=True)
+
+    result = {f"initial_{key}": value for key, value in initial.items()}
+    for key in steady[0]:
+        result[f"steady_{key}"] = statistics.median(cycle[key] for cycle in steady)
+    result["steady_peak_kib"] = peak // 1024
+    return result
+
+
+def calibrate() -> float:
+    """Return the ms of a fixed pure Python workload, the best of a few runs."""
+    rnd = random.Random(0)
+    points = [(rnd.uniform(36.0, 47.0), rnd.uniform(6.0, 19.0)) for _ in range(20_000)]
+    best = float("inf")
+    for _ in range(CALIBRATION_RUNS):
+        start = time.perf_counter()
+        events = {
+            str(index): IngvEvent(str(index), latitude, longitude, 10.0, 2.0, None)
+            for index, (latitude, longitude) in enumerate(points)
+        }
+        sorted(events.values(), key=lambda event: event.latitude * event.longitude)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def is_count(key: str) -> bool:
+    """Return whether a metric is a count."""
+    return key.split("_", 1)[-1] in COUNTS
+
+
+def normalize(results: dict, calibration_ms: float) -> dict:
+    """Return the results with timings as ratios to the calibration loop."""
+    return {
+        size: {
+            key: round(value / calibration_ms, 4)
+            if key.endswith("_ms")
+            else round(value, 2)
+            for key, value in metrics.items()
+        }
+        for size, metrics in results.items()
+    }
+
+
+def compare(
+    results: dict, baseline: dict, tolerance: float, calibration_ms: float
+) -> tuple[list[str], list[str]]:
+    """Return the counts that differ from the baseline, and the slower metrics.
+
+    Both results and baseline hold normalized timings. Timings less than a
+    millisecond over the baseline are ignored.
+    """
+    regressions = []
+    slower = []
+    for size, metrics in results.items():
+        for key, value in metrics.items():
+            if (reference := baseline.get(size, {}).get(key)) is None:
+                continue
+            if is_count(key):
+                if value != reference:
+                    regressions.append(f"{size} {key}: {value} != {reference}")
+            elif value > reference * (1 + tolerance) and (value - reference) * (
+                calibration_ms if key.endswith("_ms") else 1
+            ) > 1:
+                slower.append(f"{size} {key}: {value:g} > {reference:g}")
+    return regressions, slower
+
+
+async def main() -> int:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--churn", type=float, default=0.05)
+    parser.add_argument("--revision", type=float, default=0.05)
+    parser.add_argument("--tolerance", type=float, default=0.5)
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+
+    calibration_ms = calibrate()
+    print(f"Calibration loop: {calibration_ms:.2f} ms")
+    results = {}
+    for size in SIZES:
+        metrics = measure_parse(size)
+        metrics.update(await measure_updates(size, args.churn, args.revision))
+        results[str(size)] = metrics
+        print(f"{size} events")
+        for key, value in metrics.items():
+            print(f"  {key:<26} {value:>12.2f}")
+
+    normalized = normalize(results, calibration_ms)
+    if args.save_baseline:
+        BASELINE.write_text(json.dumps(normalized, indent=2) + "\n")
+        print(f"Baseline saved to {BASELINE}")
+        return 0
+    if not BASELINE.exists():
+        print("No baseline found, run with --save-baseline")
+        return 0
+    regressions, slower = compare(
+        normalized, json.loads(BASELINE.read_text()), args.tolerance, calibration_ms
+    )
+    if slower:
+        print("Slower than the baseline, relative to the calibration loop:")
+        for metric in slower:
+            print(f"  {metric}")
+    if regressions:
+        print("Counts differing from the baseline:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print("All counts match the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,161 @@
+"""Compare the vectorized filter engine with the scalar coordinator filter.
+
+A shared store of synthetic events spread over Italy is filtered for several
+config entries with different homes, radii and minimum magnitudes, through the
+coordinator's own ``_filter_events``. The scalar run measures every event of
+every entry one at a time; the vectorized run matches all entries against the
+event arrays in one batched pass. Both must select the same events.
+
+The cold phase filters a store the coordinators have never seen, as after a
+restart or a full resync; the warm phase filters it again unchanged.
+
+Run from the repository root in an environment with Home Assistant and NumPy
+installed:
+
+    python benchmarks/bench_vectorized.py
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from custom_components.ingv_centro_nazionale_terremoti import (  # noqa: E402
+    IngvDataUpdateCoordinator,
+)
+from custom_components.ingv_centro_nazionale_terremoti.hub import (  # noqa: E402
+    FeedFilter,
+)
+from custom_components.ingv_centro_nazionale_terremoti.parser import (  # noqa: E402
+    IngvEvent,
+)
+from custom_components.ingv_centro_nazionale_terremoti.vectorized import (  # noqa: E402
+    load_event_arrays,
+)
+
+EVENTS = 10_000
+ENTRIES = 20
+ROUNDS = 5
+
+
+def generate_events(count: int) -> list[IngvEvent]:
+    """Return synthetic events of the last two days."""
+    rnd = random.Random(count)
+    now = datetime.now(timezone.utc)
+    return [
+        IngvEvent(
+            str(40_000_000 + index),
+            round(rnd.uniform(36.0, 47.0), 4),
+            round(rnd.uniform(6.0, 19.0), 4),
+            round(rnd.uniform(1.0, 30.0), 1),
+            round(rnd.uniform(0.5, 5.0), 1),
+            now - timedelta(seconds=rnd.uniform(0, 172_800)),
+        )
+        for index in range(count)
+    ]
+
+
+def generate_filters(count: int) -> list[FeedFilter]:
+    """Return the filters of synthetic config entries."""
+    rnd = random.Random(count)
+    return [
+        FeedFilter(
+            latitude=rnd.uniform(37.0, 46.0),
+            longitude=rnd.uniform(7.0, 18.0),
+            radius=rnd.choice((50.0, 100.0, 200.0, 400.0)),
+            minimum_magnitude=rnd.choice((0.0, 1.0, 2.0, 3.0)),
+            starttime_delta=timedelta(hours=rnd.choice((24, 48))),
+        )
+        for _ in range(count)
+    ]
+
+
+class StandInHub:
+    """Feed hub stand-in matching its events with the engine, or not at all."""
+
+    def __init__(
+        self, events: list[IngvEvent], filters: dict[str, FeedFilter], batched: bool
+    ) -> None:
+        """Initialize the stand-in."""
+        self._filters = filters
+        self._arrays = load_event_arrays() if batched else None
+        self._matches: dict = {}
+        self.events = events
+
+    def load(self) -> None:
+        """Fill the arrays and forget the previous matches."""
+        if self._arrays is not None:
+            self._arrays.clear()
+            self._arrays.update(self.events)
+        self._matches = {}
+
+    def async_match_events(self, entry_id, starttime):
+        """Return the matches of an entry, as the hub does."""
+        if self._arrays is None:
+            return None
+        if not self._matches:
+            self._matches = dict(
+                zip(self._filters, self._arrays.match(list(self._filters.values())))
+            )
+        return self._arrays.select(*self._matches[entry_id], starttime)
+
+
+def run(hub: StandInHub, coordinators: list[SimpleNamespace]) -> float:
+    """Filter the store for every coordinator, return the elapsed ms."""
+    start = time.perf_counter()
+    for coordinator in coordinators:
+        coordinator._events, _ = IngvDataUpdateCoordinator._filter_events(
+            coordinator, hub.events
+        )
+    return (time.perf_counter() - start) * 1000
+
+
+def main() -> None:
+    """Run the benchmark and print a table."""
+    events = generate_events(EVENTS)
+    filters = {f"entry_{index}": f for index, f in enumerate(generate_filters(ENTRIES))}
+    results = {}
+    for batched in (False, True):
+        hub = StandInHub(events, filters, batched)
+        load = cold = warm = 0.0
+        for _ in range(ROUNDS):
+            coordinators = [
+                SimpleNamespace(
+                    _entry_id=entry_id, _feed_filter=feed_filter, _events={}, _hub=hub
+                )
+                for entry_id, feed_filter in filters.items()
+            ]
+            start = time.perf_counter()
+            hub.load()
+            load += (time.perf_counter() - start) * 1000
+            cold += run(hub, coordinators)
+            warm += run(hub, coordinators)
+        results[batched] = (
+            load / ROUNDS,
+            cold / ROUNDS,
+            warm / ROUNDS,
+            {c._entry_id: c._events for c in coordinators},
+        )
+
+    scalar, batched = results[False], results[True]
+    for entry_id, expected in scalar[3].items():
+        assert expected.keys() == batched[3][entry_id].keys(), entry_id
+    matches = sum(map(len, scalar[3].values())) / ENTRIES
+    print(f"{EVENTS} events, {ENTRIES} entries, {matches:.0f} matches per entry")
+    print(f"{'path':>10} {'load ms':>9} {'cold ms':>9} {'warm ms':>9}")
+    for name, (load, cold, warm, _) in (("scalar", scalar), ("vectorized", batched)):
+        print(f"{name:>10} {load:>9.2f} {cold:>9.2f} {warm:>9.2f}")
+    print(
+        f"{'speedup':>10} {'':>9} {scalar[1] / (batched[0] + batched[1]):>8.1f}x"
+        f" {scalar[2] / batched[2]:>8.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,436 @@
+"""Soak test the integration against a local FDSN event service stand-in.
+
+A local aiohttp server replays a simulated catalog in which events appear, are
+revised and age out over several virtual days. Several config entries are set
+up through ``async_setup_entry``, refreshed many times, reloaded every now and
+then and finally unloaded. Process RSS, live entities, dispatcher listeners,
+coordinator and hub container sizes are sampled over time, and the run fails
+when any of them keeps growing after the catalog window has filled.
+
+Run from the repository root with Home Assistant and
+pytest-homeassistant-custom-component installed:
+
+    python benchmarks/soak.py --days 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import math
+import random
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from aiohttp import web  # noqa: E402
+from homeassistant.const import (  # noqa: E402
+    CONF_LATITUDE,
+    CONF_LOCATION,
+    CONF_LONGITUDE,
+    CONF_RADIUS,
+    CONF_SCAN_INTERVAL,
+)
+from homeassistant.helpers.aiohttp_client import async_get_clientsession  # noqa: E402
+from homeassistant.helpers.dispatcher import DATA_DISPATCHER  # noqa: E402
+from homeassistant.loader import DATA_CUSTOM_COMPONENTS  # noqa: E402
+from homeassistant.util import dt as dt_util  # noqa: E402
+from pytest_homeassistant_custom_component.common import (  # noqa: E402
+    MockConfigEntry,
+    async_test_home_assistant,
+)
+
+from custom_components.ingv_centro_nazionale_terremoti import hub as hub_module  # noqa: E402
+from custom_components.ingv_centro_nazionale_terremoti.const import (  # noqa: E402
+    CONF_FEED_FORMAT,
+    CONF_MAX_ENTITIES,
+    CONF_MINIMUM_MAGNITUDE,
+    CONF_START_TIME,
+    DOMAIN,
+    FEED,
+)
+from custom_components.ingv_centro_nazionale_terremoti.fdsn import (  # noqa: E402
+    IngvFdsnClient,
+)
+
+CYCLE = timedelta(minutes=10)
+ENTRIES = (
+    ("L'Aquila", 42.35, 13.40, "xml"),
+    ("Catania", 37.50, 15.09, "geojson"),
+    ("Napoli", 40.85, 14.27, "text"),
+)
+QUAKEML_EVENT = """<event publicID="smi:webservices.ingv.it/fdsnws/event/1/query?eventId={id}">
+<type>earthquake</type>
+<description><type>region name</type><text>{region}</text></description>
+<preferredOriginID>smi:o/{id}</preferredOriginID>
+<preferredMagnitudeID>smi:m/{id}</preferredMagnitudeID>
+<origin publicID="smi:o/{id}">
+<time><value>{time}</value></time>
+<latitude><value>{lat}</value></latitude>
+<longitude><value>{lon}</value></longitude>
+<depth><value>{depth_m}</value></depth>
+<evaluationMode>{mode}</evaluationMode>
+<evaluationStatus>{status}</evaluationStatus>
+<creationInfo><creationTime>{updated}</creationTime></creationInfo>
+</origin>
+<magnitude publicID="smi:m/{id}">
+<mag><value>{mag}</value></mag>
+<creationInfo><creationTime>{updated}</creationTime></creationInfo>
+</magnitude>
+</event>
+"""
+
+
+class VirtualClock:
+    """Clock advanced by the harness instead of by wall time."""
+
+    def __init__(self) -> None:
+        """Start the clock now."""
+        self.now = datetime.now(timezone.utc).replace(microsecond=0)
+        self._monotonic = 0.0
+
+    def advance(self, delta: timedelta) -> None:
+        """Move the clock forward."""
+        self.now += delta
+        self._monotonic += delta.total_seconds()
+
+    def utcnow(self) -> datetime:
+        """Return the virtual UTC time."""
+        return self.now
+
+    def monotonic(self) -> float:
+        """Return the virtual monotonic time."""
+        return self._monotonic
+
+
+class SimulatedCatalog:
+    """Seismic catalog in which events appear, are revised and age out."""
+
+    def __init__(self, clock: VirtualClock, rate: float, seed: int) -> None:
+        """Initialize the catalog; rate is the number of events per hour."""
+        self._clock = clock
+        self._rate = rate
+        self._random = random.Random(seed)
+        self._next_id = 40_000_000
+        self.events: dict[int, dict] = {}
+
+    def step(self, delta: timedelta) -> None:
+        """Simulate the given time span."""
+        now = self._clock.now
+        expected = self._rate * delta.total_seconds() / 3600
+        for _ in range(self._poisson(expected)):
+            self._next_id += 1
+            self.events[self._next_id] = {
+                "id": self._next_id,
+                "time": now - timedelta(seconds=self._random.uniform(0, 600)),
+                "updated": now,
+                "lat": round(self._random.uniform(36.0, 47.0), 4),
+                "lon": round(self._random.uniform(6.0, 19.0), 4),
+                "depth_km": round(self._random.uniform(1.0, 30.0), 1),
+                # Gutenberg-Richter with b = 1 above magnitude 1.
+                "mag": round(1.0 + self._random.expovariate(math.log(10)), 1),
+                "status": "preliminary",
+                "mode": "automatic",
+                "region": f"{self._random.randint(1, 20)} km N Synthetic (XX)",
+            }
+        for event in self.events.values():
+            if event["status"] == "preliminary" and self._random.random() < 0.2:
+                event["status"] = "reviewed"
+                event["mode"] = "manual"
+                event["mag"] = round(event["mag"] + self._random.choice((-0.1, 0.1)), 1)
+                event["updated"] = now
+        # Keep two days of events, so the catalog itself stops growing.
+        oldest = now - timedelta(days=2)
+        for event_id in [k for k, e in self.events.items() if e["time"] < oldest]:
+            del self.events[event_id]
+
+    def _poisson(self, expected: float) -> int:
+        """Return a Poisson distributed count."""
+        count, threshold, product = 0, math.exp(-expected), self._random.random()
+        while product > threshold:
+            count += 1
+            product *= self._random.random()
+        return count
+
+    def query(self, params) -> list[dict]:
+        """Return the events matching FDSN query parameters, newest first."""
+        starttime = _parse_time(params.get("starttime"))
+        endtime = _parse_time(params.get("endtime"))
+        updatedafter = _parse_time(params.get("updatedafter"))
+        minmag = float(params.get("minmag", 0))
+        maxmag = float(params.get("maxmag", math.inf))
+        latitude = float(params["lat"])
+        longitude = float(params["lon"])
+        minradius = float(params.get("minradiuskm", 0))
+        maxradius = float(params["maxradiuskm"])
+        events = [
+            event
+            for event in self.events.values()
+            if (starttime is None or event["time"] >= starttime)
+            and (endtime is None or event["time"] <= endtime)
+            and (updatedafter is None or event["updated"] > updatedafter)
+            and minmag <= event["mag"] <= maxmag
+            and minradius
+            <= hub_module.haversine_km(latitude, longitude, event["lat"], event["lon"])
+            <= maxradius
+        ]
+        events.sort(key=lambda event: event["time"], reverse=True)
+        if limit := params.get("limit"):
+            events = events[: int(limit)]
+        return events
+
+
+def _parse_time(value: str | None) -> datetime | None:
+    """Parse an FDSN time parameter."""
+    if not value:
+        return None
+    return datetime.fromisoformat(value).replace(tzinfo=timezone.utc)
+
+
+def _fdsn_time(value: datetime) -> str:
+    """Format a time as the INGV service does."""
+    return value.strftime("%Y-%m-%dT%H:%M:%S.%f")
+
+
+def serialize(events: list[dict], feed_format: str) -> tuple[str, str]:
+    """Return the body and content type of a response."""
+    if feed_format == "text":
+        lines = ["#EventID|Time|Latitude|Longitude|Depth/Km|Author|Catalog|"]
+        lines.extend(
+            f"{e['id']}|{_fdsn_time(e['time'])}|{e['lat']}|{e['lon']}|"
+            f"{e['depth_km']}|SURVEY-INGV||||ML|{e['mag']}|--|{e['region']}|earthquake"
+            for e in events
+        )
+        return "\n".join(lines), "text/plain"
+    if feed_format == "geojson":
+        features = [
+            {
+                "type": "Feature",
+                "properties": {
+                    "eventId": e["id"],
+                    "time": _fdsn_time(e["time"]),
+                    "mag": e["mag"],
+                    "place": e["region"],
+                },
+                "geometry": {
+                    "type": "Point",
+                    "coordinates": [e["lon"], e["lat"], e["depth_km"]],
+                },
+            }
+            for e in events
+        ]
+        return web.json_response({"features": features}).text, "application/json"
+    body = "".join(
+        QUAKEML_EVENT.format(
+            **{
+                **e,
+                "time": _fdsn_time(e["time"]),
+                "updated": _fdsn_time(e["updated"]),
+                "depth_m": int(e["depth_km"] * 1000),
+            }
+        )
+        for e in events
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<q:quakeml xmlns="http://quakeml.org/xmlns/bed/1.2" '
+        'xmlns:q="http://quakeml.org/xmlns/quakeml/1.2">\n'
+        f"<eventParameters publicID=\"smi:soak\">\n{body}</eventParameters>\n"
+        "</q:quakeml>\n",
+        "application/xml",
+    )
+
+
+def make_app(catalog: SimulatedCatalog, error_rate: float) -> web.Application:
+    """Return an application mimicking the FDSN event endpoint."""
+    errors = random.Random(0)
+
+    async def handle_query(request: web.Request) -> web.Response:
+        if errors.random() < error_rate:
+            return web.Response(status=503, headers={"Retry-After": "60"})
+        events = catalog.query(request.query)
+        if not events:
+            return web.Response(status=204)
+        body, content_type = serialize(events, request.query.get("format", "xml"))
+        return web.Response(text=body, content_type=content_type)
+
+    app = web.Application()
+    app.router.add_get("/fdsnws/event/1/query", handle_query)
+    return app
+
+
+def rss_kib() -> int:
+    """Return the resident set size of the process in KiB."""
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def sample(hass, hub) -> dict[str, int]:
+    """Return the tracked sizes."""
+    coordinators = hass.data[DOMAIN][FEED].values()
+    dispatcher = hass.data.get(DATA_DISPATCHER, {})
+    traced, _ = tracemalloc.get_traced_memory()
+    return {
+        "rss_kib": rss_kib(),
+        "traced_kib": traced // 1024,
+        # Unloaded entities with a registry entry leave a restored placeholder.
+        "states": sum(
+            not state.attributes.get("restored")
+            for state in hass.states.async_all("geo_location")
+        ),
+        "dispatcher_signals": len(dispatcher),
+        "dispatcher_listeners": sum(len(targets) for targets in dispatcher.values()),
+        "coordinator_events": sum(len(c._events) for c in coordinators),
+        "coordinator_active": sum(len(c._active_events) for c in coordinators),
+        "coordinator_entities": sum(len(c._entities) for c in coordinators),
+        "coordinator_pending": sum(len(c._pending_entities) for c in coordinators),
+        "coordinator_registry": sum(len(c._registry_index) for c in coordinators),
+        "hub_events": len(hub._events),
+        "hub_index": len(hub._index),
+        "hub_arrays": len(hub._arrays) if hub._arrays is not None else 0,
+        "hub_statuses": len(hub._statuses),
+        "hub_filters": len(hub._filters),
+    }
+
+
+def unbounded(samples: list[dict[str, int]], warmup: int) -> list[str]:
+    """Return the metrics whose second half peaks above their first half."""
+    steady = samples[warmup:]
+    half = len(steady) // 2
+    if half < 2:
+        return []
+    failures = []
+    for key in steady[0]:
+        first = max(s[key] for s in steady[:half])
+        second = max(s[key] for s in steady[half:])
+        # Memory gets a fixed allowance for allocator noise.
+        slack = 16 * 1024 if key.endswith("_kib") else 2
+        if second > first * 1.2 + slack:
+            failures.append(f"{key}: {first} -> {second}")
+    return failures
+
+
+async def main() -> int:
+    """Run the soak test."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=float, default=3.0)
+    parser.add_argument("--rate", type=float, default=60.0, help="events per hour")
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    parser.add_argument("--reload-every", type=int, default=36, help="cycles")
+    parser.add_argument("--sample-every", type=int, default=12, help="cycles")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    clock = VirtualClock()
+    catalog = SimulatedCatalog(clock, args.rate, seed=1)
+    # Prime the service with two days of history.
+    for _ in range(int(timedelta(days=2) / CYCLE)):
+        clock.advance(CYCLE)
+        catalog.step(CYCLE)
+
+    original_utcnow = dt_util.utcnow
+    dt_util.utcnow = clock.utcnow
+    hub_module.time = SimpleNamespace(
+        monotonic=clock.monotonic, perf_counter=time.perf_counter
+    )
+    tracemalloc.start()
+    runner = web.AppRunner(make_app(catalog, args.error_rate))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    url = f"http://127.0.0.1:{port}/fdsnws/event/1/query"
+
+    cycles = int(args.days * timedelta(days=1) / CYCLE)
+    samples: list[dict[str, int]] = []
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as config_dir:
+        async with async_test_home_assistant(storage_dir=config_dir) as hass:
+            hass.data.pop(DATA_CUSTOM_COMPONENTS)
+            hub = hub_module.async_get_hub(hass)
+            hub._client = IngvFdsnClient(async_get_clientsession(hass), url)
+            entries = []
+            for location, latitude, longitude, feed_format in ENTRIES:
+                entry = MockConfigEntry(
+                    domain=DOMAIN,
+                    version=3,
+                    unique_id=location,
+                    title=location,
+                    data={
+                        CONF_LOCATION: location,
+                        CONF_LATITUDE: latitude,
+                        CONF_LONGITUDE: longitude,
+                    },
+                    options={
+                        CONF_MINIMUM_MAGNITUDE: 1.5,
+                        CONF_RADIUS: 300.0,
+                        CONF_SCAN_INTERVAL: int(CYCLE.total_seconds()),
+                        CONF_START_TIME: 24,
+                        CONF_FEED_FORMAT: feed_format,
+                        CONF_MAX_ENTITIES: 40,
+                    },
+                )
+                entry.add_to_hass(hass)
+                assert await hass.config_entries.async_setup(entry.entry_id)
+                entries.append(entry)
+            await hass.async_block_till_done()
+
+            for cycle in range(1, cycles + 1):
+                clock.advance(CYCLE)
+                catalog.step(CYCLE)
+                for coordinator in list(hass.data[DOMAIN][FEED].values()):
+                    await coordinator.async_refresh()
+                await hass.async_block_till_done()
+                if cycle % args.reload_every == 0:
+                    entry = entries[(cycle // args.reload_every) % len(entries)]
+                    assert await hass.config_entries.async_reload(entry.entry_id)
+                    await hass.async_block_till_done()
+                if cycle % args.sample_every == 0:
+                    samples.append(sample(hass, hub))
+                    print(f"cycle {cycle:>5} {samples[-1]}")
+
+            snapshot = tracemalloc.take_snapshot()
+            for entry in entries:
+                assert await hass.config_entries.async_unload(entry.entry_id)
+            await hass.async_block_till_done()
+            after_unload = sample(hass, hub)
+            await hass.async_stop(force=True)
+
+    await runner.cleanup()
+    dt_util.utcnow = original_utcnow
+    tracemalloc.stop()
+
+    print(f"\n{cycles} cycles in {time.perf_counter() - start:.1f}s")
+    print("Top allocations:")
+    for stat in snapshot.statistics("lineno")[:10]:
+        print(f"  {stat}")
+    print(f"After unload: {after_unload}")
+
+    failures = unbounded(samples, warmup=int(timedelta(days=1) / CYCLE) // args.sample_every)
+    for key in ("states", "coordinator_events", "hub_filters"):
+        if after_unload[key]:
+            failures.append(f"{key} left after unload: {after_unload[key]}")
+    if failures:
+        print("Unbounded growth:")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+    print("All tracked sizes are bounded")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
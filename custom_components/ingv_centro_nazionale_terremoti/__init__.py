@@ -2,18 +2,19 @@
 
 All credit goes to Malte Franken [@exxamalte].
 """
-import inspect
+import asyncio
+import heapq
 import logging
+import random
 import re
-from collections.abc import Callable
-from datetime import timedelta
-from importlib import import_module, util
-from urllib.parse import parse_qs, urlsplit
-
-from aio_quakeml_client.consts import UPDATE_ERROR, UPDATE_OK
-from aio_quakeml_ingv_centro_nazionale_terremoti_client import (
-    IngvCentroNazionaleTerremotiQuakeMLFeedManager,
-)
+import sqlite3
+import time
+from collections import Counter
+from collections.abc import Callable, Iterable, KeysView, ValuesView
+from datetime import datetime, timedelta
+from functools import partial
+from typing import TYPE_CHECKING, Any
+
 from homeassistant.config_entries import SOURCE_IMPORT, ConfigEntry
 from homeassistant.const import (
     CONF_LATITUDE,
@@ -21,42 +22,58 @@ from homeassistant.const import (
     CONF_LONGITUDE,
     CONF_RADIUS,
     CONF_SCAN_INTERVAL,
+    EVENT_HOMEASSISTANT_STOP,
     UnitOfLength,
 )
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
 from homeassistant.helpers import entity_registry as er
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.dispatcher import async_dispatcher_send
 from homeassistant.helpers.typing import ConfigType
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.util import dt as dt_util
 from homeassistant.util.unit_system import IMPERIAL_SYSTEM, METRIC_SYSTEM
 
 from .const import (
+    ALERT_DURATION,
+    ALERT_SCAN_INTERVAL,
+    CATALOG_FILE,
+    CONF_ALERT_MAGNITUDE,
+    CONF_CATALOG_DAYS,
+    CONF_FEED_FORMAT,
+    CONF_MAX_ENTITIES,
     CONF_MINIMUM_MAGNITUDE,
     CONF_START_TIME,
+    DEFAULT_ALERT_MAGNITUDE,
+    DEFAULT_CATALOG_DAYS,
+    DEFAULT_FEED_FORMAT,
+    DEFAULT_MAX_ENTITIES,
     DEFAULT_MINIMUM_MAGNITUDE,
     DEFAULT_RADIUS,
     DEFAULT_SCAN_INTERVAL,
     DEFAULT_START_TIME,
     DOMAIN,
     FEED,
+    LIVE_OPTIONS,
+    MAX_BACKOFF_INTERVAL,
     PLATFORMS,
+    PRIORITY_MARGIN,
+    PROFILE_FANOUT_TIMEOUT,
+    STATISTICS_WINDOW,
+    UPDATE_ERROR,
+    UPDATE_OK,
 )
+from .catalog import IngvCatalog
+from .hub import FeedFilter, StatusUpdate, async_get_hub, haversine_km
+from .metrics import RollingMetrics
+from .parser import IngvEvent
+from .services import async_setup_services
+from .statistics import EventStatistics
 
-_LOGGER = logging.getLogger(__name__)
-
+if TYPE_CHECKING:
+    from .geo_location import IngvGeolocationEvent
+    from .profiler import ProfileSession
 
-def _extract_event_id(external_id: str) -> str:
-    """Extract stable event id from a feed external id."""
-    query = urlsplit(external_id).query
-    if query:
-        parsed_query = parse_qs(query)
-        if parsed_event_id := parsed_query.get("eventId"):
-            if event_id := parsed_event_id[0]:
-                return event_id
-
-    fallback_event_id = external_id.rsplit("/", maxsplit=1)[-1]
-    return fallback_event_id or external_id
+_LOGGER = logging.getLogger(__name__)
 
 
 @callback
@@ -150,6 +167,15 @@ def _normalize_geo_entity_ids(
 
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Set up the INGV Earthquakes integration."""
+    async_setup_services(hass)
+    catalog = IngvCatalog(hass.config.path(CATALOG_FILE))
+    async_get_hub(hass).async_set_catalog(catalog)
+
+    async def _async_close_catalog(event: Event) -> None:
+        """Close the catalog database."""
+        await hass.async_add_executor_job(catalog.close)
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_close_catalog)
     if DOMAIN not in config:
         return True
 
@@ -185,15 +211,15 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up the INGV Earthquakes integration from a config entry."""
     hass.data.setdefault(DOMAIN, {})
     feeds = hass.data[DOMAIN].setdefault(FEED, {})
-    radius = entry.options.get(CONF_RADIUS, DEFAULT_RADIUS)
-    if hass.config.units is IMPERIAL_SYSTEM:
-        radius = METRIC_SYSTEM.length(radius, UnitOfLength.MILES)
-    await _async_preload_dateparser(hass)
+    radius = _radius_in_km(hass, entry)
+    await async_get_hub(hass).async_load()
     # Create feed entity coordinator for all platforms.
     coordinator = IngvDataUpdateCoordinator(hass=hass, entry=entry, radius_in_km=radius)
+    coordinator.async_restore()
+    await coordinator.async_seed_statistics()
+    coordinator.async_build_registry_index()
     feeds[entry.entry_id] = coordinator
     _LOGGER.debug("Feed entity coordinator added for %s", entry.entry_id)
-    _normalize_geo_entity_ids(hass, entry)
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     entry.async_on_unload(entry.add_update_listener(async_reload_entry))
@@ -204,7 +230,7 @@ async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Migrate config entry."""
     _LOGGER.debug("Migrating %s from version %s", entry.entry_id, entry.version)
 
-    if entry.version > 2:
+    if entry.version > 3:
         _LOGGER.error(
             "Cannot migrate %s from unsupported version %s",
             entry.entry_id,
@@ -219,6 +245,12 @@ async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.config_entries.async_update_entry(entry, version=2)
         migrated_version = 2
 
+    if entry.version < 3:
+        # Normalization used to run on every setup and first refresh.
+        _normalize_geo_entity_ids(hass, entry)
+        hass.config_entries.async_update_entry(entry, version=3)
+        migrated_version = 3
+
     _LOGGER.info("Migration to version %s successful", migrated_version)
     return True
 
@@ -230,21 +262,25 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Forget persisted data of a removed config entry."""
+    async_get_hub(hass).async_remove_status(entry.entry_id)
+
+
 async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Handle an options update."""
+    """Handle an options update, in place when possible."""
+    coordinator = hass.data[DOMAIN][FEED].get(entry.entry_id)
+    if coordinator is not None and coordinator.async_apply_options():
+        return
     await hass.config_entries.async_reload(entry.entry_id)
 
 
-async def _async_preload_dateparser(hass: HomeAssistant) -> None:
-    """Preload dateparser data to avoid blocking imports in the event loop."""
-    language = hass.config.language or "en"
-    module_names = [f"dateparser.data.date_translation_data.{language}"]
-    if language != "en":
-        module_names.append("dateparser.data.date_translation_data.en")
-    for module_name in module_names:
-        if util.find_spec(module_name) is None:
-            continue
-        await hass.async_add_executor_job(import_module, module_name)
+def _radius_in_km(hass: HomeAssistant, entry: ConfigEntry) -> float:
+    """Return the radius option of an entry in kilometers."""
+    radius = entry.options.get(CONF_RADIUS, DEFAULT_RADIUS)
+    if hass.config.units is IMPERIAL_SYSTEM:
+        radius = METRIC_SYSTEM.length(radius, UnitOfLength.MILES)
+    return radius
 
 
 class IngvDataUpdateCoordinator(DataUpdateCoordinator):
@@ -261,158 +297,605 @@ class IngvDataUpdateCoordinator(DataUpdateCoordinator):
         )
         start_time = entry.options.get(CONF_START_TIME, DEFAULT_START_TIME)
         scan_interval = entry.options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
-        coordinates = (
-            entry.data[CONF_LATITUDE],
-            entry.data[CONF_LONGITUDE],
-        )
-        websession = async_get_clientsession(hass)
-        self._feed_manager = IngvCentroNazionaleTerremotiQuakeMLFeedManager(
-            websession=websession,
-            coordinates=coordinates,
-            filter_radius=radius_in_km,
-            filter_minimum_magnitude=minimum_magnitude,
+        self._feed_filter = FeedFilter(
+            latitude=entry.data[CONF_LATITUDE],
+            longitude=entry.data[CONF_LONGITUDE],
+            radius=radius_in_km,
+            minimum_magnitude=minimum_magnitude,
             starttime_delta=timedelta(hours=start_time),
-            generate_async_callback=self._generate_entity,
-            update_async_callback=self._update_entity,
-            remove_async_callback=self._remove_entity,
-            status_async_callback=self._status_update,
         )
+        self._hub = async_get_hub(hass)
+        self._hub.async_register(
+            entry.entry_id,
+            self._feed_filter,
+            entry.options.get(CONF_FEED_FORMAT, DEFAULT_FEED_FORMAT),
+            entry.options.get(CONF_CATALOG_DAYS, DEFAULT_CATALOG_DAYS),
+        )
+        self._max_entities = entry.options.get(CONF_MAX_ENTITIES, DEFAULT_MAX_ENTITIES)
+        self._alert_magnitude = entry.options.get(
+            CONF_ALERT_MAGNITUDE, DEFAULT_ALERT_MAGNITUDE
+        )
+        self._alert_time: datetime | None = None
+        self._base_interval = timedelta(seconds=scan_interval)
+        self._failures = 0
         self._entry_id = entry.entry_id
-        self._status_info = None
-        self._active_event_ids: set[str] = set()
-        self._pending_removed_event_ids: set[str] = set()
-        self._event_id_to_external_id: dict[str, str] = {}
-        self._is_unloading = False
-        self._entity_ids_normalized = False
+        # Entry settings applied so far, to tell what an update changed.
+        self._applied = (entry.title, dict(entry.data), dict(entry.options))
+        self._status_info: StatusUpdate | None = None
+        self._last_update_successful = None
+        self._events: dict[str, IngvEvent] = {}
+        self._active_events: dict[str, IngvEvent] = {}
+        self._entities: dict[str, "IngvGeolocationEvent"] = {}
+        # Events whose entity was dispatched in a batch but is not added yet.
+        self._pending_entities: set[str] = set()
+        # Set while no dispatched entity is waiting to be added.
+        self._entities_added = asyncio.Event()
+        self._entities_added.set()
+        self._registry_index: dict[str, str] = {}
+        self._registry_pruned = False
+        self._hub_generation: int | None = None
+        self._expires_at: datetime | None = None
+        self.counters: Counter[str] = Counter()
+        self.metrics = RollingMetrics()
+        self.statistics = EventStatistics()
+        self._profile_session: "ProfileSession | None" = None
+        # Availability last written by the geolocation entities.
+        self._entities_available = True
         self.listeners: list[Callable[[], None]] = []
         super().__init__(
             hass=hass,
             logger=_LOGGER,
             name=f"{DOMAIN}-{entry.data[CONF_LOCATION]}",
             update_method=self.async_update,
-            update_interval=timedelta(seconds=scan_interval),
+            update_interval=self._base_interval,
         )
 
-    async def async_update(self) -> None:
-        """Refresh data."""
-        self._pending_removed_event_ids.clear()
-        if inspect.iscoroutinefunction(self._feed_manager.update):
-            await self._feed_manager.update()
-        else:
-            await self.hass.async_add_executor_job(self._feed_manager.update)
+    async def async_update(self) -> dict[str, IngvEvent]:
+        """Refresh data, profiling the cycle when a profile session asks for it."""
+        if (session := self._profile_session) is None:
+            return await self._async_update()
+        async with session.async_cycle(self):
+            events = await self._async_update()
+            await self._async_wait_for_entities()
+        return events
 
-        status = self._status_info.status if self._status_info else None
+    async def _async_update(self) -> dict[str, IngvEvent]:
+        """Refresh data."""
+        # Share one fetch between coordinators polling within half an interval.
+        status, events = await self._hub.async_fetch(
+            self.update_interval.total_seconds() / 2
+        )
+        # Everything below runs on the event loop without awaiting.
+        start = time.perf_counter()
+        if status == UPDATE_OK and self._is_unchanged():
+            self._async_skip_update(status)
+            self.metrics.record("loop_ms", (time.perf_counter() - start) * 1000)
+            return self._events
+
+        self.counters["updates"] += 1
+        created = updated = removed = 0
         if status == UPDATE_OK:
-            if not self._entity_ids_normalized:
-                _normalize_geo_entity_ids(self.hass, self.entry)
-                self._entity_ids_normalized = True
-
-            current_feed_event_ids = {
-                _extract_event_id(external_id)
-                for external_id in self._feed_manager.feed_entries
-            }
-            stale_event_ids = self._active_event_ids.difference(
-                current_feed_event_ids
-            )
-            remove_event_ids = self._pending_removed_event_ids.union(stale_event_ids)
-            for event_id in remove_event_ids:
-                # Ignore transient remove/create transitions of the same event.
-                if event_id in current_feed_event_ids:
-                    continue
-                if event_id in self._active_event_ids:
-                    async_dispatcher_send(self.hass, f"{DOMAIN}_delete_{event_id}")
-                    self._active_event_ids.discard(event_id)
-                    self._event_id_to_external_id.pop(event_id, None)
-            for external_id in self._feed_manager.feed_entries:
-                event_id = _extract_event_id(external_id)
-                self._event_id_to_external_id[event_id] = external_id
-            self._cleanup_stale_geo_entities(current_feed_event_ids)
+            created, updated, removed = self._async_apply_events(events or [])
+            self._last_update_successful = dt_util.utcnow()
+            self._failures = 0
         elif status == UPDATE_ERROR:
+            self._failures += 1
             _LOGGER.debug(
                 "Feed update failed; keeping %s active entities",
-                len(self._active_event_ids),
+                len(self._active_events),
             )
 
-        self._pending_removed_event_ids.clear()
-        _LOGGER.debug("Feed entity coordinator updated")
-        return self._feed_manager.feed_entries
+        self._status_info = StatusUpdate(
+            status=status,
+            last_update=dt_util.utcnow(),
+            last_update_successful=self._last_update_successful,
+            last_timestamp=max(
+                (event.time for event in self._events.values() if event.time),
+                default=None,
+            ),
+            total=len(self._events),
+            created=created,
+            updated=updated,
+            removed=removed,
+        )
+        self._hub.async_set_status(self._entry_id, self._status_info)
+        self.update_interval = self._next_interval()
+        self.metrics.record("loop_ms", (time.perf_counter() - start) * 1000)
+        _LOGGER.debug(
+            "Feed entity coordinator updated, next update in %s", self.update_interval
+        )
+        return self._events
+
+    @callback
+    def async_get_diagnostics(self) -> dict[str, Any]:
+        """Return the state and performance metrics of the coordinator."""
+        return {
+            "events": len(self._events),
+            "active_events": len(self._active_events),
+            "entities": len(self._entities),
+            "registry_index": len(self._registry_index),
+            "update_interval": self.update_interval.total_seconds(),
+            "failures": self._failures,
+            "status": self._status_info.as_dict() if self._status_info else None,
+            "counters": dict(self.counters),
+            "metrics": self.metrics.summary(),
+        }
+
+    @callback
+    def _async_apply_events(self, events: list[IngvEvent]) -> tuple[int, int, int]:
+        """Filter the hub's events and bring the entities in line with them.
+
+        Return the number of entities created, updated and removed.
+        """
+        self._hub_generation = self._hub.generation
+        previous_events = self._active_events
+        previous_filtered = self._events
+        with self.metrics.timer("filter_ms"):
+            self._events, changed_events = self._filter_events(events)
+            self._active_events = self._select_active_events(self._events)
+        with self.metrics.timer("statistics_ms"):
+            self._update_statistics(
+                changed_events,
+                [
+                    previous_filtered[event_id]
+                    for event_id in previous_filtered.keys() - self._events.keys()
+                ],
+            )
+        self._expires_at = self._next_expiry()
+        dispatch_start = time.perf_counter()
+        stale_event_ids = previous_events.keys() - self._active_events.keys()
+        removed = len(stale_event_ids)
+        if not self._registry_pruned:
+            # Registry entities left over from before the restart.
+            stale_event_ids |= self._registry_index.keys() - self._active_events.keys()
+            self._registry_pruned = True
+        new_event_ids = []
+        revised_event_ids = []
+        for event_id, event in self._active_events.items():
+            if (previous_event := previous_events.get(event_id)) is None:
+                new_event_ids.append(event_id)
+            elif previous_event is not event:
+                revised_event_ids.append(event_id)
+            else:
+                continue
+            self._track_alert(event)
+        created = len(new_event_ids)
+        updated = len(revised_event_ids)
+        registry_removals = callbacks = 0
+        if stale_event_ids:
+            registry_removals = self._async_remove_entities(stale_event_ids)
+        # Only entities whose event was revised are refreshed.
+        for event_id in revised_event_ids:
+            if entity := self._entities.get(event_id):
+                entity.async_handle_event_update()
+                callbacks += 1
+        if new_event_ids:
+            self.async_generate_entities(new_event_ids)
+        self.metrics.record(
+            "dispatch_ms", (time.perf_counter() - dispatch_start) * 1000
+        )
+        for name, value in (
+            ("created", created),
+            ("updated", updated),
+            ("removed", removed),
+            ("callbacks", callbacks),
+            ("registry_removals", registry_removals),
+        ):
+            self.metrics.record(name, value)
+        return created, updated, removed
+
+    @callback
+    def async_apply_options(self) -> bool:
+        """Apply updated options in place, return False if a reload is needed.
+
+        Cached events are filtered again, so tightened filters only remove the
+        entities of events that no longer match. Widened filters make the hub
+        fetch the widened part, and a refresh picks up its events. Entities of
+        events that still match are left untouched.
+
+        Before the first refresh the entry is reloaded instead, since applying
+        the restored events would also prune its registry entities.
+        """
+        entry = self.entry
+        title, data, options = self._applied
+        changed = {
+            key
+            for key in options.keys() | entry.options.keys()
+            if options.get(key) != entry.options.get(key)
+        }
+        if entry.title != title or entry.data != data or changed - LIVE_OPTIONS:
+            return False
+        if changed and not self._registry_pruned:
+            return False
+        self._applied = (title, data, dict(entry.options))
+        if not changed:
+            return True
+
+        _LOGGER.debug("Applying changed options %s to %s", changed, self._entry_id)
+        self._feed_filter = self._feed_filter._replace(
+            radius=_radius_in_km(self.hass, entry),
+            minimum_magnitude=entry.options.get(
+                CONF_MINIMUM_MAGNITUDE, DEFAULT_MINIMUM_MAGNITUDE
+            ),
+            starttime_delta=timedelta(
+                hours=entry.options.get(CONF_START_TIME, DEFAULT_START_TIME)
+            ),
+        )
+        self._hub.async_register(
+            self._entry_id,
+            self._feed_filter,
+            entry.options.get(CONF_FEED_FORMAT, DEFAULT_FEED_FORMAT),
+            entry.options.get(CONF_CATALOG_DAYS, DEFAULT_CATALOG_DAYS),
+        )
+        self._max_entities = entry.options.get(CONF_MAX_ENTITIES, DEFAULT_MAX_ENTITIES)
+        self._alert_magnitude = entry.options.get(
+            CONF_ALERT_MAGNITUDE, DEFAULT_ALERT_MAGNITUDE
+        )
+        self._base_interval = timedelta(
+            seconds=entry.options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
+        )
+
+        created, updated, removed = self._async_apply_events(self._hub.events)
+        self._alert_time = None
+        for event in self._events.values():
+            self._track_alert(event)
+        if self._status_info is not None:
+            self._status_info = self._status_info._replace(
+                total=len(self._events),
+                created=created,
+                updated=updated,
+                removed=removed,
+            )
+            self._hub.async_set_status(self._entry_id, self._status_info)
+        self.update_interval = self._next_interval()
+        self.async_update_listeners()
+        if self._hub.fetch_pending or CONF_SCAN_INTERVAL in changed:
+            # Refreshing also reschedules the next refresh.
+            self.hass.async_create_task(self.async_request_refresh())
+        return True
+
+    async def _async_wait_for_entities(self) -> None:
+        """Wait until every dispatched entity is added, or time out.
+
+        Disabled entities are never added, so the wait is bounded.
+        """
+        try:
+            async with asyncio.timeout(PROFILE_FANOUT_TIMEOUT):
+                await self._entities_added.wait()
+        except TimeoutError:
+            _LOGGER.debug(
+                "Timed out waiting for %s entities", len(self._pending_entities)
+            )
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update listeners, and every live entity when availability flipped.
+
+        Geolocation entities are not listeners, so unchanged entities are not
+        called back on every refresh.
+        """
+        super().async_update_listeners()
+        if self.last_update_success == self._entities_available:
+            return
+        self._entities_available = self.last_update_success
+        for entity in self._entities.values():
+            entity.async_write_ha_state()
+        self.counters["availability_writes"] += len(self._entities)
+
+    @callback
+    def async_set_profile_session(self, session: "ProfileSession | None") -> None:
+        """Profile the next update cycles in a session, or stop profiling."""
+        self._profile_session = session
+
+    def _is_unchanged(self) -> bool:
+        """Return whether the last update still holds for the hub's events."""
+        return (
+            self._status_info is not None
+            and self._registry_pruned
+            and self._hub_generation == self._hub.generation
+            and (self._expires_at is None or dt_util.utcnow() < self._expires_at)
+        )
+
+    @callback
+    def _async_skip_update(self, status: str) -> None:
+        """Record a successful update that found nothing new."""
+        self.counters["skipped_updates"] += 1
+        now = dt_util.utcnow()
+        self._last_update_successful = now
+        self._failures = 0
+        self.statistics.expire(now - STATISTICS_WINDOW)
+        self._status_info = self._status_info._replace(
+            status=status,
+            last_update=now,
+            last_update_successful=now,
+            created=0,
+            updated=0,
+            removed=0,
+        )
+        self._hub.async_set_status(self._entry_id, self._status_info)
+        self.update_interval = self._next_interval()
+        _LOGGER.debug("Feed unchanged, next update in %s", self.update_interval)
+
+    def _next_expiry(self) -> datetime | None:
+        """Return when the oldest event leaves this entry's start time window."""
+        oldest = min(
+            (event.time for event in self._events.values() if event.time),
+            default=None,
+        )
+        if oldest is None:
+            return None
+        return oldest + self._feed_filter.starttime_delta
+
+    @callback
+    def async_restore(self) -> None:
+        """Restore events and status persisted by the feed hub."""
+        self._events, changed_events = self._filter_events(self._hub.events)
+        self._active_events = self._select_active_events(self._events)
+        self._update_statistics(changed_events, ())
+        for event in self._events.values():
+            self._track_alert(event)
+        self.update_interval = self._next_interval()
+        if status_info := self._hub.async_get_status(self._entry_id):
+            self._status_info = status_info._replace(total=len(self._events))
+            self._last_update_successful = status_info.last_update_successful
+        _LOGGER.debug("Restored %s events for %s", len(self._events), self._entry_id)
+
+    async def async_seed_statistics(self) -> None:
+        """Count the catalog events older than the entry's start time window."""
+        feed_filter = self._feed_filter
+        if (
+            catalog := self._hub.catalog
+        ) is None or feed_filter.starttime_delta >= STATISTICS_WINDOW:
+            return
+        now = dt_util.utcnow()
+        try:
+            events = await self.hass.async_add_executor_job(
+                partial(
+                    catalog.query,
+                    latitude=feed_filter.latitude,
+                    longitude=feed_filter.longitude,
+                    radius=feed_filter.radius,
+                    minimum_magnitude=feed_filter.minimum_magnitude,
+                    start=now - STATISTICS_WINDOW,
+                    end=now - feed_filter.starttime_delta,
+                )
+            )
+        except sqlite3.Error as err:
+            _LOGGER.warning("Unable to read the event catalog: %s", err)
+            return
+        self.statistics.seed(events)
+        _LOGGER.debug("Seeded statistics with %s catalog events", len(events))
+
+    def _update_statistics(
+        self, changed_events: list[IngvEvent], removed_events: Iterable[IngvEvent]
+    ) -> None:
+        """Adjust the statistics to the new, revised and removed events."""
+        now = dt_util.utcnow()
+        starttime = now - self._feed_filter.starttime_delta
+        statistics = self.statistics
+        for event in removed_events:
+            statistics.remove(
+                event.event_id,
+                expired=event.time is not None and event.time < starttime,
+            )
+        for event in changed_events:
+            statistics.add(event)
+        statistics.expire(now - STATISTICS_WINDOW)
+
+    def _filter_events(
+        self, events: list[IngvEvent]
+    ) -> tuple[dict[str, IngvEvent], list[IngvEvent]]:
+        """Apply this entry's distance, magnitude and start time filters.
+
+        Records of unchanged events are reused as they are, so only new and
+        revised events are filtered by distance and copied. A large store is
+        filtered by the hub's vectorized engine, which matches the events of
+        every entry in one pass; events then mirrors the hub's store.
+
+        Return the matching events, and the records of the new and revised
+        ones among them.
+        """
+        feed_filter = self._feed_filter
+        starttime = dt_util.utcnow() - feed_filter.starttime_delta
+        filtered: dict[str, IngvEvent] = {}
+        changed: list[IngvEvent] = []
+        matches = self._hub.async_match_events(self._entry_id, starttime)
+        if matches is not None:
+            for distance, event in matches:
+                existing = self._events.get(event.event_id)
+                if existing is not None and existing.revision == event.revision:
+                    filtered[event.event_id] = existing
+                else:
+                    filtered[event.event_id] = localized = event.localize(distance)
+                    changed.append(localized)
+            return filtered, changed
+        for event in events:
+            if event.time is not None and event.time < starttime:
+                continue
+            existing = self._events.get(event.event_id)
+            if existing is not None and existing.revision == event.revision:
+                # Options may have tightened since the record was filtered.
+                if (
+                    existing.magnitude >= feed_filter.minimum_magnitude
+                    and existing.distance <= feed_filter.radius
+                ):
+                    filtered[event.event_id] = existing
+                continue
+            if event.latitude is None or event.longitude is None:
+                continue
+            magnitude = event.magnitude
+            if magnitude is None or magnitude < feed_filter.minimum_magnitude:
+                continue
+            distance = haversine_km(
+                feed_filter.latitude,
+                feed_filter.longitude,
+                event.latitude,
+                event.longitude,
+            )
+            if distance > feed_filter.radius:
+                continue
+            filtered[event.event_id] = localized = event.localize(distance)
+            changed.append(localized)
+        return filtered, changed
+
+    def _select_active_events(
+        self, events: dict[str, IngvEvent]
+    ) -> dict[str, IngvEvent]:
+        """Return the events that get an entity, within the entity budget.
+
+        Events are ranked by magnitude, closeness and recency: one magnitude
+        unit weighs as much as the whole radius or the whole start time window.
+        Events left out stay in the coordinator and are promoted back as soon
+        as they rank high enough.
+        """
+        if not self._max_entities or len(events) <= self._max_entities:
+            return events
+
+        feed_filter = self._feed_filter
+        now = dt_util.utcnow()
+        window = feed_filter.starttime_delta.total_seconds() or 1.0
+        radius = feed_filter.radius or 1.0
+        active_events = self._active_events
+
+        def priority(event: IngvEvent) -> float:
+            age = (now - event.time).total_seconds() if event.time else window
+            closeness = 1.0 - min((event.distance or 0.0) / radius, 1.0)
+            recency = 1.0 - min(max(age, 0.0) / window, 1.0)
+            score = (event.magnitude or 0.0) + closeness + recency
+            if event.event_id in active_events:
+                score += PRIORITY_MARGIN
+            return score
+
+        selected = heapq.nlargest(self._max_entities, events.values(), key=priority)
+        _LOGGER.debug(
+            "Entity budget of %s reached, %s events have no entity",
+            self._max_entities,
+            len(events) - len(selected),
+        )
+        return {event.event_id: event for event in selected}
+
+    def _track_alert(self, event: IngvEvent) -> None:
+        """Remember the latest event strong enough to speed up polling."""
+        if (
+            self._alert_magnitude
+            and event.magnitude is not None
+            and event.magnitude >= self._alert_magnitude
+            and event.time is not None
+            and (self._alert_time is None or event.time > self._alert_time)
+        ):
+            self._alert_time = event.time
+
+    def _next_interval(self) -> timedelta:
+        """Return the delay before the next refresh.
+
+        Failed refreshes back off exponentially with jitter, and never retry
+        before a throttled service allows it. After a strong event the interval
+        drops to ``ALERT_SCAN_INTERVAL`` and then grows linearly back to the
+        configured one over ``ALERT_DURATION``.
+        """
+        if self._failures:
+            backoff = min(
+                self._base_interval * 2 ** min(self._failures, 10),
+                max(MAX_BACKOFF_INTERVAL, self._base_interval),
+            )
+            interval = backoff * random.uniform(0.5, 1.0)
+            if retry_after := self._hub.retry_after:
+                interval = max(interval, timedelta(seconds=retry_after))
+            return interval
+
+        if self._alert_time is None or self._base_interval <= ALERT_SCAN_INTERVAL:
+            return self._base_interval
+        elapsed = dt_util.utcnow() - self._alert_time
+        if elapsed >= ALERT_DURATION:
+            return self._base_interval
+        fraction = max(elapsed, timedelta(0)) / ALERT_DURATION
+        span = self._base_interval - ALERT_SCAN_INTERVAL
+        return ALERT_SCAN_INTERVAL + span * fraction
 
     async def async_stop(self) -> None:
         """Stop this feed entity coordinator from refreshing."""
-        self._is_unloading = True
+        self._hub.async_unregister(self._entry_id)
+        if self._profile_session is not None:
+            self._profile_session.async_discard(self)
         for unsub_dispatcher in self.listeners:
             unsub_dispatcher()
         self.listeners = []
-        self._pending_removed_event_ids.clear()
-        self._active_event_ids.clear()
-        self._event_id_to_external_id.clear()
+        self._entities = {}
+        self._pending_entities = set()
+        self._entities_added.set()
+        self._active_events = {}
+        self._events = {}
+        self.statistics = EventStatistics()
         _LOGGER.debug("Feed entity coordinator stopped")
 
     @property
-    def is_unloading(self) -> bool:
-        """Return whether the config entry is unloading/reloading."""
-        return self._is_unloading
+    def active_event_ids(self) -> KeysView[str]:
+        """Return the event ids that currently have an entity."""
+        return self._active_events.keys()
+
+    @property
+    def events(self) -> ValuesView[IngvEvent]:
+        """Return all events matching this entry, with or without an entity."""
+        return self._events.values()
 
     @callback
     def async_event_new_entity(self) -> str:
         """Return coordinator specific event to signal new entity."""
         return f"{DOMAIN}_new_geolocation_{self._entry_id}"
 
-    def get_entry(self, external_id):
-        """Get feed entry by external id."""
-        resolved_external_id = self._event_id_to_external_id.get(
-            external_id, external_id
-        )
-        return self._feed_manager.feed_entries.get(resolved_external_id)
+    @callback
+    def async_add_entity(
+        self, event_id: str, entity: "IngvGeolocationEvent"
+    ) -> CALLBACK_TYPE:
+        """Track the live entity of an event for revisions and removal."""
+        self._discard_pending(event_id)
+        self._entities[event_id] = entity
 
-    def entry_available(self, external_id) -> bool:
-        """Get feed entry by external id."""
-        resolved_external_id = self._event_id_to_external_id.get(
-            external_id, external_id
-        )
-        return self._feed_manager.feed_entries.get(resolved_external_id) is not None
+        @callback
+        def remove_entity() -> None:
+            """Stop tracking the entity."""
+            if self._entities.get(event_id) is entity:
+                del self._entities[event_id]
+
+        return remove_entity
+
+    def get_entry(self, event_id: str) -> IngvEvent | None:
+        """Get event by event id."""
+        return self._events.get(event_id)
+
+    def entry_available(self, event_id: str) -> bool:
+        """Return whether the event still has an entity."""
+        return event_id in self._active_events
 
     def status_info(self):
         """Return latest status update info received."""
         return self._status_info
 
-    async def _generate_entity(self, external_id: str) -> None:
-        """Generate new entity."""
-        event_id = _extract_event_id(external_id)
-        self._event_id_to_external_id[event_id] = external_id
-        if event_id in self._active_event_ids:
-            _LOGGER.debug(
-                "Skipping duplicate geolocation creation for event: %s", event_id
-            )
-            return
-
-        self._active_event_ids.add(event_id)
-        _LOGGER.debug("New entry received for event: %s", event_id)
+    @callback
+    def async_generate_entities(self, event_ids: list[str]) -> None:
+        """Generate the entities of all new events in a single batch."""
+        _LOGGER.debug("New entries received for events: %s", event_ids)
+        if event_ids:
+            self._pending_entities.update(event_ids)
+            self._entities_added.clear()
         async_dispatcher_send(
             self.hass,
             self.async_event_new_entity(),
             self,
             self.entry.unique_id,
-            event_id,
+            event_ids,
         )
 
-    async def _update_entity(self, external_id: str) -> None:
-        """Ignore update call; this is handled by the coordinator."""
-
-    async def _remove_entity(self, external_id: str) -> None:
-        """Queue entity removal and process it after update status is known."""
-        event_id = _extract_event_id(external_id)
-        _LOGGER.debug("Remove received for event: %s", event_id)
-        self._pending_removed_event_ids.add(event_id)
-
-    async def _status_update(self, status_info) -> None:
-        """Store status update."""
-        _LOGGER.debug("Status update received: %s", status_info)
-        self._status_info = status_info
+    @callback
+    def _discard_pending(self, event_id: str) -> None:
+        """Stop waiting for the entity of an event."""
+        self._pending_entities.discard(event_id)
+        if not self._pending_entities:
+            self._entities_added.set()
 
     @callback
-    def _cleanup_stale_geo_entities(self, current_feed_event_ids: set[str]) -> None:
-        """Remove stale geo_location registry entities not present in current feed."""
+    def async_build_registry_index(self) -> None:
+        """Index this entry's geo_location registry entities by event id, once."""
         if not self.entry.unique_id:
             return
 
@@ -428,14 +911,43 @@ class IngvDataUpdateCoordinator(DataUpdateCoordinator):
             unique_id = registry_entry.unique_id or ""
             if not unique_id.startswith(unique_id_prefix):
                 continue
+            if event_id := unique_id[len(unique_id_prefix) :]:
+                self._registry_index[event_id] = registry_entry.entity_id
 
-            event_id = unique_id[len(unique_id_prefix) :]
-            if not event_id or event_id in current_feed_event_ids:
-                continue
+    @callback
+    def async_index_entity(self, event_id: str, entity_id: str) -> None:
+        """Record the registry entity created for an event."""
+        self._registry_index[event_id] = entity_id
 
-            _LOGGER.debug(
-                "Removing stale geolocation registry entity %s (event %s not in feed)",
-                registry_entry.entity_id,
-                event_id,
-            )
-            entity_registry.async_remove(registry_entry.entity_id)
+    @callback
+    def async_remove_orphan(self, event_id: str) -> None:
+        """Remove an entity added after its event left the feed."""
+        self._async_remove_entities([event_id])
+
+    @callback
+    def _async_remove_entities(self, stale_event_ids: Iterable[str]) -> int:
+        """Tear down the entities of events that are no longer in the feed.
+
+        Removing a registry entry also removes its live entity; entities
+        without a registry entry are removed directly. Return the number of
+        registry entries removed.
+
+        Entries are removed one at a time, as the entity registry has no bulk
+        removal: each removal fires the registry update event its live entity
+        listens to in order to remove itself, so one grouped notification would
+        leave the entities behind. The registry file itself is saved once,
+        since the registry delays and coalesces its saves.
+        """
+        _LOGGER.debug("Removing entities of events: %s", stale_event_ids)
+        entity_registry = er.async_get(self.hass)
+        registry_removals = 0
+        for event_id in stale_event_ids:
+            self._discard_pending(event_id)
+            entity = self._entities.pop(event_id, None)
+            entity_id = self._registry_index.pop(event_id, None)
+            if entity_id is not None and entity_id in entity_registry.entities:
+                entity_registry.async_remove(entity_id)
+                registry_removals += 1
+            elif entity is not None:
+                self.hass.async_create_task(entity.async_remove(force_remove=True))
+        return registry_removals
@@ -0,0 +1,318 @@
+"""Local SQLite catalog of the events ingested by the feed hub.
+
+The ``events`` table holds the latest revision of every event and is indexed
+by time, magnitude and a one degree grid cell, so time, magnitude and radius
+queries never scan the whole catalog. The exact radius test runs in SQL too,
+so a query only reads the rows it returns. The ``revisions`` table keeps every
+distinct revision of an event as it was received.
+
+All methods block and are meant to run in the executor. A lock serializes
+them because executor threads share one connection.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable
+from datetime import datetime, timezone
+from typing import Any
+
+from .parser import IngvEvent
+from .spatial import bounding_box, haversine_km
+
+_LOGGER = logging.getLogger(__name__)
+
+# Queries spanning more grid cells than this do not use the cell index.
+MAX_QUERY_CELLS = 400
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    event_id TEXT PRIMARY KEY,
+    time REAL,
+    latitude REAL,
+    longitude REAL,
+    depth REAL,
+    magnitude REAL,
+    status TEXT,
+    mode TEXT,
+    region TEXT,
+    updated REAL,
+    cell INTEGER
+);
+CREATE INDEX IF NOT EXISTS events_time ON events (time);
+CREATE INDEX IF NOT EXISTS events_magnitude ON events (magnitude, time);
+CREATE INDEX IF NOT EXISTS events_cell ON events (cell, time);
+CREATE TABLE IF NOT EXISTS revisions (
+    event_id TEXT NOT NULL,
+    received REAL NOT NULL,
+    time REAL,
+    latitude REAL,
+    longitude REAL,
+    depth REAL,
+    magnitude REAL,
+    status TEXT,
+    mode TEXT,
+    region TEXT,
+    updated REAL
+);
+CREATE INDEX IF NOT EXISTS revisions_event_id ON revisions (event_id, received);
+"""
+
+COLUMNS = (
+    "time",
+    "latitude",
+    "longitude",
+    "depth",
+    "magnitude",
+    "status",
+    "mode",
+    "region",
+    "updated",
+)
+
+
+def grid_cell(latitude: float | None, longitude: float | None) -> int | None:
+    """Return the one degree grid cell of a location."""
+    if latitude is None or longitude is None:
+        return None
+    row = min(int(math.floor(latitude + 90)), 179)
+    column = int(math.floor(longitude + 180)) % 360
+    return row * 360 + column
+
+
+def grid_cells(latitude: float, longitude: float, radius: float) -> list[int] | None:
+    """Return the grid cells within radius km of a location, None if too many."""
+    if (box := bounding_box(latitude, longitude, radius)) is None:
+        return None
+    south, north, west, east = box
+    rows = range(math.floor(south + 90), math.floor(north + 90) + 1)
+    columns = range(math.floor(west + 180), math.floor(east + 180) + 1)
+    if len(rows) * len(columns) > MAX_QUERY_CELLS:
+        return None
+    return [row * 360 + column % 360 for row in rows for column in columns]
+
+
+def _distance(
+    latitude_1: float,
+    longitude_1: float,
+    latitude_2: float | None,
+    longitude_2: float | None,
+) -> float | None:
+    """Return the distance in km between two points, None if one is unknown."""
+    if latitude_2 is None or longitude_2 is None:
+        return None
+    return haversine_km(latitude_1, longitude_1, latitude_2, longitude_2)
+
+
+def _timestamp(value: datetime | None) -> float | None:
+    """Return a datetime as seconds since the epoch."""
+    return value.timestamp() if value else None
+
+
+def _datetime(value: float | None) -> datetime | None:
+    """Return seconds since the epoch as a UTC datetime."""
+    if value is None:
+        return None
+    return datetime.fromtimestamp(value, timezone.utc)
+
+
+class IngvCatalog:
+    """SQLite catalog of events and their revisions."""
+
+    def __init__(self, path: str) -> None:
+        """Initialize the catalog; the database is opened on first use."""
+        self._path = path
+        self._lock = threading.Lock()
+        self._connection: sqlite3.Connection | None = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return the connection, creating the database if needed."""
+        if self._connection is None:
+            connection = sqlite3.connect(self._path, check_same_thread=False)
+            # Must be set before the first table is created to take effect.
+            connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            connection.create_function("distance", 4, _distance, deterministic=True)
+            connection.executescript(SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    def write(self, events: Iterable[IngvEvent], received: datetime) -> int:
+        """Store a batch of events, return how many new revisions were stored."""
+        rows = [
+            (
+                event.event_id,
+                _timestamp(event.time),
+                event.latitude,
+                event.longitude,
+                event.depth,
+                event.magnitude,
+                event.status,
+                event.mode,
+                event.region,
+                _timestamp(event.updated),
+                grid_cell(event.latitude, event.longitude),
+            )
+            for event in events
+        ]
+        unchanged = " AND ".join(f"{column} IS ?" for column in COLUMNS)
+        with self._lock, self._connect() as connection:
+            before = connection.total_changes
+            # Only revisions that differ from the stored event are appended.
+            connection.executemany(
+                f"""
+                INSERT INTO revisions (event_id, received, {", ".join(COLUMNS)})
+                SELECT ?, ?, {", ".join("?" for _ in COLUMNS)}
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM events WHERE event_id = ? AND {unchanged}
+                )
+                """,
+                (
+                    (row[0], received.timestamp(), *row[1:10], row[0], *row[1:10])
+                    for row in rows
+                ),
+            )
+            revisions = connection.total_changes - before
+            connection.executemany(
+                f"""
+                INSERT OR REPLACE INTO events (event_id, {", ".join(COLUMNS)}, cell)
+                VALUES ({", ".join("?" for _ in range(len(COLUMNS) + 2))})
+                """,
+                rows,
+            )
+        return revisions
+
+    def compact(self, older_than: datetime) -> int:
+        """Drop events that happened before a time, return how many."""
+        cutoff = older_than.timestamp()
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                removed = connection.execute(
+                    "DELETE FROM events WHERE time < ?", (cutoff,)
+                ).rowcount
+                connection.execute("DELETE FROM revisions WHERE time < ?", (cutoff,))
+            connection.execute("PRAGMA incremental_vacuum")
+            connection.execute("PRAGMA optimize")
+        return removed
+
+    @staticmethod
+    def _where(
+        latitude: float | None = None,
+        longitude: float | None = None,
+        radius: float | None = None,
+        minimum_magnitude: float | None = None,
+        maximum_magnitude: float | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> tuple[str, list[Any]]:
+        """Return the WHERE clause matching some criteria and its parameters."""
+        conditions = []
+        parameters: list[Any] = []
+        if start is not None:
+            conditions.append("time >= ?")
+            parameters.append(start.timestamp())
+        if end is not None:
+            conditions.append("time <= ?")
+            parameters.append(end.timestamp())
+        if minimum_magnitude is not None:
+            conditions.append("magnitude >= ?")
+            parameters.append(minimum_magnitude)
+        if maximum_magnitude is not None:
+            conditions.append("magnitude <= ?")
+            parameters.append(maximum_magnitude)
+        if radius is not None:
+            if cells := grid_cells(latitude, longitude, radius):
+                conditions.append(f"cell IN ({', '.join('?' for _ in cells)})")
+                parameters.extend(cells)
+            # The cells only narrow the rows down to the exact distance test.
+            conditions.append("distance(?, ?, latitude, longitude) <= ?")
+            parameters.extend((latitude, longitude, radius))
+        if not conditions:
+            return "", parameters
+        return f"WHERE {' AND '.join(conditions)}", parameters
+
+    def count(self, **criteria: Any) -> int:
+        """Return the number of events matching the criteria of ``query``."""
+        where, parameters = self._where(**criteria)
+        with self._lock:
+            return self._connect().execute(
+                f"SELECT COUNT(*) FROM events {where}", parameters
+            ).fetchone()[0]
+
+    def query(
+        self,
+        *,
+        latitude: float | None = None,
+        longitude: float | None = None,
+        radius: float | None = None,
+        minimum_magnitude: float | None = None,
+        maximum_magnitude: float | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        limit: int | None = None,
+    ) -> list[IngvEvent]:
+        """Return the matching events, newest first, at most limit of them.
+
+        Events are located at their distance from the point when a radius is
+        given.
+        """
+        started = time.perf_counter()
+        where, parameters = self._where(
+            latitude,
+            longitude,
+            radius,
+            minimum_magnitude,
+            maximum_magnitude,
+            start,
+            end,
+        )
+        sql = f"SELECT event_id, {', '.join(COLUMNS)} FROM events {where}"
+        sql += " ORDER BY time DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            parameters.append(limit)
+        with self._lock:
+            rows = self._connect().execute(sql, parameters).fetchall()
+
+        events = []
+        for row in rows:
+            event_id, event_time, event_latitude, event_longitude, *rest = row
+            depth, magnitude, status, mode, region, updated = rest
+            events.append(
+                IngvEvent(
+                    event_id,
+                    event_latitude,
+                    event_longitude,
+                    depth,
+                    magnitude,
+                    _datetime(event_time),
+                    status,
+                    mode,
+                    region,
+                    _datetime(updated),
+                    None
+                    if radius is None
+                    else haversine_km(
+                        latitude, longitude, event_latitude, event_longitude
+                    ),
+                )
+            )
+        _LOGGER.debug(
+            "Catalog query matched %s events in %.1f ms",
+            len(events),
+            (time.perf_counter() - started) * 1000,
+        )
+        return events
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
@@ -19,13 +19,24 @@ from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers import config_validation as cv
 
 from .const import (
+    CONF_ALERT_MAGNITUDE,
+    CONF_CATALOG_DAYS,
+    CONF_FEED_FORMAT,
+    CONF_MAX_ENTITIES,
     CONF_MINIMUM_MAGNITUDE,
+    CONF_RECORDER_FRIENDLY,
     CONF_START_TIME,
+    DEFAULT_ALERT_MAGNITUDE,
+    DEFAULT_CATALOG_DAYS,
+    DEFAULT_FEED_FORMAT,
+    DEFAULT_MAX_ENTITIES,
     DEFAULT_MINIMUM_MAGNITUDE,
     DEFAULT_RADIUS,
+    DEFAULT_RECORDER_FRIENDLY,
     DEFAULT_SCAN_INTERVAL,
     DEFAULT_START_TIME,
     DOMAIN,
+    FEED_FORMATS,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -34,7 +45,7 @@ _LOGGER = logging.getLogger(__name__)
 class IngvConfigFlow(ConfigFlow, domain=DOMAIN):
     """Handle a config flow for INGV Earthquakes integration."""
 
-    VERSION = 2
+    VERSION = 3
 
     async def _show_form(self, errors: dict[str, Any] | None = None) -> FlowResult:
         """Show the form to the user."""
@@ -145,6 +156,36 @@ class IngvOptionsFlow(OptionsFlow):
                                 CONF_START_TIME, DEFAULT_START_TIME
                             ),
                         ): cv.positive_int,
+                        vol.Optional(
+                            CONF_FEED_FORMAT,
+                            default=self.options.get(
+                                CONF_FEED_FORMAT, DEFAULT_FEED_FORMAT
+                            ),
+                        ): vol.In(FEED_FORMATS),
+                        vol.Optional(
+                            CONF_MAX_ENTITIES,
+                            default=self.options.get(
+                                CONF_MAX_ENTITIES, DEFAULT_MAX_ENTITIES
+                            ),
+                        ): cv.positive_int,
+                        vol.Optional(
+                            CONF_ALERT_MAGNITUDE,
+                            default=self.options.get(
+                                CONF_ALERT_MAGNITUDE, DEFAULT_ALERT_MAGNITUDE
+                            ),
+                        ): cv.positive_float,
+                        vol.Optional(
+                            CONF_RECORDER_FRIENDLY,
+                            default=self.options.get(
+                                CONF_RECORDER_FRIENDLY, DEFAULT_RECORDER_FRIENDLY
+                            ),
+                        ): cv.boolean,
+                        vol.Optional(
+                            CONF_CATALOG_DAYS,
+                            default=self.options.get(
+                                CONF_CATALOG_DAYS, DEFAULT_CATALOG_DAYS
+                            ),
+                        ): cv.positive_int,
                     }
                 ),
             )
@@ -1,40 +1,138 @@
 """Define constants for the INGV Earthquakes integration."""
 
+from datetime import timedelta
 from typing import Final
 
-from homeassistant.const import Platform
+from homeassistant.const import CONF_RADIUS, CONF_SCAN_INTERVAL, Platform
 
 from .version import __version__
 
 DOMAIN: Final = "ingv_centro_nazionale_terremoti"
 DEFAULT_NAME: Final = "INGV Earthquakes"
 
+ATTRIBUTION: Final = "Istituto Nazionale di Geofisica e Vulcanologia"
+
+ALERT_DURATION: Final = timedelta(hours=2)
+ALERT_SCAN_INTERVAL: Final = timedelta(seconds=60)
+
+ATTR_CONFIG_ENTRY_ID: Final = "config_entry_id"
 ATTR_CREATED: Final = "created"
+ATTR_CYCLES: Final = "cycles"
 ATTR_LAST_UPDATE: Final = "last_update"
 ATTR_LAST_UPDATE_SUCCESSFUL: Final = "last_update_successful"
 ATTR_LAST_TIMESTAMP: Final = "last_timestamp"
+ATTR_LIMIT: Final = "limit"
+ATTR_MAXIMUM_MAGNITUDE: Final = "maximum_magnitude"
 ATTR_REMOVED: Final = "removed"
+ATTR_SINCE: Final = "since"
+ATTR_SKIPPED_UPDATES: Final = "skipped_updates"
 ATTR_STATUS: Final = "status"
 ATTR_UPDATED: Final = "updated"
+ATTR_UPDATE_INTERVAL: Final = "update_interval"
+
+CATALOG_COMPACT_INTERVAL: Final = timedelta(days=1)
+CATALOG_FILE: Final = f"{DOMAIN}.catalog.db"
 
+CHUNK_SIZE: Final = 64 * 1024
+
+CONF_ALERT_MAGNITUDE: Final = "alert_magnitude"
+CONF_CATALOG_DAYS: Final = "catalog_days"
+CONF_FEED_FORMAT: Final = "feed_format"
+CONF_MAX_ENTITIES: Final = "max_entities"
 CONF_MINIMUM_MAGNITUDE: Final = "minimum_magnitude"
+CONF_RECORDER_FRIENDLY: Final = "recorder_friendly"
 CONF_START_TIME: Final = "start_time"
 
+DEFAULT_ALERT_MAGNITUDE: Final = 4.0
+DEFAULT_CATALOG_DAYS: Final = 30
+DEFAULT_FEED_FORMAT: Final = "xml"
 DEFAULT_FORCE_UPDATE: Final = True
+DEFAULT_MAX_ENTITIES: Final = 100
 DEFAULT_MINIMUM_MAGNITUDE: Final = 3.0
 DEFAULT_RADIUS: Final = 50.0
+DEFAULT_RECORDER_FRIENDLY: Final = False
+DEFAULT_RETRY_AFTER: Final = timedelta(minutes=5)
 DEFAULT_SCAN_INTERVAL: Final = 300
 DEFAULT_START_TIME: Final = 24
 DEFAULT_UNIT_OF_MEASUREMENT: Final = "quakes"
 
+FDSN_EVENT_URL: Final = "https://webservices.ingv.it/fdsnws/event/1/query"
 FEED: Final = "feed"
+FEED_FORMAT_GEOJSON: Final = "geojson"
+FEED_FORMAT_QUAKEML: Final = "xml"
+FEED_FORMAT_TEXT: Final = "text"
+# Richest format first: the shared query uses the richest format requested.
+FEED_FORMATS: Final = [FEED_FORMAT_QUAKEML, FEED_FORMAT_GEOJSON, FEED_FORMAT_TEXT]
+FULL_RESYNC_INTERVAL: Final = timedelta(hours=1)
+HUB: Final = "hub"
 
 IMAGE_URL_PATTERN: Final = (
     "https://shakemap.ingv.it/data/{}/current/products/intensity.jpg"
 )
 
+# Options applied to a loaded entry without reloading it.
+LIVE_OPTIONS: Final = {
+    CONF_ALERT_MAGNITUDE,
+    CONF_CATALOG_DAYS,
+    CONF_FEED_FORMAT,
+    CONF_MAX_ENTITIES,
+    CONF_MINIMUM_MAGNITUDE,
+    CONF_RADIUS,
+    CONF_SCAN_INTERVAL,
+    CONF_START_TIME,
+}
+
+# Lower edges of the magnitude bins of the statistics, after a bin below them.
+MAGNITUDE_BINS: Final = (2.0, 3.0, 4.0, 5.0)
+
+MAX_BACKOFF_INTERVAL: Final = timedelta(hours=1)
+
+# Number of samples kept for each rolling performance metric.
+METRICS_WINDOW: Final = 100
+
 PLATFORMS: Final = [Platform.SENSOR, Platform.GEO_LOCATION]
 
+PROFILE: Final = "profile"
+# Longest wait for the entities of new events while profiling a cycle.
+PROFILE_FANOUT_TIMEOUT: Final = 10
+PROFILE_MAX_CYCLES: Final = 100
+PROFILE_REPORT_LINES: Final = 40
+
+# Priority bonus of events that already have an entity, to avoid flapping.
+PRIORITY_MARGIN: Final = 0.25
+
+# Default and largest number of events returned by the query_events service.
+QUERY_DEFAULT_LIMIT: Final = 100
+QUERY_MAX_LIMIT: Final = 10_000
+
+SERVICE_NEARBY_EVENTS: Final = "nearby_events"
+SERVICE_PROFILE: Final = "profile"
+SERVICE_QUERY_EVENTS: Final = "query_events"
+
 SOURCE: Final = "ingv_centro_nazionale_terremoti"
 
+# Size of the cells of the in-memory spatial index of events.
+SPATIAL_CELL_DEGREES: Final = 0.5
+
+# Rolling windows counted by the statistics sensors: key, name and length.
+STATISTICS_RATES: Final = (
+    ("rate_1h", "events last hour", timedelta(hours=1)),
+    ("rate_24h", "events last 24 hours", timedelta(hours=24)),
+    ("rate_7d", "events last 7 days", timedelta(days=7)),
+)
+STATISTICS_WINDOW: Final = timedelta(days=7)
+
+STORAGE_KEY: Final = f"{DOMAIN}.events"
+STORAGE_SAVE_DELAY: Final = 30
+STORAGE_VERSION: Final = 1
+
+# Results of a feed update, as persisted in the entry statuses.
+UPDATE_ERROR: Final = "ERROR"
+UPDATE_OK: Final = "OK"
+
+# Smallest event store filtered by the vectorized engine, when NumPy is there.
+VECTORIZE_MIN_EVENTS: Final = 200
+
 VERSION: Final = __version__
+
+WATERMARK_OVERLAP: Final = timedelta(minutes=2)
@@ -0,0 +1,36 @@
+"""Diagnostics support for the INGV Earthquakes integration."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_LATITUDE, CONF_LONGITUDE
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, FEED
+from .hub import async_get_hub
+
+TO_REDACT = {CONF_LATITUDE, CONF_LONGITUDE}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry.
+
+    Metrics hold the latest samples of each update phase: the coordinator's
+    filtering, entity dispatch and total time on the event loop with the
+    number of entities created, updated and removed, and the shared hub's
+    fetch latency, bytes received and parse time.
+    """
+    coordinator = hass.data[DOMAIN][FEED][entry.entry_id]
+    return {
+        "entry": {
+            "data": async_redact_data(entry.data, TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "coordinator": coordinator.async_get_diagnostics(),
+        "hub": async_get_hub(hass).async_get_diagnostics(),
+    }
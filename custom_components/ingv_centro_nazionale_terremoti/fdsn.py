@@ -0,0 +1,96 @@
+"""Minimal client for the INGV FDSN event web service."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+from datetime import datetime
+from http import HTTPStatus
+from typing import Any
+
+import aiohttp
+
+from .const import CHUNK_SIZE, FDSN_EVENT_URL
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_REQUEST_TIMEOUT = 20
+
+THROTTLE_STATUSES = (HTTPStatus.TOO_MANY_REQUESTS, HTTPStatus.SERVICE_UNAVAILABLE)
+
+
+class FdsnError(Exception):
+    """Raised when the FDSN event service returns an error."""
+
+    def __init__(
+        self,
+        message: str,
+        status: int | None = None,
+        retry_after: float | None = None,
+    ) -> None:
+        """Initialize the error."""
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+    @property
+    def throttled(self) -> bool:
+        """Return whether the service asked clients to slow down."""
+        return self.status in THROTTLE_STATUSES
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a Retry-After header given in seconds."""
+    if not value or not value.strip().isdigit():
+        return None
+    return float(value)
+
+
+def format_time(value: datetime) -> str:
+    """Format a datetime as expected by FDSN time parameters (UTC)."""
+    return value.strftime("%Y-%m-%dT%H:%M:%S")
+
+
+class IngvFdsnClient:
+    """Query the INGV FDSN event endpoint."""
+
+    def __init__(
+        self, websession: aiohttp.ClientSession, url: str = FDSN_EVENT_URL
+    ) -> None:
+        """Initialize the client."""
+        self._websession = websession
+        self._url = url
+
+    async def query(self, **params: Any) -> bytes:
+        """Run an event query and return the raw response body.
+
+        An empty body is returned when the service reports no matching events.
+        """
+        return b"".join([chunk async for chunk in self.stream(**params)])
+
+    async def stream(self, **params: Any) -> AsyncIterator[bytes]:
+        """Run an event query and yield the response body in chunks.
+
+        Nothing is yielded when the service reports no matching events.
+        """
+        params = {key: value for key, value in params.items() if value is not None}
+        _LOGGER.debug("Querying %s with %s", self._url, params)
+        try:
+            async with self._websession.get(
+                self._url,
+                params=params,
+                timeout=aiohttp.ClientTimeout(total=DEFAULT_REQUEST_TIMEOUT),
+            ) as response:
+                if response.status == HTTPStatus.NO_CONTENT:
+                    return
+                if response.status != HTTPStatus.OK:
+                    raise FdsnError(
+                        f"Unexpected response status {response.status}",
+                        response.status,
+                        parse_retry_after(response.headers.get("Retry-After")),
+                    )
+                async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                    yield chunk
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+            raise FdsnError(f"Error fetching {self._url}: {err}") from err
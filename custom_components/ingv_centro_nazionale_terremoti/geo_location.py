@@ -2,9 +2,7 @@
 
 from __future__ import annotations
 
-import functools
 import logging
-from urllib.parse import parse_qs, urlsplit
 
 import homeassistant.helpers.config_validation as cv
 import voluptuous as vol
@@ -17,19 +15,20 @@ from homeassistant.const import (
     UnitOfLength,
 )
 from homeassistant.core import HomeAssistant, callback
-from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.util.unit_system import IMPERIAL_SYSTEM
 
 from . import IngvDataUpdateCoordinator
 from .const import (
+    ATTRIBUTION,
     CONF_MINIMUM_MAGNITUDE,
+    CONF_RECORDER_FRIENDLY,
     DEFAULT_FORCE_UPDATE,
     DEFAULT_MINIMUM_MAGNITUDE,
     DEFAULT_RADIUS,
+    DEFAULT_RECORDER_FRIENDLY,
     DOMAIN,
     FEED,
     IMAGE_URL_PATTERN,
@@ -49,32 +48,6 @@ ATTR_REGION = "region"
 ATTR_STATUS = "status"
 
 
-def _extract_region_from_description(description: str | None) -> str | None:
-    """Extract region text from feed description without the type prefix."""
-    if not description:
-        return None
-
-    prefix, separator, value = description.partition(":")
-    if separator and prefix.strip().lower() == "region name":
-        cleaned_value = value.strip()
-        return cleaned_value or None
-
-    return description.strip()
-
-
-def _extract_event_id(external_id: str) -> str:
-    """Extract event id from an external id."""
-    query = urlsplit(external_id).query
-    if query:
-        parsed_query = parse_qs(query)
-        if parsed_event_id := parsed_query.get("eventId"):
-            if event_id := parsed_event_id[0]:
-                return event_id
-
-    fallback_event_id = external_id.rsplit("/", maxsplit=1)[-1]
-    return fallback_event_id or external_id
-
-
 # Deprecated.
 PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend(
     {
@@ -93,21 +66,32 @@ async def async_setup_entry(
 ) -> None:
     """Set up the INGV Earthquakes integration platform."""
     coordinator = hass.data[DOMAIN][FEED][entry.entry_id]
+    entity_class = (
+        IngvRecorderFriendlyGeolocationEvent
+        if entry.options.get(CONF_RECORDER_FRIENDLY, DEFAULT_RECORDER_FRIENDLY)
+        else IngvGeolocationEvent
+    )
 
     @callback
-    def async_add_geolocation(coordinator, config_entry_unique_id, external_id):
-        """Add geolocation entity from feed."""
-        new_entity = IngvGeolocationEvent(
-            coordinator, config_entry_unique_id, external_id
+    def async_add_geolocations(coordinator, config_entry_unique_id, event_ids):
+        """Add the geolocation entities of new events in one batch."""
+        _LOGGER.debug("Adding %s geolocations", len(event_ids))
+        async_add_entities(
+            [
+                entity_class(coordinator, config_entry_unique_id, event_id)
+                for event_id in event_ids
+            ],
+            False,
         )
-        _LOGGER.debug("Adding geolocation %s", new_entity)
-        async_add_entities([new_entity], False)
 
     coordinator.listeners.append(
         async_dispatcher_connect(
-            hass, coordinator.async_event_new_entity(), async_add_geolocation
+            hass, coordinator.async_event_new_entity(), async_add_geolocations
         )
     )
+    # Events restored from storage are known before the first refresh.
+    if coordinator.active_event_ids:
+        coordinator.async_generate_entities(list(coordinator.active_event_ids))
     _LOGGER.debug("Geolocation setup done")
 
 
@@ -133,26 +117,31 @@ async def async_setup_platform(
     )
 
 
-class IngvGeolocationEvent(CoordinatorEntity, GeolocationEvent):
-    """This represents an external event with INGV Earthquakes integration data."""
+class IngvGeolocationEvent(GeolocationEvent):
+    """This represents an external event with INGV Earthquakes integration data.
+
+    The coordinator tracks the entity by event id. It is only refreshed when
+    its event is revised or its availability changes, and removed together
+    with the other stale events of a refresh. State attributes are computed
+    once per revision.
+    """
 
-    coordinator: IngvDataUpdateCoordinator
+    _attr_attribution = ATTRIBUTION
     _attr_force_update = DEFAULT_FORCE_UPDATE
     _attr_icon = "mdi:pulse"
+    _attr_should_poll = False
     _attr_unit_of_measurement = UnitOfLength.KILOMETERS
 
     def __init__(
         self,
         coordinator: IngvDataUpdateCoordinator,
         config_entry_unique_id: str | None,
-        external_id: str,
+        event_id: str,
     ) -> None:
         """Initialize the entity."""
-        super().__init__(coordinator)
-        self._external_id = external_id
-        self._event_id = _extract_event_id(external_id)
+        self.coordinator = coordinator
+        self._event_id = event_id
         self._attr_unique_id = f"{config_entry_unique_id}_{self._event_id}"
-        self._description = None
         self._distance: float | None = None
         self._latitude: float | None = None
         self._longitude: float | None = None
@@ -163,36 +152,25 @@ class IngvGeolocationEvent(CoordinatorEntity, GeolocationEvent):
         self._mode = None
         self._time = None
         self._image_url = None
+        self._revision: int | None = None
 
     async def async_added_to_hass(self) -> None:
         """Call when entity is added to hass."""
         await super().async_added_to_hass()
-        self.async_on_remove(
-            async_dispatcher_connect(
-                self.hass,
-                f"{DOMAIN}_delete_{self._external_id}",
-                functools.partial(self.async_remove, force_remove=True),
-            )
-        )
-        self._update_internal_state()
-
-    async def async_will_remove_from_hass(self) -> None:
-        """Call when entity will be removed from hass."""
-        await super().async_will_remove_from_hass()
-        # During integration unload/reload, keep registry entries so HA can reuse
-        # the same entity IDs when entities are added back.
-        if self.coordinator.is_unloading:
+        self.async_on_remove(self.coordinator.async_add_entity(self._event_id, self))
+        self.coordinator.async_index_entity(self._event_id, self.entity_id)
+        if not self.coordinator.entry_available(self._event_id):
+            # The event left the feed while this entity waited in its batch.
+            self.coordinator.async_remove_orphan(self._event_id)
             return
-
-        entity_registry = er.async_get(self.hass)
-        if self.entity_id in entity_registry.entities:
-            entity_registry.async_remove(self.entity_id)
-            _LOGGER.debug("Removed geolocation %s from entity registry", self.entity_id)
+        self._update_internal_state()
 
     @property
     def available(self) -> bool:
         """Return if entity is available."""
-        return super().available and self.coordinator.entry_available(self._external_id)
+        return self.coordinator.last_update_success and (
+            self.coordinator.entry_available(self._event_id)
+        )
 
     @property
     def distance(self) -> float | None:
@@ -201,44 +179,59 @@ class IngvGeolocationEvent(CoordinatorEntity, GeolocationEvent):
 
     def _update_internal_state(self) -> None:
         """Update state and attributes from coordinator data."""
-        _LOGGER.debug("Updating %s from coordinator data", self._external_id)
-        if feed_entry := self.coordinator.get_entry(self._external_id):
-            self._depth = round((feed_entry.origin.depth / 1000), 1)
-            self._distance = feed_entry.distance_to_home
+        _LOGGER.debug("Updating %s from coordinator data", self._event_id)
+        event = self.coordinator.get_entry(self._event_id)
+        if event is not None and event.revision != self._revision:
+            self._revision = event.revision
+            self._depth = round(event.depth, 1) if event.depth is not None else None
+            self._distance = event.distance
             # Convert distance and depth if not metric system.
             if self.hass.config.units is IMPERIAL_SYSTEM:
-                self._depth = IMPERIAL_SYSTEM.length(
-                    self._depth, UnitOfLength.KILOMETERS
-                )
+                if self._depth is not None:
+                    self._depth = IMPERIAL_SYSTEM.length(
+                        self._depth, UnitOfLength.KILOMETERS
+                    )
                 self._distance = IMPERIAL_SYSTEM.length(
                     self._distance, UnitOfLength.KILOMETERS
                 )
                 self._attr_unit_of_measurement = UnitOfLength.MILES
 
-            self._description = feed_entry.description
-            self._latitude = feed_entry.coordinates[0]
-            self._longitude = feed_entry.coordinates[1]
-            self._magnitude = feed_entry.magnitude.mag
+            self._latitude = event.latitude
+            self._longitude = event.longitude
+            self._magnitude = event.magnitude
             # extra attribute image url not in feed_entry
             if self._magnitude is not None and self._magnitude >= 3:
                 self._image_url = IMAGE_URL_PATTERN.format(self._event_id)
-            self._region = _extract_region_from_description(self._description)
-            self._time = feed_entry.origin.time
-            self._status = feed_entry.origin.evaluation_status
-            self._mode = feed_entry.origin.evaluation_mode
+            self._region = event.region
+            self._time = event.time
+            self._status = event.status
+            self._mode = event.mode
 
-            self._attr_attribution = feed_entry.attribution
             magnitude_for_name = (
                 f"{self._magnitude:.1f}" if self._magnitude is not None else "unknown"
             )
             region_for_name = self._region or "Unknown region"
             self._attr_name = f"M {magnitude_for_name} - {region_for_name}"
+            self._attr_extra_state_attributes = {
+                key: value
+                for key, value in (
+                    (ATTR_EVENT_ID, self._event_id),
+                    (ATTR_DEPTH, self._depth),
+                    (ATTR_REGION, self._region),
+                    (ATTR_MAGNITUDE, self._magnitude),
+                    (ATTR_STATUS, self._status),
+                    (ATTR_MODE, self._mode),
+                    (ATTR_PUBLICATION_DATE, self._time),
+                    (ATTR_IMAGE_URL, self._image_url),
+                )
+                if value or isinstance(value, bool)
+            }
 
     @callback
-    def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
+    def async_handle_event_update(self) -> None:
+        """Handle a revision of this event."""
         self._update_internal_state()
-        super()._handle_coordinator_update()
+        self.async_write_ha_state()
 
     @property
     def latitude(self) -> float | None:
@@ -255,20 +248,9 @@ class IngvGeolocationEvent(CoordinatorEntity, GeolocationEvent):
         """Return source value of this external event."""
         return SOURCE
 
-    @property
-    def extra_state_attributes(self):
-        """Return the device state attributes."""
-        attributes = {}
-        for key, value in (
-            (ATTR_EVENT_ID, self._event_id),
-            (ATTR_DEPTH, self._depth),
-            (ATTR_REGION, self._region),
-            (ATTR_MAGNITUDE, self._magnitude),
-            (ATTR_STATUS, self._status),
-            (ATTR_MODE, self._mode),
-            (ATTR_PUBLICATION_DATE, self._time),
-            (ATTR_IMAGE_URL, self._image_url),
-        ):
-            if value or isinstance(value, bool):
-                attributes[key] = value
-        return attributes
+
+class IngvRecorderFriendlyGeolocationEvent(IngvGeolocationEvent):
+    """Geolocation event that is written and recorded only when it changes."""
+
+    _attr_force_update = False
+    _unrecorded_attributes = frozenset({ATTR_EVENT_ID, ATTR_IMAGE_URL, ATTR_MODE})
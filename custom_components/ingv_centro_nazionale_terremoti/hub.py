@@ -0,0 +1,845 @@
+"""Shared feed hub for the INGV Earthquakes integration.
+
+A single hub lives in ``hass.data[DOMAIN]`` and fetches the INGV feed once for
+all config entries. Each coordinator then applies its own distance, magnitude
+and start time filters locally.
+
+The hub keeps an in-memory event store. After an initial full fetch it only
+asks for events updated since the last watermark, merges revisions by event id
+and expires events locally once they leave the window. A full resync runs every
+``FULL_RESYNC_INTERVAL`` to drop events deleted upstream.
+
+The event store, the watermark and the latest status of every coordinator are
+persisted to a versioned ``Store`` so entities are restored immediately after
+a restart and only an incremental catch-up fetch is needed.
+
+Every response body is fingerprinted. When a query returns the same body as
+the previous query of the same kind, the store is left untouched and its
+``generation`` does not change, so coordinators can skip their own work.
+
+When the service answers 429 or 503, every query is held off for the time
+given by its ``Retry-After`` header.
+
+When a filter is widened around the same center, the store is kept and only
+the widened part (a ring of radius, a magnitude band or an older time span) is
+queried on the next fetch, instead of a full resync.
+
+The events of the store are also indexed by location, so events near any
+point can be looked up without scanning the whole store. When NumPy is
+available, they are also held in arrays from the first fetch on, and the
+filters of every entry are applied to a large store in one batched pass per
+generation of the store.
+
+New and revised events are also written to the local SQLite catalog, which
+keeps them for the longest ``catalog_days`` of the registered entries, well
+past the window of the event store.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import time
+from collections import Counter
+from collections.abc import Iterable
+from contextlib import aclosing
+from datetime import datetime, timedelta
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Any, NamedTuple
+from xml.etree.ElementTree import ParseError
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CATALOG_COMPACT_INTERVAL,
+    DEFAULT_CATALOG_DAYS,
+    DEFAULT_RETRY_AFTER,
+    DOMAIN,
+    FEED_FORMAT_QUAKEML,
+    FEED_FORMATS,
+    FULL_RESYNC_INTERVAL,
+    HUB,
+    STORAGE_KEY,
+    STORAGE_SAVE_DELAY,
+    STORAGE_VERSION,
+    UPDATE_ERROR,
+    UPDATE_OK,
+    VECTORIZE_MIN_EVENTS,
+    WATERMARK_OVERLAP,
+)
+from .fdsn import FdsnError, IngvFdsnClient, format_time
+from .metrics import RollingMetrics
+from .parser import PARSERS, IngvEvent, QuakeMLStreamParser, parse_time
+from .spatial import SpatialIndex, haversine_km
+from .vectorized import EventArrays, load_event_arrays
+
+if TYPE_CHECKING:
+    from .catalog import IngvCatalog
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class FeedFilter(NamedTuple):
+    """Filter applied by a coordinator to the shared feed."""
+
+    latitude: float
+    longitude: float
+    radius: float
+    minimum_magnitude: float
+    starttime_delta: timedelta
+
+    def covers(self, other: FeedFilter) -> bool:
+        """Return whether every event matching other also matches this filter."""
+        return (
+            haversine_km(self.latitude, self.longitude, other.latitude, other.longitude)
+            + other.radius
+            <= self.radius + 1e-6
+            and other.minimum_magnitude >= self.minimum_magnitude
+            and other.starttime_delta <= self.starttime_delta
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON serializable representation of the filter."""
+        return {
+            "latitude": self.latitude,
+            "longitude": self.longitude,
+            "radius": self.radius,
+            "minimum_magnitude": self.minimum_magnitude,
+            "starttime_delta": self.starttime_delta.total_seconds(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> FeedFilter:
+        """Create a filter from its serialized representation."""
+        return cls(
+            latitude=data["latitude"],
+            longitude=data["longitude"],
+            radius=data["radius"],
+            minimum_magnitude=data["minimum_magnitude"],
+            starttime_delta=timedelta(seconds=data["starttime_delta"]),
+        )
+
+
+class StatusUpdate(NamedTuple):
+    """Status of the latest coordinator update."""
+
+    status: str
+    last_update: datetime | None
+    last_update_successful: datetime | None
+    last_timestamp: datetime | None
+    total: int
+    created: int
+    updated: int
+    removed: int
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON serializable representation of the status."""
+        return {
+            key: value.isoformat() if isinstance(value, datetime) else value
+            for key, value in self._asdict().items()
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> StatusUpdate:
+        """Create a status from its serialized representation."""
+        return cls(
+            status=data["status"],
+            last_update=parse_time(data.get("last_update")),
+            last_update_successful=parse_time(data.get("last_update_successful")),
+            last_timestamp=parse_time(data.get("last_timestamp")),
+            total=data.get("total", 0),
+            created=data.get("created", 0),
+            updated=data.get("updated", 0),
+            removed=data.get("removed", 0),
+        )
+
+
+def widened_parts(
+    covered: FeedFilter, feed_filter: FeedFilter, now: datetime
+) -> list[dict[str, Any]]:
+    """Return the query parameters of the parts of feed_filter outside covered.
+
+    Both filters share their center. Each part is widened in one dimension and
+    bounded by feed_filter in the others, so the parts may overlap.
+    """
+    base = {
+        "lat": round(feed_filter.latitude, 4),
+        "lon": round(feed_filter.longitude, 4),
+        "maxradiuskm": round(feed_filter.radius, 3),
+        "minmag": feed_filter.minimum_magnitude,
+        "starttime": format_time(now - feed_filter.starttime_delta),
+    }
+    parts = []
+    if feed_filter.radius > covered.radius:
+        parts.append({**base, "minradiuskm": round(covered.radius, 3)})
+    if feed_filter.minimum_magnitude < covered.minimum_magnitude:
+        parts.append({**base, "maxmag": covered.minimum_magnitude})
+    if feed_filter.starttime_delta > covered.starttime_delta:
+        parts.append(
+            {**base, "endtime": format_time(now - covered.starttime_delta)}
+        )
+    return parts
+
+
+def union_filter(filters: list[FeedFilter]) -> FeedFilter:
+    """Return a single filter covering every given filter."""
+    latitude = sum(feed_filter.latitude for feed_filter in filters) / len(filters)
+    longitude = sum(feed_filter.longitude for feed_filter in filters) / len(filters)
+    radius = max(
+        haversine_km(latitude, longitude, feed_filter.latitude, feed_filter.longitude)
+        + feed_filter.radius
+        for feed_filter in filters
+    )
+    return FeedFilter(
+        latitude=latitude,
+        longitude=longitude,
+        radius=radius,
+        minimum_magnitude=min(f.minimum_magnitude for f in filters),
+        starttime_delta=max(f.starttime_delta for f in filters),
+    )
+
+
+@callback
+def async_get_hub(hass: HomeAssistant) -> IngvFeedHub:
+    """Return the domain-wide feed hub, creating it if needed."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if (hub := domain_data.get(HUB)) is None:
+        hub = domain_data[HUB] = IngvFeedHub(hass)
+    return hub
+
+
+class IngvFeedHub:
+    """Fetch the INGV feed once and share it between all coordinators."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the feed hub."""
+        self._hass = hass
+        self._client = IngvFdsnClient(async_get_clientsession(hass))
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._loaded = False
+        self._filters: dict[str, FeedFilter] = {}
+        self._formats: dict[str, str] = {}
+        self._catalog_days: dict[str, int] = {}
+        self._catalog: IngvCatalog | None = None
+        # New and revised events not yet written to the catalog.
+        self._catalog_pending: dict[str, IngvEvent] = {}
+        self._catalog_compacted: datetime | None = None
+        self._feed_format = FEED_FORMATS[0]
+        self._union_filter: FeedFilter | None = None
+        # Filter whose events are all in the store.
+        self._covered_filter: FeedFilter | None = None
+        self._lock = asyncio.Lock()
+        self._result: tuple[str, list | None] | None = None
+        self._fetched_at: float | None = None
+        self._events: dict[str, IngvEvent] = {}
+        self._index = SpatialIndex()
+        # Loaded with NumPy on the first fetch, None without NumPy.
+        self._arrays: EventArrays | None = None
+        self._arrays_loaded = False
+        # Rows and distances matching each entry, for the store generation.
+        self._matches: dict[str, tuple[Any, Any]] = {}
+        self._matches_generation: int | None = None
+        self._statuses: dict[str, StatusUpdate] = {}
+        self._watermark: datetime | None = None
+        self._last_full_sync: datetime | None = None
+        self._incremental = True
+        self._probe_marker: str | None = None
+        self._retry_at: float | None = None
+        # Body fingerprints of the last full and incremental queries.
+        self._fingerprints: dict[bool, bytes] = {}
+        self._generation = 0
+        self.counters: Counter[str] = Counter()
+        self.metrics = RollingMetrics()
+
+    @property
+    def events(self) -> list[IngvEvent]:
+        """Return the events currently held in the store."""
+        return list(self._events.values())
+
+    @property
+    def generation(self) -> int:
+        """Return a number that changes whenever the event store changes."""
+        return self._generation
+
+    @property
+    def catalog(self) -> IngvCatalog | None:
+        """Return the event catalog, None when no entry keeps one."""
+        if self._catalog is None or not self._retention_days:
+            return None
+        return self._catalog
+
+    @property
+    def _retention_days(self) -> int:
+        """Return the longest catalog retention of the registered entries."""
+        return max(self._catalog_days.values(), default=0)
+
+    @callback
+    def async_set_catalog(self, catalog: IngvCatalog) -> None:
+        """Write new and revised events to a catalog from now on."""
+        self._catalog = catalog
+        self._catalog_pending = dict(self._events)
+
+    @callback
+    def async_events_near(
+        self, latitude: float, longitude: float, radius: float
+    ) -> list[IngvEvent]:
+        """Return the stored events within radius km of a point, nearest first.
+
+        The events are located at their distance from the point.
+        """
+        with self.metrics.timer("nearby_ms"):
+            matches = self._index.query(latitude, longitude, radius)
+            matches.sort(key=lambda match: match[0])
+        return [event.localize(distance) for distance, event in matches]
+
+    @callback
+    def async_match_events(
+        self, entry_id: str, starttime: datetime
+    ) -> list[tuple[float, IngvEvent]] | None:
+        """Return the stored events matching the filter of an entry.
+
+        Each event comes with its distance from the entry's location. The
+        filters of all entries are applied together the first time one of
+        them asks after the store changed. Return None when the store is too
+        small for the batched pass to pay off, or NumPy is missing.
+        """
+        if (
+            (arrays := self._arrays) is None
+            or len(arrays) < VECTORIZE_MIN_EVENTS
+            or entry_id not in self._filters
+        ):
+            return None
+        if (
+            self._matches_generation != self._generation
+            or entry_id not in self._matches
+        ):
+            with self.metrics.timer("match_ms"):
+                entry_ids = list(self._filters)
+                self._matches = dict(
+                    zip(entry_ids, arrays.match(list(self._filters.values())))
+                )
+            self._matches_generation = self._generation
+        return arrays.select(*self._matches[entry_id], starttime)
+
+    @property
+    def retry_after(self) -> float | None:
+        """Return the seconds left before the throttled service may be queried."""
+        if self._retry_at is None:
+            return None
+        if (remaining := self._retry_at - time.monotonic()) <= 0:
+            self._retry_at = None
+            return None
+        return remaining
+
+    @callback
+    def async_get_diagnostics(self) -> dict[str, Any]:
+        """Return the state and performance metrics of the hub."""
+        return {
+            "feed_format": self._feed_format,
+            "incremental": self._incremental,
+            "registered_entries": len(self._filters),
+            "events": len(self._events),
+            "index_cells": self._index.buckets,
+            "vectorized": self._arrays is not None,
+            "generation": self._generation,
+            "watermark": self._watermark.isoformat() if self._watermark else None,
+            "retry_after": self.retry_after,
+            "catalog_days": self._retention_days if self._catalog else None,
+            "counters": dict(self.counters),
+            "metrics": self.metrics.summary(),
+        }
+
+    async def async_load(self) -> None:
+        """Restore the persisted event store, once."""
+        async with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            if not (data := await self._store.async_load()):
+                return
+            try:
+                union = (
+                    FeedFilter.from_dict(data["filter"]) if data["filter"] else None
+                )
+                events = [IngvEvent.from_list(event) for event in data["events"]]
+                statuses = {
+                    entry_id: StatusUpdate.from_dict(status)
+                    for entry_id, status in data["statuses"].items()
+                }
+            except (KeyError, TypeError, ValueError) as err:
+                _LOGGER.warning("Discarding invalid stored events: %s", err)
+                return
+
+            self._events = {event.event_id: event for event in events}
+            self._index.clear()
+            if self._arrays is not None:
+                self._arrays.clear()
+            self._index_events(self._events.values())
+            self._generation += 1
+            if self._catalog is not None:
+                self._catalog_pending.update(self._events)
+            self._statuses.update(statuses)
+            self._watermark = parse_time(data.get("watermark"))
+            self._last_full_sync = parse_time(data.get("last_full_sync"))
+            self._union_filter = self._covered_filter = union
+            if union is None:
+                self._watermark = None
+            self._async_filters_changed()
+            _LOGGER.debug("Restored %s events from storage", len(self._events))
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        """Schedule a debounced save of the event store."""
+        self._store.async_delay_save(self._data_to_save, STORAGE_SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the data to persist."""
+        return {
+            "filter": self._covered_filter.as_dict() if self._covered_filter else None,
+            "watermark": self._watermark.isoformat() if self._watermark else None,
+            "last_full_sync": (
+                self._last_full_sync.isoformat() if self._last_full_sync else None
+            ),
+            "events": [event.as_list() for event in self._events.values()],
+            "statuses": {
+                entry_id: status.as_dict()
+                for entry_id, status in self._statuses.items()
+            },
+        }
+
+    @callback
+    def async_get_status(self, entry_id: str) -> StatusUpdate | None:
+        """Return the last persisted status of a config entry."""
+        return self._statuses.get(entry_id)
+
+    @callback
+    def async_set_status(self, entry_id: str, status: StatusUpdate) -> None:
+        """Record the latest status of a config entry."""
+        self._statuses[entry_id] = status
+        self._async_schedule_save()
+
+    @callback
+    def async_remove_status(self, entry_id: str) -> None:
+        """Forget the persisted status of a removed config entry."""
+        if self._statuses.pop(entry_id, None) is not None:
+            self._async_schedule_save()
+
+    @callback
+    def async_register(
+        self,
+        entry_id: str,
+        feed_filter: FeedFilter,
+        feed_format: str,
+        catalog_days: int = DEFAULT_CATALOG_DAYS,
+    ) -> None:
+        """Register (or replace) the filter and feed format of a config entry."""
+        self._filters[entry_id] = feed_filter
+        self._formats[entry_id] = feed_format
+        self._matches.clear()
+        if self._catalog_days.get(entry_id) != catalog_days:
+            self._catalog_days[entry_id] = catalog_days
+            # Apply a shortened retention on the next write.
+            self._catalog_compacted = None
+        self._async_filters_changed()
+
+    @callback
+    def async_unregister(self, entry_id: str) -> None:
+        """Remove the filter of a config entry."""
+        self._formats.pop(entry_id, None)
+        self._catalog_days.pop(entry_id, None)
+        self._matches.clear()
+        if self._filters.pop(entry_id, None) is not None:
+            self._async_filters_changed()
+
+    def _requested_format(self) -> str:
+        """Return the richest feed format requested by a config entry."""
+        return next(
+            (fmt for fmt in FEED_FORMATS if fmt in self._formats.values()),
+            FEED_FORMATS[0],
+        )
+
+    @callback
+    def _async_filters_changed(self) -> None:
+        """Fetch what the store misses for the registered filters.
+
+        Nothing is fetched when the store covers every filter. A filter widened
+        around the same center is fetched for its widened part only; any other
+        change forces a full resync.
+        """
+        if not self._filters:
+            return
+        feed_format = self._requested_format()
+        union = union_filter(list(self._filters.values()))
+        covered = self._covered_filter
+        if (
+            self._union_filter is not None
+            and covered is not None
+            and FEED_FORMATS.index(feed_format)
+            >= FEED_FORMATS.index(self._feed_format)
+        ):
+            if self._union_filter.covers(union):
+                return
+            if (
+                self._watermark is not None
+                and union.latitude == covered.latitude
+                and union.longitude == covered.longitude
+            ):
+                _LOGGER.debug("Filters widened, fetching the widened part")
+                self._union_filter = union
+                self._result = None
+                self._fetched_at = None
+                return
+        self._feed_format = feed_format
+        self._union_filter = union
+        self._result = None
+        self._fetched_at = None
+        self._watermark = None
+        self._fingerprints.clear()
+
+    @property
+    def fetch_pending(self) -> bool:
+        """Return whether the next fetch cannot be served from the last one."""
+        return self._result is None
+
+    async def async_fetch(self, max_age: float) -> tuple[str, list | None]:
+        """Return the shared feed entries, fetching if older than max_age seconds."""
+        async with self._lock:
+            if (
+                self._result is not None
+                and self._fetched_at is not None
+                and time.monotonic() - self._fetched_at < max_age
+            ):
+                return self._result
+
+            if not self._arrays_loaded:
+                self._arrays_loaded = True
+                self._arrays = await self._hass.async_add_executor_job(
+                    load_event_arrays
+                )
+                if self._arrays is not None:
+                    self._arrays.update(self._events.values())
+            if self._union_filter is None:
+                return UPDATE_ERROR, None
+            if self.retry_after:
+                _LOGGER.debug("Feed throttled, retrying in %.0fs", self.retry_after)
+                return UPDATE_ERROR, None
+            self._result = await self._async_update()
+            self._fetched_at = time.monotonic()
+            if self._result[0] == UPDATE_OK:
+                await self._async_write_catalog()
+            return self._result
+
+    async def _async_probe(self, params: dict[str, Any]) -> str | None:
+        """Return the newest matching event as a text line, or None on error."""
+        try:
+            with self.metrics.timer("probe_ms"):
+                data = await self._client.query(
+                    **params, format="text", limit=1, orderby="time"
+                )
+        except FdsnError as err:
+            _LOGGER.debug("Unable to probe feed: %s", err)
+            self._record_throttle(err)
+            return None
+        return next(
+            (
+                line
+                for line in data.decode("utf-8", "replace").splitlines()
+                if line and not line.startswith("#")
+            ),
+            "",
+        )
+
+    async def _async_fetch_events(
+        self, fingerprint: bytes | None, **params: Any
+    ) -> tuple[list[IngvEvent] | None, bytes]:
+        """Download and parse events, keeping the parse off the event loop.
+
+        Return the events and the fingerprint of the response body. Events are
+        None when the body matches the given fingerprint.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        feed_format = params["format"]
+        if feed_format != FEED_FORMAT_QUAKEML:
+            with self.metrics.timer("fetch_ms"):
+                data = await self._client.query(**params)
+            self.metrics.record("bytes", len(data))
+            digest.update(data)
+            if digest.digest() == fingerprint:
+                return None, fingerprint
+            self.counters["parses"] += 1
+            with self.metrics.timer("parse_ms"):
+                events = await self._hass.async_add_executor_job(
+                    PARSERS[feed_format], data
+                )
+            return events, digest.digest()
+
+        # Parse QuakeML chunk by chunk while it downloads so neither the
+        # document nor its element tree is ever held in memory as a whole.
+        # The body is only known to be unchanged once fully received, and
+        # the events parsed from an unchanged body are then dropped.
+        # Download and parse overlap, so the fetch time excludes the parse.
+        self.counters["parses"] += 1
+        parser = QuakeMLStreamParser()
+        events: list[IngvEvent] = []
+        received = 0
+        parse_seconds = 0.0
+        start = time.perf_counter()
+        async with aclosing(self._client.stream(**params)) as chunks:
+            async for chunk in chunks:
+                received += len(chunk)
+                digest.update(chunk)
+                parse_start = time.perf_counter()
+                events.extend(
+                    await self._hass.async_add_executor_job(parser.feed, chunk)
+                )
+                parse_seconds += time.perf_counter() - parse_start
+        parse_start = time.perf_counter()
+        events.extend(await self._hass.async_add_executor_job(parser.close))
+        end = time.perf_counter()
+        parse_seconds += end - parse_start
+        self.metrics.record("fetch_ms", (end - start - parse_seconds) * 1000)
+        self.metrics.record("parse_ms", parse_seconds * 1000)
+        self.metrics.record("bytes", received)
+        if digest.digest() == fingerprint:
+            return None, fingerprint
+        return events, digest.digest()
+
+    async def _async_update(self) -> tuple[str, list | None]:
+        """Fetch new and revised events and merge them into the event store."""
+        now = dt_util.utcnow()
+        resync_due = (
+            self._watermark is None
+            or self._last_full_sync is None
+            or now - self._last_full_sync >= FULL_RESYNC_INTERVAL
+        )
+        full_sync = resync_due or not self._incremental
+        if resync_due and self._filters:
+            # Shrink the query back to the filters that are still registered.
+            self._union_filter = union_filter(list(self._filters.values()))
+            self._feed_format = self._requested_format()
+        feed_filter = self._union_filter
+        starttime = now - feed_filter.starttime_delta
+        params: dict[str, Any] = {
+            "lat": round(feed_filter.latitude, 4),
+            "lon": round(feed_filter.longitude, 4),
+            "maxradiuskm": round(feed_filter.radius, 3),
+            "minmag": feed_filter.minimum_magnitude,
+            "starttime": format_time(starttime),
+        }
+
+        probe_marker = None
+        if not self._incremental:
+            # Without incremental queries, only download the full window when
+            # the newest event differs from the one seen by the last download.
+            probe_marker = await self._async_probe(params)
+            if self.retry_after:
+                return UPDATE_ERROR, None
+            if (
+                not resync_due
+                and probe_marker is not None
+                and probe_marker == self._probe_marker
+                and self._covered_filter is not None
+                and self._covered_filter.covers(feed_filter)
+            ):
+                _LOGGER.debug("Newest event unchanged, skipping full fetch")
+                self.counters["unchanged_fetches"] += 1
+                self._expire_events(starttime)
+                return UPDATE_OK, self.events
+
+        if (
+            not full_sync
+            and self._covered_filter is not None
+            and not self._covered_filter.covers(feed_filter)
+            and not await self._async_fetch_widened(feed_filter, now)
+        ):
+            return UPDATE_ERROR, None
+
+        if not full_sync:
+            params["updatedafter"] = format_time(self._watermark - WATERMARK_OVERLAP)
+        self.counters["fetches"] += 1
+        try:
+            events, fingerprint = await self._async_fetch_events(
+                self._fingerprints.get(full_sync),
+                **params,
+                format=self._feed_format,
+                orderby="time",
+            )
+        except FdsnError as err:
+            if not full_sync and err.status == HTTPStatus.BAD_REQUEST:
+                _LOGGER.debug("Incremental queries rejected, using full fetches")
+                self._incremental = False
+            _LOGGER.debug("Unable to fetch feed: %s", err)
+            self._record_throttle(err)
+            return UPDATE_ERROR, None
+        except (ParseError, ValueError) as err:
+            _LOGGER.debug("Unable to parse feed: %s", err)
+            return UPDATE_ERROR, None
+
+        self._fingerprints[full_sync] = fingerprint
+        if full_sync:
+            self._last_full_sync = now
+            self._probe_marker = probe_marker
+            self._covered_filter = feed_filter
+        if events is None:
+            self.counters["unchanged_fetches"] += 1
+        elif full_sync:
+            self._share_event_ids(events)
+            self._queue_catalog(events)
+            previous = self._events
+            self._events = {event.event_id: event for event in events}
+            for event_id in previous.keys() - self._events.keys():
+                self._unindex_event(event_id)
+            self._index_events(events)
+            self._generation += 1
+        elif events:
+            self._share_event_ids(events)
+            self._queue_catalog(events)
+            for event in events:
+                self._events[event.event_id] = event
+            self._index_events(events)
+            self._generation += 1
+            # The store no longer matches the last full body.
+            self._fingerprints.pop(True, None)
+        self._watermark = now
+        expired = self._expire_events(starttime)
+
+        _LOGGER.debug(
+            "%s fetch returned %s events, %s expired, %s in store",
+            "Full" if full_sync else "Incremental",
+            "unchanged" if events is None else len(events),
+            expired,
+            len(self._events),
+        )
+        self._async_schedule_save()
+        return UPDATE_OK, self.events
+
+    async def _async_fetch_widened(
+        self, feed_filter: FeedFilter, now: datetime
+    ) -> bool:
+        """Merge the events of the widened parts of the filter into the store.
+
+        Return False when a part could not be fetched; it is retried on the
+        next fetch.
+        """
+        covered = self._covered_filter
+        events: list[IngvEvent] = []
+        for params in widened_parts(covered, feed_filter, now):
+            self.counters["widening_fetches"] += 1
+            try:
+                part, _ = await self._async_fetch_events(
+                    None, **params, format=self._feed_format, orderby="time"
+                )
+            except FdsnError as err:
+                _LOGGER.debug("Unable to fetch widened filter: %s", err)
+                self._record_throttle(err)
+                return False
+            except (ParseError, ValueError) as err:
+                _LOGGER.debug("Unable to parse widened filter: %s", err)
+                return False
+            events.extend(part)
+
+        self._share_event_ids(events)
+        self._queue_catalog(events)
+        for event in events:
+            self._events[event.event_id] = event
+        self._index_events(events)
+        self._generation += 1
+        self._fingerprints.pop(True, None)
+        self._covered_filter = covered._replace(
+            radius=max(covered.radius, feed_filter.radius),
+            minimum_magnitude=min(
+                covered.minimum_magnitude, feed_filter.minimum_magnitude
+            ),
+            starttime_delta=max(covered.starttime_delta, feed_filter.starttime_delta),
+        )
+        _LOGGER.debug("Widened filter returned %s events", len(events))
+        return True
+
+    def _index_events(self, events: Iterable[IngvEvent]) -> None:
+        """Add new and revised events to the spatial index and the arrays."""
+        self._index.update(events)
+        if self._arrays is not None:
+            self._arrays.update(events)
+
+    def _unindex_event(self, event_id: str) -> None:
+        """Remove an event from the spatial index and the arrays."""
+        self._index.discard(event_id)
+        if self._arrays is not None:
+            self._arrays.discard(event_id)
+
+    def _share_event_ids(self, events: list[IngvEvent]) -> None:
+        """Point parsed events already in the store at the id string it holds.
+
+        Ids are not interned, since interned strings are never freed; a known
+        event keeps sharing one id string with the store keys instead.
+        """
+        stored = self._events
+        for event in events:
+            if (previous := stored.get(event.event_id)) is not None:
+                event.event_id = previous.event_id
+
+    def _queue_catalog(self, events: list[IngvEvent]) -> None:
+        """Queue the events that are new or revised for the catalog."""
+        if self.catalog is None:
+            return
+        stored = self._events
+        for event in events:
+            if (
+                previous := stored.get(event.event_id)
+            ) is None or previous.revision != event.revision:
+                self._catalog_pending[event.event_id] = event
+
+    async def _async_write_catalog(self) -> None:
+        """Write the queued events to the catalog, compacting it once a day."""
+        if (catalog := self.catalog) is None:
+            self._catalog_pending.clear()
+            return
+        now = dt_util.utcnow()
+        try:
+            if self._catalog_pending:
+                with self.metrics.timer("catalog_ms"):
+                    revisions = await self._hass.async_add_executor_job(
+                        catalog.write, list(self._catalog_pending.values()), now
+                    )
+                self._catalog_pending.clear()
+                self.counters["catalog_revisions"] += revisions
+            if (
+                self._catalog_compacted is None
+                or now - self._catalog_compacted >= CATALOG_COMPACT_INTERVAL
+            ):
+                removed = await self._hass.async_add_executor_job(
+                    catalog.compact, now - timedelta(days=self._retention_days)
+                )
+                self._catalog_compacted = now
+                _LOGGER.debug("Removed %s events from the catalog", removed)
+        except sqlite3.Error as err:
+            # Queued events are kept and written with the next batch.
+            _LOGGER.warning("Unable to write the event catalog: %s", err)
+
+    def _record_throttle(self, err: FdsnError) -> None:
+        """Hold off all queries when the service asked clients to slow down."""
+        if not err.throttled:
+            return
+        delay = err.retry_after or DEFAULT_RETRY_AFTER.total_seconds()
+        _LOGGER.warning("INGV service is throttling requests, pausing for %.0fs", delay)
+        self._retry_at = time.monotonic() + delay
+
+    def _expire_events(self, starttime: datetime) -> int:
+        """Drop stored events older than starttime, return how many expired."""
+        expired = [
+            event_id
+            for event_id, event in self._events.items()
+            if event.time is not None and event.time < starttime
+        ]
+        for event_id in expired:
+            del self._events[event_id]
+            self._unindex_event(event_id)
+        if expired:
+            self._generation += 1
+        return len(expired)
@@ -0,0 +1,57 @@
+"""Rolling performance metrics for the INGV Earthquakes integration."""
+
+from __future__ import annotations
+
+import time
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from .const import METRICS_WINDOW
+
+
+class RollingMetrics:
+    """Keep the latest samples of named metrics and summarize them."""
+
+    def __init__(self, window: int = METRICS_WINDOW) -> None:
+        """Initialize the metrics."""
+        self._window = window
+        self._samples: dict[str, deque[float]] = {}
+
+    def record(self, name: str, value: float) -> None:
+        """Add a sample of a metric."""
+        if (samples := self._samples.get(name)) is None:
+            samples = self._samples[name] = deque(maxlen=self._window)
+        samples.append(value)
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """Record the milliseconds spent in the block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000)
+
+    def percentile(self, name: str, percentile: float) -> float | None:
+        """Return a nearest-rank percentile of a metric, None without samples."""
+        if not (samples := self._samples.get(name)):
+            return None
+        ordered = sorted(samples)
+        return ordered[round(percentile / 100 * (len(ordered) - 1))]
+
+    def summary(self) -> dict[str, dict[str, Any]]:
+        """Return the last value, p50, p95 and max of every metric."""
+        result = {}
+        for name, samples in sorted(self._samples.items()):
+            ordered = sorted(samples)
+            last = len(ordered) - 1
+            result[name] = {
+                "samples": len(ordered),
+                "last": round(samples[-1], 3),
+                "p50": round(ordered[round(0.5 * last)], 3),
+                "p95": round(ordered[round(0.95 * last)], 3),
+                "max": round(ordered[-1], 3),
+            }
+        return result
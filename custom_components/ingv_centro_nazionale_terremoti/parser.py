@@ -0,0 +1,381 @@
+"""Parsers for INGV FDSN event service responses.
+
+QuakeML is the richest format. The FDSN text and GeoJSON formats are much
+cheaper to parse but do not carry the evaluation mode and status of an event.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+from xml.etree import ElementTree
+
+from homeassistant.util.json import json_loads
+
+from .const import (
+    CHUNK_SIZE,
+    FEED_FORMAT_GEOJSON,
+    FEED_FORMAT_QUAKEML,
+    FEED_FORMAT_TEXT,
+)
+
+
+class IngvEvent:
+    """Compact record of a seismic event.
+
+    ``distance`` is only set on the copies held by a coordinator, measured from
+    the coordinates of its config entry. ``revision`` fingerprints the fields
+    that change when INGV revises an event.
+    """
+
+    __slots__ = (
+        "event_id",
+        "latitude",
+        "longitude",
+        "depth",
+        "magnitude",
+        "time",
+        "status",
+        "mode",
+        "region",
+        "updated",
+        "distance",
+        "revision",
+    )
+
+    def __init__(
+        self,
+        event_id: str,
+        latitude: float | None,
+        longitude: float | None,
+        depth: float | None,
+        magnitude: float | None,
+        time: datetime | None,
+        status: str | None = None,
+        mode: str | None = None,
+        region: str | None = None,
+        updated: datetime | None = None,
+        distance: float | None = None,
+    ) -> None:
+        """Initialize the record; depth is in kilometers."""
+        self.event_id = event_id
+        self.latitude = latitude
+        self.longitude = longitude
+        self.depth = depth
+        self.magnitude = magnitude
+        self.time = time
+        self.status = status
+        self.mode = mode
+        self.region = region
+        self.updated = updated
+        self.distance = distance
+        self.revision = hash(
+            (latitude, longitude, depth, magnitude, time, status, mode, region)
+        )
+
+    def __repr__(self) -> str:
+        """Return a short representation of the event."""
+        return f"<IngvEvent {self.event_id} M{self.magnitude} {self.time}>"
+
+    def localize(self, distance: float) -> IngvEvent:
+        """Return a copy of this event at the given distance from home."""
+        return IngvEvent(
+            self.event_id,
+            self.latitude,
+            self.longitude,
+            self.depth,
+            self.magnitude,
+            self.time,
+            self.status,
+            self.mode,
+            self.region,
+            self.updated,
+            distance,
+        )
+
+    def as_list(self) -> list[Any]:
+        """Return a JSON serializable representation of the event."""
+        return [
+            self.event_id,
+            self.latitude,
+            self.longitude,
+            self.depth,
+            self.magnitude,
+            _isoformat(self.time),
+            self.status,
+            self.mode,
+            self.region,
+            _isoformat(self.updated),
+        ]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON serializable dictionary of the event."""
+        return {
+            "event_id": self.event_id,
+            "time": _isoformat(self.time),
+            "latitude": self.latitude,
+            "longitude": self.longitude,
+            "depth": self.depth,
+            "magnitude": self.magnitude,
+            "status": self.status,
+            "mode": self.mode,
+            "region": self.region,
+            "updated": _isoformat(self.updated),
+        }
+
+    @classmethod
+    def from_list(cls, data: list[Any]) -> IngvEvent:
+        """Create an event from its serialized representation."""
+        event_id, latitude, longitude, depth, magnitude, time, *rest = data
+        status, mode, region, updated = rest
+        return cls(
+            event_id,
+            latitude,
+            longitude,
+            depth,
+            magnitude,
+            parse_time(time),
+            status,
+            mode,
+            region,
+            parse_time(updated),
+        )
+
+
+def extract_event_id(public_id: str) -> str:
+    """Extract the stable event id from a QuakeML public id."""
+    query = urlsplit(public_id).query
+    if query:
+        parsed_query = parse_qs(query)
+        if parsed_event_id := parsed_query.get("eventId"):
+            if event_id := parsed_event_id[0]:
+                return event_id
+
+    fallback_event_id = public_id.rsplit("/", maxsplit=1)[-1]
+    return fallback_event_id or public_id
+
+
+def extract_region(description: str | None) -> str | None:
+    """Extract region text from a description without the type prefix."""
+    if not description:
+        return None
+
+    prefix, separator, value = description.partition(":")
+    if separator and prefix.strip().lower() == "region name":
+        cleaned_value = value.strip()
+        return cleaned_value or None
+
+    return description.strip() or None
+
+
+def _isoformat(value: datetime | None) -> str | None:
+    """Serialize an optional datetime."""
+    return value.isoformat() if value else None
+
+
+def parse_time(value: str | None) -> datetime | None:
+    """Parse an FDSN ISO-8601 timestamp, assuming UTC when no offset is given."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip())
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def _float(value: str | None) -> float | None:
+    """Convert text to float, ignoring missing or invalid values."""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def _local_name(tag: str) -> str:
+    """Return an XML tag without its namespace."""
+    return tag.rpartition("}")[2]
+
+
+def _child(element: ElementTree.Element, *path: str) -> ElementTree.Element | None:
+    """Return the first descendant following the given local tag names."""
+    for name in path:
+        for child in element:
+            if _local_name(child.tag) == name:
+                element = child
+                break
+        else:
+            return None
+    return element
+
+
+def _text(element: ElementTree.Element, *path: str) -> str | None:
+    """Return the text of the descendant following the given local tag names."""
+    if (child := _child(element, *path)) is None or child.text is None:
+        return None
+    return child.text.strip()
+
+
+def parse_quakeml_event(element: ElementTree.Element) -> IngvEvent | None:
+    """Parse a single QuakeML event element."""
+    if not (public_id := element.get("publicID")):
+        return None
+
+    preferred_origin_id = _text(element, "preferredOriginID")
+    preferred_magnitude_id = _text(element, "preferredMagnitudeID")
+    origin = magnitude = None
+    creation_times = []
+    for child in element:
+        name = _local_name(child.tag)
+        if name == "origin":
+            if origin is None or child.get("publicID") == preferred_origin_id:
+                origin = child
+        elif name == "magnitude":
+            if magnitude is None or child.get("publicID") == preferred_magnitude_id:
+                magnitude = child
+        else:
+            continue
+        creation_times.append(_text(child, "creationInfo", "creationTime"))
+    if origin is None:
+        return None
+
+    creation_times.append(_text(element, "creationInfo", "creationTime"))
+    depth = _float(_text(origin, "depth", "value"))
+    return IngvEvent(
+        event_id=extract_event_id(public_id),
+        latitude=_float(_text(origin, "latitude", "value")),
+        longitude=_float(_text(origin, "longitude", "value")),
+        depth=depth / 1000 if depth is not None else None,
+        magnitude=(
+            _float(_text(magnitude, "mag", "value")) if magnitude is not None else None
+        ),
+        time=parse_time(_text(origin, "time", "value")),
+        status=_text(origin, "evaluationStatus"),
+        mode=_text(origin, "evaluationMode"),
+        region=extract_region(_text(element, "description", "text")),
+        updated=max(
+            (parsed for value in creation_times if (parsed := parse_time(value))),
+            default=None,
+        ),
+    )
+
+
+class QuakeMLStreamParser:
+    """Incrementally parse a QuakeML document, one event at a time.
+
+    Each ``event`` element is converted to a ``IngvEvent`` as soon as it is
+    complete and then dropped, so memory is bounded by a single event rather
+    than by the whole document.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the parser."""
+        self._parser = ElementTree.XMLPullParser(events=("start", "end"))
+        self._container: ElementTree.Element | None = None
+
+    def feed(self, data: bytes) -> list[IngvEvent]:
+        """Feed a chunk of the document, return the events it completed."""
+        self._parser.feed(data)
+        return self._read_events()
+
+    def close(self) -> list[IngvEvent]:
+        """Finish the document, return any remaining events."""
+        self._parser.close()
+        return self._read_events()
+
+    def _read_events(self) -> list[IngvEvent]:
+        """Convert completed event elements and release them."""
+        events = []
+        for action, element in self._parser.read_events():
+            name = _local_name(element.tag)
+            if action == "start":
+                if name == "eventParameters":
+                    self._container = element
+                continue
+            if name != "event":
+                continue
+            if (event := parse_quakeml_event(element)) is not None:
+                events.append(event)
+            element.clear()
+            if self._container is not None:
+                self._container.remove(element)
+        return events
+
+
+def parse_quakeml(data: bytes) -> list[IngvEvent]:
+    """Parse a QuakeML document into feed events."""
+    if not data:
+        return []
+    parser = QuakeMLStreamParser()
+    events = []
+    for offset in range(0, len(data), CHUNK_SIZE):
+        events.extend(parser.feed(data[offset : offset + CHUNK_SIZE]))
+    return events + parser.close()
+
+
+def _text_event(line: str) -> IngvEvent | None:
+    """Parse one line of an FDSN text response."""
+    fields = line.split("|")
+    if len(fields) < 13 or not fields[0]:
+        return None
+    return IngvEvent(
+        event_id=fields[0],
+        latitude=_float(fields[2]),
+        longitude=_float(fields[3]),
+        depth=_float(fields[4]),
+        magnitude=_float(fields[10]),
+        time=parse_time(fields[1]),
+        region=extract_region(fields[12]),
+    )
+
+
+def parse_text(data: bytes) -> list[IngvEvent]:
+    """Parse an FDSN text (pipe separated) document into feed events."""
+    return [
+        event
+        for line in data.decode("utf-8", "replace").splitlines()
+        if line
+        and not line.startswith("#")
+        and (event := _text_event(line)) is not None
+    ]
+
+
+def _geojson_event(feature: dict[str, Any]) -> IngvEvent | None:
+    """Parse one feature of a GeoJSON response."""
+    properties = feature.get("properties") or {}
+    if not (event_id := properties.get("eventId") or feature.get("id")):
+        return None
+    coordinates = (feature.get("geometry") or {}).get("coordinates") or ()
+    longitude, latitude, depth = (list(coordinates) + [None, None, None])[:3]
+    mag = properties.get("mag")
+    return IngvEvent(
+        event_id=str(event_id),
+        latitude=latitude,
+        longitude=longitude,
+        depth=depth,
+        magnitude=float(mag) if mag is not None else None,
+        time=parse_time(properties.get("time")),
+        region=extract_region(properties.get("place")),
+    )
+
+
+def parse_geojson(data: bytes) -> list[IngvEvent]:
+    """Parse a GeoJSON document into feed events."""
+    if not data:
+        return []
+    features = json_loads(data).get("features") or []
+    return [
+        event for feature in features if (event := _geojson_event(feature)) is not None
+    ]
+
+
+PARSERS = {
+    FEED_FORMAT_QUAKEML: parse_quakeml,
+    FEED_FORMAT_TEXT: parse_text,
+    FEED_FORMAT_GEOJSON: parse_geojson,
+}
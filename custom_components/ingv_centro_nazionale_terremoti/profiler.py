@@ -0,0 +1,148 @@
+"""Profiling of coordinator update cycles for the INGV Earthquakes integration.
+
+A session profiles the next refresh cycles of a set of coordinators with one
+``cProfile`` profiler, enabled while at least one of them is updating, and a
+``tracemalloc`` snapshot taken before the first cycle. Each cycle covers
+``async_update`` and the entity fan-out it triggers. Once every coordinator
+ran its cycles, the profile and a text report are written to the config
+directory.
+
+cProfile only sees the event loop thread, and everything that runs on it while
+a cycle awaits, including other integrations. Parsing in the executor shows up
+in the ``parse_ms`` diagnostics metric instead.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import io
+import logging
+import pstats
+import time
+import tracemalloc
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING
+
+from homeassistant.components import persistent_notification
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN, PROFILE, PROFILE_REPORT_LINES
+
+if TYPE_CHECKING:
+    from . import IngvDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ProfileSession:
+    """Profile the next refresh cycles of some coordinators."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinators: list[IngvDataUpdateCoordinator],
+        cycles: int,
+    ) -> None:
+        """Initialize the session."""
+        self._hass = hass
+        self._remaining = {coordinator: cycles for coordinator in coordinators}
+        self._cycles = cycles
+        self._profile = cProfile.Profile()
+        self._running = 0
+        self._started_tracing = False
+        self._snapshot: tracemalloc.Snapshot | None = None
+        self._start_time = int(time.time())
+
+    @property
+    def _notification_id(self) -> str:
+        """Return the id of the session's persistent notification."""
+        return f"{DOMAIN}_profile_{self._start_time}"
+
+    async def async_start(self) -> None:
+        """Take the first snapshot and attach the session to its coordinators."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self._snapshot = await self._hass.async_add_executor_job(
+            tracemalloc.take_snapshot
+        )
+        for coordinator in self._remaining:
+            coordinator.async_set_profile_session(self)
+        persistent_notification.async_create(
+            self._hass,
+            (
+                f"Profiling the next {self._cycles} update cycles of"
+                f" {len(self._remaining)} INGV feeds. This notification will be"
+                " updated when it is complete."
+            ),
+            title="INGV profile started",
+            notification_id=self._notification_id,
+        )
+
+    @asynccontextmanager
+    async def async_cycle(
+        self, coordinator: IngvDataUpdateCoordinator
+    ) -> AsyncIterator[None]:
+        """Profile one refresh cycle of a coordinator."""
+        if not self._running:
+            self._profile.enable()
+        self._running += 1
+        try:
+            yield
+        finally:
+            self._running -= 1
+            if not self._running:
+                self._profile.disable()
+            if (remaining := self._remaining.get(coordinator, 0) - 1) > 0:
+                self._remaining[coordinator] = remaining
+            else:
+                self.async_discard(coordinator)
+
+    @callback
+    def async_discard(self, coordinator: IngvDataUpdateCoordinator) -> None:
+        """Stop profiling a coordinator, finishing the session after the last."""
+        if self._remaining.pop(coordinator, None) is None:
+            return
+        coordinator.async_set_profile_session(None)
+        if not self._remaining:
+            self._hass.async_create_task(self._async_finish())
+
+    async def _async_finish(self) -> None:
+        """Write the profile and the report to the config directory."""
+        snapshot = await self._hass.async_add_executor_job(tracemalloc.take_snapshot)
+        if self._started_tracing:
+            tracemalloc.stop()
+        self._hass.data[DOMAIN].pop(PROFILE, None)
+        cprofile_path = self._hass.config.path(
+            f"{DOMAIN}.profile.{self._start_time}.cprof"
+        )
+        report_path = self._hass.config.path(
+            f"{DOMAIN}.profile.{self._start_time}.txt"
+        )
+        await self._hass.async_add_executor_job(
+            self._write, snapshot, cprofile_path, report_path
+        )
+        _LOGGER.info("Wrote profile to %s and %s", cprofile_path, report_path)
+        persistent_notification.async_create(
+            self._hass,
+            f"Wrote cProfile data to {cprofile_path} and a report to {report_path}",
+            title="INGV profile complete",
+            notification_id=self._notification_id,
+        )
+
+    def _write(
+        self, snapshot: tracemalloc.Snapshot, cprofile_path: str, report_path: str
+    ) -> None:
+        """Dump the profile and write the text report."""
+        self._profile.dump_stats(cprofile_path)
+        stream = io.StringIO()
+        stats = pstats.Stats(self._profile, stream=stream)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(PROFILE_REPORT_LINES)
+        stream.write("Memory allocated during the session, by line:\n")
+        for stat in snapshot.compare_to(self._snapshot, "lineno")[
+            :PROFILE_REPORT_LINES
+        ]:
+            stream.write(f"{stat}\n")
+        with open(report_path, "w", encoding="utf-8") as report:
+            report.write(stream.getvalue())
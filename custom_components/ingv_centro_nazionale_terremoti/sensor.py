@@ -1,11 +1,19 @@
-"""INGV Earthquakes integration status sensor."""
+"""INGV Earthquakes integration status and statistics sensors."""
 
 from __future__ import annotations
 
 import logging
+from abc import abstractmethod
+from datetime import timedelta
+from typing import Any
 
-from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import UnitOfEnergy, UnitOfLength, UnitOfTime
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.device_registry import DeviceEntryType
 from homeassistant.helpers.entity import DeviceInfo, EntityCategory
@@ -20,14 +28,23 @@ from .const import (
     ATTR_LAST_UPDATE,
     ATTR_LAST_UPDATE_SUCCESSFUL,
     ATTR_REMOVED,
+    ATTR_SKIPPED_UPDATES,
     ATTR_STATUS,
     ATTR_UPDATED,
+    ATTR_UPDATE_INTERVAL,
+    CONF_RECORDER_FRIENDLY,
     DEFAULT_FORCE_UPDATE,
+    DEFAULT_RECORDER_FRIENDLY,
     DEFAULT_UNIT_OF_MEASUREMENT,
     DOMAIN,
     FEED,
+    STATISTICS_RATES,
     VERSION,
 )
+from .hub import async_get_hub
+from .metrics import RollingMetrics
+from .parser import IngvEvent
+from .statistics import MAGNITUDE_BIN_NAMES, EventStatistics
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -35,6 +52,13 @@ _LOGGER = logging.getLogger(__name__)
 # An update of this entity is not making a web request, but uses internal data only.
 PARALLEL_UPDATES = 0
 
+# Metric sensors: key, name, and whether the metric belongs to the shared hub.
+METRIC_SENSORS = (
+    ("loop_ms", "update time", False),
+    ("fetch_ms", "fetch latency", True),
+    ("parse_ms", "parse time", True),
+)
+
 
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
@@ -43,10 +67,40 @@ async def async_setup_entry(
     coordinator = hass.data[DOMAIN][FEED][entry.entry_id]
     config_entry_unique_id = entry.unique_id
 
+    hub = async_get_hub(hass)
+    entity_class = (
+        IngvRecorderFriendlySensorEntity
+        if entry.options.get(CONF_RECORDER_FRIENDLY, DEFAULT_RECORDER_FRIENDLY)
+        else IngvSensorEntity
+    )
     async_add_entities(
-        [IngvSensorEntity(coordinator, config_entry_unique_id, entry.title)],
+        [entity_class(coordinator, config_entry_unique_id, entry.title)],
         True,
     )
+    async_add_entities(
+        IngvMetricSensorEntity(
+            coordinator,
+            config_entry_unique_id,
+            entry.title,
+            hub.metrics if shared else coordinator.metrics,
+            key,
+            name,
+        )
+        for key, name, shared in METRIC_SENSORS
+    )
+    args = (coordinator, config_entry_unique_id, entry.title)
+    async_add_entities(
+        [
+            IngvMagnitudeBinsSensorEntity(*args, "magnitude_bins", "magnitude bins"),
+            IngvMaxMagnitudeSensorEntity(*args, "max_magnitude", "max magnitude"),
+            IngvNearestEventSensorEntity(*args, "nearest_event", "nearest event"),
+            IngvSeismicEnergySensorEntity(*args, "seismic_energy", "seismic energy"),
+            *(
+                IngvEventRateSensorEntity(*args, key, name, window)
+                for key, name, window in STATISTICS_RATES
+            ),
+        ]
+    )
     _LOGGER.debug("Sensor setup done")
 
 
@@ -112,6 +166,14 @@ class IngvSensorEntity(CoordinatorEntity, SensorEntity):
                 (ATTR_CREATED, status_info.created),
                 (ATTR_UPDATED, status_info.updated),
                 (ATTR_REMOVED, status_info.removed),
+                (
+                    ATTR_UPDATE_INTERVAL,
+                    round(self.coordinator.update_interval.total_seconds()),
+                ),
+                (
+                    ATTR_SKIPPED_UPDATES,
+                    self.coordinator.counters["skipped_updates"],
+                ),
             ):
                 if value or isinstance(value, bool):
                     self._attr_extra_state_attributes[key] = value
@@ -121,3 +183,226 @@ class IngvSensorEntity(CoordinatorEntity, SensorEntity):
         """Handle updated data from the coordinator."""
         self._update_internal_state()
         super()._handle_coordinator_update()
+
+
+class IngvRecorderFriendlySensorEntity(IngvSensorEntity):
+    """Status sensor that is not forced to write unchanged states.
+
+    Attributes that change on every update are not recorded, so consecutive
+    states share their recorded attributes.
+    """
+
+    _attr_force_update = False
+    _unrecorded_attributes = frozenset(
+        {
+            ATTR_LAST_UPDATE,
+            ATTR_LAST_UPDATE_SUCCESSFUL,
+            ATTR_SKIPPED_UPDATES,
+            ATTR_UPDATE_INTERVAL,
+        }
+    )
+
+
+class IngvMetricSensorEntity(CoordinatorEntity, SensorEntity):
+    """Rolling 95th percentile of a performance metric, disabled by default."""
+
+    coordinator: IngvDataUpdateCoordinator
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(
+        self,
+        coordinator: IngvDataUpdateCoordinator,
+        config_entry_unique_id: str | None,
+        config_title: str | None,
+        metrics: RollingMetrics,
+        key: str,
+        name: str,
+    ) -> None:
+        """Initialize the entity."""
+        super().__init__(coordinator)
+        self._metrics = metrics
+        self._key = key
+        self._attr_unique_id = f"{config_entry_unique_id}_{key}"
+        self._attr_name = f"Ingv Earthquakes {config_title} {name}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, coordinator.entry.entry_id)},
+        )
+
+    async def async_added_to_hass(self) -> None:
+        """Handle entity which will be added."""
+        await super().async_added_to_hass()
+        self._update_internal_state()
+
+    def _update_internal_state(self) -> None:
+        """Update state and attributes from the metric samples."""
+        value = self._metrics.percentile(self._key, 95)
+        self._attr_native_value = None if value is None else round(value, 1)
+        self._attr_extra_state_attributes = {
+            name: round(value, 1)
+            for name, value in (
+                ("p50", self._metrics.percentile(self._key, 50)),
+                ("max", self._metrics.percentile(self._key, 100)),
+            )
+            if value is not None
+        }
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        self._update_internal_state()
+        super()._handle_coordinator_update()
+
+
+class IngvStatisticsSensorEntity(CoordinatorEntity, SensorEntity):
+    """Base of the sensors reporting the statistics of an entry."""
+
+    coordinator: IngvDataUpdateCoordinator
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(
+        self,
+        coordinator: IngvDataUpdateCoordinator,
+        config_entry_unique_id: str | None,
+        config_title: str | None,
+        key: str,
+        name: str,
+    ) -> None:
+        """Initialize the entity."""
+        super().__init__(coordinator)
+        self._attr_unique_id = f"{config_entry_unique_id}_{key}"
+        self._attr_name = f"Ingv Earthquakes {config_title} {name}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, coordinator.entry.entry_id)},
+        )
+
+    async def async_added_to_hass(self) -> None:
+        """Handle entity which will be added."""
+        await super().async_added_to_hass()
+        self._update_internal_state()
+
+    @abstractmethod
+    def _update_internal_state(self) -> None:
+        """Update state and attributes from the statistics."""
+
+    @property
+    def _statistics(self) -> EventStatistics:
+        """Return the statistics of the entry."""
+        return self.coordinator.statistics
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        self._update_internal_state()
+        super()._handle_coordinator_update()
+
+
+def _event_attributes(event: IngvEvent) -> dict[str, Any]:
+    """Return the attributes describing the event behind a statistic."""
+    return {
+        key: value
+        for key, value in (
+            ("event_id", event.event_id),
+            ("region", event.region),
+            ("magnitude", event.magnitude),
+            (
+                "distance",
+                round(event.distance, 1) if event.distance is not None else None,
+            ),
+            ("time", event.time),
+        )
+        if value is not None
+    }
+
+
+class IngvMagnitudeBinsSensorEntity(IngvStatisticsSensorEntity):
+    """Number of events, with the number of events in each magnitude bin."""
+
+    _attr_icon = "mdi:chart-histogram"
+    _attr_native_unit_of_measurement = DEFAULT_UNIT_OF_MEASUREMENT
+
+    def _update_internal_state(self) -> None:
+        """Update state and attributes from the statistics."""
+        statistics = self._statistics
+        self._attr_native_value = len(statistics)
+        self._attr_extra_state_attributes = dict(
+            zip(MAGNITUDE_BIN_NAMES, statistics.bins)
+        )
+
+
+class IngvMaxMagnitudeSensorEntity(IngvStatisticsSensorEntity):
+    """Largest magnitude of the events."""
+
+    _attr_icon = "mdi:pulse"
+
+    def _update_internal_state(self) -> None:
+        """Update state and attributes from the statistics."""
+        if (event := self._statistics.largest) is None:
+            self._attr_native_value = None
+            self._attr_extra_state_attributes = {}
+            return
+        self._attr_native_value = event.magnitude
+        self._attr_extra_state_attributes = _event_attributes(event)
+
+
+class IngvNearestEventSensorEntity(IngvStatisticsSensorEntity):
+    """Distance of the nearest event."""
+
+    _attr_device_class = SensorDeviceClass.DISTANCE
+    _attr_native_unit_of_measurement = UnitOfLength.KILOMETERS
+    _attr_suggested_display_precision = 1
+
+    def _update_internal_state(self) -> None:
+        """Update state and attributes from the statistics."""
+        if (event := self._statistics.nearest) is None:
+            self._attr_native_value = None
+            self._attr_extra_state_attributes = {}
+            return
+        self._attr_native_value = round(event.distance, 1)
+        self._attr_extra_state_attributes = _event_attributes(event)
+
+
+class IngvSeismicEnergySensorEntity(IngvStatisticsSensorEntity):
+    """Seismic energy released by the events, with their total seismic moment."""
+
+    _attr_icon = "mdi:lightning-bolt"
+    _attr_native_unit_of_measurement = UnitOfEnergy.GIGA_JOULE
+    _attr_suggested_display_precision = 3
+
+    def _update_internal_state(self) -> None:
+        """Update state and attributes from the statistics."""
+        statistics = self._statistics
+        self._attr_native_value = statistics.energy / 1e9
+        self._attr_extra_state_attributes = {
+            "moment": float(f"{statistics.moment:.4g}")
+        }
+
+
+class IngvEventRateSensorEntity(IngvStatisticsSensorEntity):
+    """Number of events in a rolling window, with their hourly rate."""
+
+    _attr_icon = "mdi:timer-sand"
+    _attr_native_unit_of_measurement = DEFAULT_UNIT_OF_MEASUREMENT
+
+    def __init__(
+        self,
+        coordinator: IngvDataUpdateCoordinator,
+        config_entry_unique_id: str | None,
+        config_title: str | None,
+        key: str,
+        name: str,
+        window: timedelta,
+    ) -> None:
+        """Initialize the entity."""
+        super().__init__(coordinator, config_entry_unique_id, config_title, key, name)
+        self._window = window
+
+    def _update_internal_state(self) -> None:
+        """Update state and attributes from the statistics."""
+        count = self._statistics.count_since(dt.utcnow() - self._window)
+        hours = self._window.total_seconds() / 3600
+        self._attr_native_value = count
+        self._attr_extra_state_attributes = {"per_hour": round(count / hours, 3)}
@@ -0,0 +1,178 @@
+"""Services of the INGV Earthquakes integration."""
+
+from __future__ import annotations
+
+import sqlite3
+from functools import partial
+from importlib import import_module
+
+import homeassistant.helpers.config_validation as cv
+import voluptuous as vol
+from homeassistant.const import CONF_LATITUDE, CONF_LONGITUDE, CONF_RADIUS
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    ATTR_CONFIG_ENTRY_ID,
+    ATTR_CYCLES,
+    ATTR_LIMIT,
+    ATTR_MAXIMUM_MAGNITUDE,
+    ATTR_SINCE,
+    CONF_MINIMUM_MAGNITUDE,
+    DOMAIN,
+    FEED,
+    PROFILE,
+    PROFILE_MAX_CYCLES,
+    QUERY_DEFAULT_LIMIT,
+    QUERY_MAX_LIMIT,
+    SERVICE_NEARBY_EVENTS,
+    SERVICE_PROFILE,
+    SERVICE_QUERY_EVENTS,
+)
+from .hub import async_get_hub
+from .parser import IngvEvent
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_CYCLES, default=1): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=PROFILE_MAX_CYCLES)
+        ),
+    }
+)
+
+NEARBY_EVENTS_SCHEMA = vol.Schema(
+    {
+        vol.Inclusive(CONF_LATITUDE, "location"): cv.latitude,
+        vol.Inclusive(CONF_LONGITUDE, "location"): cv.longitude,
+        vol.Required(CONF_RADIUS): vol.All(vol.Coerce(float), vol.Range(min=0)),
+        vol.Optional(CONF_MINIMUM_MAGNITUDE): vol.Coerce(float),
+        vol.Optional(ATTR_LIMIT, default=QUERY_DEFAULT_LIMIT): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=QUERY_MAX_LIMIT)
+        ),
+    }
+)
+
+QUERY_EVENTS_SCHEMA = vol.Schema(
+    {
+        vol.Inclusive(CONF_LATITUDE, "location"): cv.latitude,
+        vol.Inclusive(CONF_LONGITUDE, "location"): cv.longitude,
+        vol.Optional(CONF_RADIUS): vol.All(vol.Coerce(float), vol.Range(min=0)),
+        vol.Optional(CONF_MINIMUM_MAGNITUDE): vol.Coerce(float),
+        vol.Optional(ATTR_MAXIMUM_MAGNITUDE): vol.Coerce(float),
+        vol.Optional(ATTR_SINCE): cv.positive_time_period,
+        vol.Optional(ATTR_LIMIT, default=QUERY_DEFAULT_LIMIT): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=QUERY_MAX_LIMIT)
+        ),
+    }
+)
+
+
+def _events_response(events: list[IngvEvent], count: int) -> ServiceResponse:
+    """Return the number of matching events and some of them, with distances."""
+    return {
+        "count": count,
+        "events": [
+            {**event.as_dict(), "distance": round(event.distance, 1)}
+            if event.distance is not None
+            else event.as_dict()
+            for event in events
+        ],
+    }
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration services."""
+
+    async def async_profile(call: ServiceCall) -> None:
+        """Profile the next update cycles of one or all feeds."""
+        # cProfile, pstats and tracemalloc are only needed once profiling.
+        profiler = await hass.async_add_executor_job(
+            import_module, f"{__package__}.profiler"
+        )
+        domain_data = hass.data.setdefault(DOMAIN, {})
+        if domain_data.get(PROFILE) is not None:
+            raise ServiceValidationError("A profile is already running")
+        feeds = domain_data.get(FEED, {})
+        if entry_id := call.data.get(ATTR_CONFIG_ENTRY_ID):
+            if entry_id not in feeds:
+                raise ServiceValidationError(
+                    f"No loaded INGV Earthquakes entry with id {entry_id}"
+                )
+            coordinators = [feeds[entry_id]]
+        elif not (coordinators := list(feeds.values())):
+            raise ServiceValidationError("No loaded INGV Earthquakes entries")
+
+        session = domain_data[PROFILE] = profiler.ProfileSession(
+            hass, coordinators, call.data[ATTR_CYCLES]
+        )
+        await session.async_start()
+
+    @callback
+    def async_nearby_events(call: ServiceCall) -> ServiceResponse:
+        """Return the events held for all entries near a point, nearest first."""
+        events = async_get_hub(hass).async_events_near(
+            call.data.get(CONF_LATITUDE, hass.config.latitude),
+            call.data.get(CONF_LONGITUDE, hass.config.longitude),
+            call.data[CONF_RADIUS],
+        )
+        if (minimum_magnitude := call.data.get(CONF_MINIMUM_MAGNITUDE)) is not None:
+            events = [
+                event
+                for event in events
+                if event.magnitude is not None
+                and event.magnitude >= minimum_magnitude
+            ]
+        return _events_response(events[: call.data[ATTR_LIMIT]], len(events))
+
+    async def async_query_events(call: ServiceCall) -> ServiceResponse:
+        """Return the catalog events matching a location, magnitude and time."""
+        if (catalog := async_get_hub(hass).catalog) is None:
+            raise ServiceValidationError("The INGV event catalog is disabled")
+        since = call.data.get(ATTR_SINCE)
+        criteria = {
+            "latitude": call.data.get(CONF_LATITUDE, hass.config.latitude),
+            "longitude": call.data.get(CONF_LONGITUDE, hass.config.longitude),
+            "radius": call.data.get(CONF_RADIUS),
+            "minimum_magnitude": call.data.get(CONF_MINIMUM_MAGNITUDE),
+            "maximum_magnitude": call.data.get(ATTR_MAXIMUM_MAGNITUDE),
+            "start": dt_util.utcnow() - since if since else None,
+        }
+        try:
+            count = await hass.async_add_executor_job(
+                partial(catalog.count, **criteria)
+            )
+            events = await hass.async_add_executor_job(
+                partial(catalog.query, **criteria, limit=call.data[ATTR_LIMIT])
+            )
+        except sqlite3.Error as err:
+            raise HomeAssistantError(
+                f"Unable to query the event catalog: {err}"
+            ) from err
+        return _events_response(events, count)
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_PROFILE, async_profile, schema=PROFILE_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_NEARBY_EVENTS,
+        async_nearby_events,
+        schema=NEARBY_EVENTS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_QUERY_EVENTS,
+        async_query_events,
+        schema=QUERY_EVENTS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
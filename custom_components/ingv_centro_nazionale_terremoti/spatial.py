@@ -0,0 +1,151 @@
+"""Great-circle distances and an in-memory spatial index of events.
+
+The index buckets events by a grid of ``SPATIAL_CELL_DEGREES`` cells. A radius
+query only visits the cells overlapping the bounding box of the circle, then
+measures the exact distance of the events they hold, so its cost depends on
+the events near the point rather than on the size of the event store.
+"""
+
+from __future__ import annotations
+
+import math
+from collections.abc import Iterable
+
+from .const import SPATIAL_CELL_DEGREES
+from .parser import IngvEvent
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def haversine_km(
+    latitude_1: float, longitude_1: float, latitude_2: float, longitude_2: float
+) -> float:
+    """Return the great-circle distance between two points in kilometers."""
+    phi_1 = math.radians(latitude_1)
+    phi_2 = math.radians(latitude_2)
+    delta_phi = phi_2 - phi_1
+    delta_lambda = math.radians(longitude_2 - longitude_1)
+    a = (
+        math.sin(delta_phi / 2) ** 2
+        + math.cos(phi_1) * math.cos(phi_2) * math.sin(delta_lambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(
+    latitude: float, longitude: float, radius: float
+) -> tuple[float, float, float, float] | None:
+    """Return south, north, west and east bounds of a circle in degrees.
+
+    Return None when the circle reaches a pole or spans every longitude.
+    West and east are not wrapped, so west may be below -180 and east above
+    180 around the antimeridian.
+    """
+    delta_latitude = math.degrees(radius / EARTH_RADIUS_KM)
+    south = latitude - delta_latitude
+    north = latitude + delta_latitude
+    widest = max(abs(south), abs(north))
+    if widest >= 89.0:
+        return None
+    delta_longitude = math.degrees(
+        radius / (EARTH_RADIUS_KM * math.cos(math.radians(widest)))
+    )
+    if delta_longitude >= 180.0:
+        return None
+    return south, north, longitude - delta_longitude, longitude + delta_longitude
+
+
+class SpatialIndex:
+    """Grid index of events by location, updated one event at a time."""
+
+    def __init__(self, cell_degrees: float = SPATIAL_CELL_DEGREES) -> None:
+        """Initialize an empty index."""
+        self._size = cell_degrees
+        self._columns = round(360 / cell_degrees)
+        self._buckets: dict[tuple[int, int], dict[str, IngvEvent]] = {}
+        self._cells: dict[str, tuple[int, int]] = {}
+
+    def __len__(self) -> int:
+        """Return the number of indexed events."""
+        return len(self._cells)
+
+    @property
+    def buckets(self) -> int:
+        """Return the number of non-empty cells."""
+        return len(self._buckets)
+
+    def _cell(self, latitude: float, longitude: float) -> tuple[int, int]:
+        """Return the cell holding a location."""
+        return (
+            math.floor(latitude / self._size),
+            math.floor(longitude / self._size) % self._columns,
+        )
+
+    def add(self, event: IngvEvent) -> None:
+        """Index an event, or move it after a revision changed its location."""
+        if event.latitude is None or event.longitude is None:
+            self.discard(event.event_id)
+            return
+        cell = self._cell(event.latitude, event.longitude)
+        if (previous := self._cells.get(event.event_id)) != cell:
+            if previous is not None:
+                self._remove_from(previous, event.event_id)
+            self._cells[event.event_id] = cell
+        self._buckets.setdefault(cell, {})[event.event_id] = event
+
+    def update(self, events: Iterable[IngvEvent]) -> None:
+        """Index some events."""
+        for event in events:
+            self.add(event)
+
+    def discard(self, event_id: str) -> None:
+        """Remove an event from the index if it is there."""
+        if (cell := self._cells.pop(event_id, None)) is not None:
+            self._remove_from(cell, event_id)
+
+    def _remove_from(self, cell: tuple[int, int], event_id: str) -> None:
+        """Remove an event from a bucket, dropping the bucket once empty."""
+        bucket = self._buckets[cell]
+        del bucket[event_id]
+        if not bucket:
+            del self._buckets[cell]
+
+    def clear(self) -> None:
+        """Remove every event."""
+        self._buckets.clear()
+        self._cells.clear()
+
+    def _candidate_buckets(
+        self, latitude: float, longitude: float, radius: float
+    ) -> Iterable[dict[str, IngvEvent]]:
+        """Return the buckets that may hold events within radius of a point."""
+        if (box := bounding_box(latitude, longitude, radius)) is None:
+            return self._buckets.values()
+        south, north, west, east = box
+        size = self._size
+        rows = range(math.floor(south / size), math.floor(north / size) + 1)
+        columns = range(math.floor(west / size), math.floor(east / size) + 1)
+        if len(rows) * len(columns) >= len(self._buckets):
+            # Sparse index: scanning the occupied cells is cheaper.
+            return self._buckets.values()
+        buckets = self._buckets
+        return [
+            bucket
+            for row in rows
+            for column in columns
+            if (bucket := buckets.get((row, column % self._columns))) is not None
+        ]
+
+    def query(
+        self, latitude: float, longitude: float, radius: float
+    ) -> list[tuple[float, IngvEvent]]:
+        """Return the events within radius km of a point with their distance."""
+        matches = []
+        for bucket in self._candidate_buckets(latitude, longitude, radius):
+            for event in bucket.values():
+                distance = haversine_km(
+                    latitude, longitude, event.latitude, event.longitude
+                )
+                if distance <= radius:
+                    matches.append((distance, event))
+        return matches
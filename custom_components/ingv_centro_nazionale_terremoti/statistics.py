@@ -0,0 +1,203 @@
+"""Seismic statistics of the events of a config entry.
+
+The statistics are adjusted one event at a time as events are added, revised
+and removed, so keeping them up to date costs time in the number of changes
+rather than in the number of events.
+
+Magnitude bins, the largest and nearest event and the released energy and
+moment cover the events of the entry. Event counts cover rolling windows of
+up to ``STATISTICS_WINDOW``, which may be longer than the entry's start time:
+events that age out of the entry stay counted until they leave the longest
+window.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+from bisect import bisect_left, insort
+from collections.abc import Callable, Iterable
+from datetime import datetime
+
+from .const import MAGNITUDE_BINS
+from .parser import IngvEvent
+
+# Attribute names of the magnitude bins.
+MAGNITUDE_BIN_NAMES = [
+    f"below_{MAGNITUDE_BINS[0]:g}",
+    *(f"{low:g}_to_{high:g}" for low, high in zip(MAGNITUDE_BINS, MAGNITUDE_BINS[1:])),
+    f"{MAGNITUDE_BINS[-1]:g}_and_above",
+]
+
+# Heaps are rebuilt once they hold this many times more entries than events.
+HEAP_SLACK = 2
+
+
+def seismic_energy(magnitude: float) -> float:
+    """Return the energy radiated by an earthquake in joules.
+
+    Uses the Gutenberg-Richter energy relation.
+    """
+    return 10 ** (1.5 * magnitude + 4.8)
+
+
+def seismic_moment(magnitude: float) -> float:
+    """Return the seismic moment of an earthquake in newton meters.
+
+    Uses the Hanks-Kanamori moment magnitude relation.
+    """
+    return 10 ** (1.5 * magnitude + 9.1)
+
+
+def magnitude_bin(magnitude: float) -> int:
+    """Return the index of the magnitude bin of a magnitude."""
+    for index, edge in enumerate(MAGNITUDE_BINS):
+        if magnitude < edge:
+            return index
+    return len(MAGNITUDE_BINS)
+
+
+class _LazyHeap:
+    """Heap of events whose stale entries are dropped when they reach the top."""
+
+    def __init__(self, key: Callable[[IngvEvent], float]) -> None:
+        """Initialize an empty heap ordered by key."""
+        self._key = key
+        self._heap: list[tuple[float, int, IngvEvent]] = []
+        self._sequence = 0
+
+    def push(self, event: IngvEvent) -> None:
+        """Add an event."""
+        self._sequence += 1
+        heapq.heappush(self._heap, (self._key(event), self._sequence, event))
+
+    def top(self, current: dict[str, IngvEvent]) -> IngvEvent | None:
+        """Return the first event that is still current."""
+        heap = self._heap
+        while heap:
+            event = heap[0][2]
+            if current.get(event.event_id) is event:
+                return event
+            heapq.heappop(heap)
+        return None
+
+    def rebuild(self, events: Iterable[IngvEvent]) -> None:
+        """Replace the entries with the current events."""
+        self._heap = []
+        for event in events:
+            self.push(event)
+
+    def __len__(self) -> int:
+        """Return the number of entries, stale ones included."""
+        return len(self._heap)
+
+
+class EventStatistics:
+    """Statistics of the events of a config entry, adjusted incrementally."""
+
+    def __init__(self) -> None:
+        """Initialize empty statistics."""
+        self._events: dict[str, IngvEvent] = {}
+        self.bins = [0] * (len(MAGNITUDE_BINS) + 1)
+        self.energy = 0.0
+        self.moment = 0.0
+        self._largest = _LazyHeap(lambda event: -event.magnitude)
+        self._nearest = _LazyHeap(lambda event: event.distance)
+        # Sorted times and event ids in the rolling windows, and each event's time.
+        self._times: list[tuple[float, str]] = []
+        self._timed: dict[str, float] = {}
+
+    def __len__(self) -> int:
+        """Return the number of events with a magnitude."""
+        return len(self._events)
+
+    @property
+    def largest(self) -> IngvEvent | None:
+        """Return the event with the largest magnitude."""
+        return self._largest.top(self._events)
+
+    @property
+    def nearest(self) -> IngvEvent | None:
+        """Return the nearest event."""
+        return self._nearest.top(self._events)
+
+    def add(self, event: IngvEvent) -> None:
+        """Account for a new event, or for the revision of an event."""
+        self._discard(event.event_id)
+        if event.time is not None:
+            self._set_time(event.event_id, event.time.timestamp())
+        if event.magnitude is None:
+            return
+        self._events[event.event_id] = event
+        self.bins[magnitude_bin(event.magnitude)] += 1
+        self.energy += seismic_energy(event.magnitude)
+        self.moment += seismic_moment(event.magnitude)
+        self._largest.push(event)
+        if event.distance is not None:
+            self._nearest.push(event)
+        if len(self._largest) > HEAP_SLACK * len(self._events) + 16:
+            self._rebuild()
+
+    def remove(self, event_id: str, *, expired: bool) -> None:
+        """Stop accounting for an event.
+
+        An expired event is still counted in the rolling windows.
+        """
+        self._discard(event_id)
+        if expired or (timestamp := self._timed.pop(event_id, None)) is None:
+            return
+        self._remove_time(timestamp, event_id)
+
+    def count_since(self, start: datetime) -> int:
+        """Return the number of events that happened since start."""
+        return len(self._times) - bisect_left(self._times, (start.timestamp(),))
+
+    def expire(self, before: datetime) -> None:
+        """Forget the events that happened before a time."""
+        index = bisect_left(self._times, (before.timestamp(),))
+        for _, event_id in self._times[:index]:
+            del self._timed[event_id]
+        del self._times[:index]
+
+    def seed(self, events: Iterable[IngvEvent]) -> None:
+        """Count past events in the rolling windows only."""
+        for event in events:
+            if event.time is not None:
+                self._set_time(event.event_id, event.time.timestamp())
+
+    def _discard(self, event_id: str) -> None:
+        """Remove the contribution of an event to the aggregates."""
+        if (event := self._events.pop(event_id, None)) is None:
+            return
+        self.bins[magnitude_bin(event.magnitude)] -= 1
+        if not self._events:
+            # Start over from exact zeros rather than rounding leftovers.
+            self.energy = self.moment = 0.0
+            self._largest.rebuild(())
+            self._nearest.rebuild(())
+            return
+        self.energy -= seismic_energy(event.magnitude)
+        self.moment -= seismic_moment(event.magnitude)
+
+    def _set_time(self, event_id: str, timestamp: float) -> None:
+        """Place an event in the rolling windows."""
+        if (previous := self._timed.get(event_id)) == timestamp:
+            return
+        if previous is not None:
+            self._remove_time(previous, event_id)
+        self._timed[event_id] = timestamp
+        insort(self._times, (timestamp, event_id))
+
+    def _remove_time(self, timestamp: float, event_id: str) -> None:
+        """Remove an event from the rolling windows."""
+        index = bisect_left(self._times, (timestamp, event_id))
+        if index < len(self._times) and self._times[index] == (timestamp, event_id):
+            del self._times[index]
+
+    def _rebuild(self) -> None:
+        """Drop stale heap entries and the rounding drift of the sums."""
+        events = self._events.values()
+        self._largest.rebuild(events)
+        self._nearest.rebuild(event for event in events if event.distance is not None)
+        self.energy = math.fsum(seismic_energy(event.magnitude) for event in events)
+        self.moment = math.fsum(seismic_moment(event.magnitude) for event in events)
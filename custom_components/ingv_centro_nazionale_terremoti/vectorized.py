@@ -0,0 +1,174 @@
+"""Vectorized distance and filter engine over the events of the feed hub.
+
+The coordinates, magnitudes and times of the stored events are kept in
+contiguous NumPy arrays, updated one event at a time like the spatial index.
+The distance, magnitude and radius filters of every registered entry are then
+applied in a single batched pass: one haversine matrix of entries by events.
+Unit conversions are not part of it: geo_location entities convert distance
+and depth for imperial systems themselves, once per event revision.
+
+NumPy is optional. It is only imported by ``load_event_arrays``, in the
+executor on the first fetch, so it stays out of the startup path.
+Without it the coordinators filter the events one at a time.
+"""
+
+from __future__ import annotations
+
+import math
+from collections.abc import Iterable, Sequence
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
+
+from .parser import IngvEvent
+from .spatial import EARTH_RADIUS_KM
+
+if TYPE_CHECKING:
+    from types import ModuleType
+
+    from .hub import FeedFilter
+
+# Rows allocated when the arrays are first used.
+INITIAL_CAPACITY = 1024
+
+# Array attributes of ``EventArrays``, one value per row.
+COLUMNS = ("_phi", "_lambda", "_cos_phi", "_magnitude", "_time")
+
+
+def load_event_arrays() -> EventArrays | None:
+    """Return empty event arrays, None when NumPy is not installed.
+
+    Imports NumPy, so it blocks and is meant to run in the executor.
+    """
+    try:
+        import numpy  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return None
+    return EventArrays(numpy)
+
+
+class EventArrays:
+    """Columns of event coordinates, magnitudes and times, one row per event.
+
+    Rows of removed events are cleared to NaN, which never matches a filter,
+    and reused by the next added event.
+    """
+
+    def __init__(self, numpy: ModuleType) -> None:
+        """Initialize empty arrays."""
+        self._np = numpy
+        self._rows: dict[str, int] = {}
+        self._records: list[IngvEvent | None] = []
+        self._free: list[int] = []
+        self._allocate(INITIAL_CAPACITY)
+
+    def _allocate(self, capacity: int) -> None:
+        """Grow the arrays to capacity rows, keeping their content."""
+        for name in COLUMNS:
+            column = self._np.full(capacity, math.nan)
+            if (previous := getattr(self, name, None)) is not None:
+                column[: len(previous)] = previous
+            setattr(self, name, column)
+
+    def __len__(self) -> int:
+        """Return the number of events held."""
+        return len(self._rows)
+
+    def add(self, event: IngvEvent) -> None:
+        """Hold an event, or overwrite the row of its previous revision."""
+        if (row := self._rows.get(event.event_id)) is None:
+            if self._free:
+                row = self._free.pop()
+            else:
+                row = len(self._records)
+                self._records.append(None)
+                if row == len(self._phi):
+                    self._allocate(2 * row)
+            self._rows[event.event_id] = row
+        self._records[row] = event
+        if event.latitude is None or event.longitude is None:
+            self._phi[row] = self._lambda[row] = self._cos_phi[row] = math.nan
+        else:
+            phi = math.radians(event.latitude)
+            self._phi[row] = phi
+            self._lambda[row] = math.radians(event.longitude)
+            self._cos_phi[row] = math.cos(phi)
+        self._magnitude[row] = math.nan if event.magnitude is None else event.magnitude
+        self._time[row] = math.nan if event.time is None else event.time.timestamp()
+
+    def update(self, events: Iterable[IngvEvent]) -> None:
+        """Hold some events."""
+        for event in events:
+            self.add(event)
+
+    def discard(self, event_id: str) -> None:
+        """Drop an event if it is held."""
+        if (row := self._rows.pop(event_id, None)) is None:
+            return
+        self._records[row] = None
+        self._phi[row] = self._lambda[row] = self._cos_phi[row] = math.nan
+        self._magnitude[row] = self._time[row] = math.nan
+        self._free.append(row)
+
+    def clear(self) -> None:
+        """Drop every event."""
+        self._rows.clear()
+        self._records.clear()
+        self._free.clear()
+        for name in COLUMNS:
+            getattr(self, name).fill(math.nan)
+
+    def distances(self, points: Sequence[tuple[float, float]]) -> Any:
+        """Return the distances in km from each point to each row.
+
+        The result has one row per point and one column per array row.
+        """
+        np = self._np
+        size = len(self._records)
+        origins = np.radians(np.asarray(points, dtype=float).reshape(-1, 2))
+        phi = origins[:, :1]
+        half_phi = np.sin((self._phi[:size] - phi) / 2)
+        half_lambda = np.sin((self._lambda[:size] - origins[:, 1:]) / 2)
+        a = half_phi * half_phi + np.cos(phi) * self._cos_phi[:size] * (
+            half_lambda * half_lambda
+        )
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+    def match(self, filters: Sequence[FeedFilter]) -> list[tuple[Any, Any]]:
+        """Apply the location and magnitude criteria of filters in one pass.
+
+        Return, for each filter, the matching rows and their distances. Start
+        times are left to ``select``, so matches stay valid while the events
+        do not change.
+        """
+        np = self._np
+        distances = self.distances(
+            [(feed_filter.latitude, feed_filter.longitude) for feed_filter in filters]
+        )
+        radii = np.array([feed_filter.radius for feed_filter in filters])
+        magnitudes = np.array(
+            [feed_filter.minimum_magnitude for feed_filter in filters]
+        )
+        within = (distances <= radii[:, None]) & (
+            self._magnitude[: len(self._records)] >= magnitudes[:, None]
+        )
+        matches = []
+        for row, mask in enumerate(within):
+            rows = np.flatnonzero(mask)
+            matches.append((rows, distances[row, rows]))
+        return matches
+
+    def select(
+        self, rows: Any, distances: Any, starttime: datetime
+    ) -> list[tuple[float, IngvEvent]]:
+        """Return the events of matched rows that happened since starttime.
+
+        Events without a time are kept, like the scalar filter does.
+        """
+        keep = ~(self._time[rows] < starttime.timestamp())
+        records = self._records
+        return list(
+            zip(
+                distances[keep].tolist(),
+                [records[row] for row in rows[keep].tolist()],
+            )
+        )
@@ -0,0 +1 @@
+"""Tests for the INGV Earthquakes integration."""
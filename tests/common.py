@@ -0,0 +1,114 @@
+"""Common helpers for the INGV Earthquakes tests."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from homeassistant.const import (
+    CONF_LATITUDE,
+    CONF_LOCATION,
+    CONF_LONGITUDE,
+    CONF_RADIUS,
+)
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.ingv_centro_nazionale_terremoti import (
+    IngvDataUpdateCoordinator,
+)
+from custom_components.ingv_centro_nazionale_terremoti.const import (
+    CONF_FEED_FORMAT,
+    DOMAIN,
+    FEED,
+    FEED_FORMAT_TEXT,
+)
+from custom_components.ingv_centro_nazionale_terremoti.hub import async_get_hub
+
+HOME = (42.79, 13.13)
+
+TEXT_HEADER = (
+    "#EventID|Time|Latitude|Longitude|Depth/Km|Author|Catalog|Contributor"
+    "|ContributorID|MagType|Magnitude|MagAuthor|EventLocationName|EventType"
+)
+
+
+def text_line(
+    event_id: str,
+    time: datetime | None = None,
+    latitude: float = HOME[0],
+    longitude: float = HOME[1],
+    magnitude: float = 3.1,
+    region: str = "3 km E Norcia (PG)",
+) -> str:
+    """Return one event of an FDSN text response, an hour old by default."""
+    time = time or dt_util.utcnow() - timedelta(hours=1)
+    return (
+        f"{event_id}|{time.strftime('%Y-%m-%dT%H:%M:%S.%f')}|{latitude}|{longitude}"
+        f"|9.0|SURVEY-INGV||||ML|{magnitude}|--|{region}|earthquake"
+    )
+
+
+def text_body(*lines: str) -> bytes:
+    """Return an FDSN text response holding some events."""
+    return "\n".join((TEXT_HEADER, *lines, "")).encode()
+
+
+class MockFdsnClient:
+    """FDSN client answering queries with queued bodies.
+
+    The last body answers every further query. An exception body is raised.
+    """
+
+    def __init__(self, *bodies: bytes | Exception) -> None:
+        """Initialize the client."""
+        self.bodies = list(bodies)
+        self.queries: list[dict] = []
+        self.streamed = 0
+
+    def _next(self, params: dict) -> bytes:
+        """Record a query and return its body."""
+        self.queries.append(params)
+        body = self.bodies.pop(0) if len(self.bodies) > 1 else self.bodies[0]
+        if isinstance(body, Exception):
+            raise body
+        return body
+
+    async def query(self, **params) -> bytes:
+        """Return the next body."""
+        return self._next(params)
+
+    async def stream(self, **params):
+        """Yield the next body in small chunks."""
+        self.streamed += 1
+        data = self._next(params)
+        for offset in range(0, len(data), 64):
+            yield data[offset : offset + 64]
+
+
+async def async_setup_feed(
+    hass: HomeAssistant, client: MockFdsnClient, **options
+) -> tuple[MockConfigEntry, IngvDataUpdateCoordinator]:
+    """Set up an entry at home fetching from client, without refreshing it."""
+    async_get_hub(hass)._client = client
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        version=3,
+        unique_id="home",
+        title="home",
+        data={CONF_LATITUDE: HOME[0], CONF_LONGITUDE: HOME[1], CONF_LOCATION: "home"},
+        options={CONF_RADIUS: 100.0, CONF_FEED_FORMAT: FEED_FORMAT_TEXT, **options},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return entry, hass.data[DOMAIN][FEED][entry.entry_id]
+
+
+async def async_refresh(
+    hass: HomeAssistant, coordinator: IngvDataUpdateCoordinator
+) -> None:
+    """Refresh a coordinator with a new fetch and wait for its entities."""
+    async_get_hub(hass)._fetched_at = None
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
@@ -0,0 +1,166 @@
+"""Tests for the local event catalog."""
+
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.ingv_centro_nazionale_terremoti.catalog import IngvCatalog
+from custom_components.ingv_centro_nazionale_terremoti.const import (
+    DOMAIN,
+    SERVICE_QUERY_EVENTS,
+)
+from custom_components.ingv_centro_nazionale_terremoti.parser import IngvEvent
+from custom_components.ingv_centro_nazionale_terremoti.spatial import haversine_km
+
+from .common import (
+    HOME,
+    MockFdsnClient,
+    async_refresh,
+    async_setup_feed,
+    text_body,
+    text_line,
+)
+
+NOW = datetime(2024, 1, 10, tzinfo=timezone.utc)
+
+
+def make_event(
+    event_id: str,
+    age: timedelta,
+    latitude: float | None = HOME[0],
+    longitude: float | None = HOME[1],
+    magnitude: float = 2.0,
+) -> IngvEvent:
+    """Return an event that happened age before NOW."""
+    return IngvEvent(event_id, latitude, longitude, 10.0, magnitude, NOW - age)
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    """Return an empty catalog."""
+    catalog = IngvCatalog(str(tmp_path / "catalog.db"))
+    yield catalog
+    catalog.close()
+
+
+def test_write_keeps_distinct_revisions(catalog: IngvCatalog) -> None:
+    """Test that only new and revised events add revisions."""
+    first = make_event("1", timedelta(hours=1))
+    second = make_event("2", timedelta(hours=2))
+    assert catalog.write([first, second], NOW) == 2
+    assert catalog.write([first, second], NOW + timedelta(minutes=5)) == 0
+
+    revised = make_event("2", timedelta(hours=2), magnitude=2.5)
+    assert catalog.write([first, revised], NOW + timedelta(minutes=10)) == 1
+    assert [event.magnitude for event in catalog.query()] == [2.0, 2.5]
+    with catalog._lock:
+        revisions = catalog._connect().execute(
+            "SELECT magnitude FROM revisions WHERE event_id = '2' ORDER BY received"
+        )
+        assert [row[0] for row in revisions] == [2.0, 2.5]
+
+
+def test_query_filters(catalog: IngvCatalog) -> None:
+    """Test the time and magnitude filters, newest first."""
+    catalog.write(
+        [
+            make_event("old", timedelta(days=3), magnitude=4.0),
+            make_event("small", timedelta(hours=1), magnitude=1.0),
+            make_event("new", timedelta(minutes=1), magnitude=3.0),
+            make_event("nowhere", timedelta(minutes=2), None, None, magnitude=3.0),
+        ],
+        NOW,
+    )
+
+    def ids(**criteria) -> list[str]:
+        return [event.event_id for event in catalog.query(**criteria)]
+
+    assert ids() == ["new", "nowhere", "small", "old"]
+    assert ids(start=NOW - timedelta(days=1)) == ["new", "nowhere", "small"]
+    assert ids(end=NOW - timedelta(days=1)) == ["old"]
+    assert ids(minimum_magnitude=2.0, maximum_magnitude=3.5) == ["new", "nowhere"]
+    # Events without a location never match a radius.
+    assert ids(latitude=HOME[0], longitude=HOME[1], radius=10.0) == [
+        "new",
+        "small",
+        "old",
+    ]
+
+
+@pytest.mark.parametrize("radius", [30.0, 150.0, 1_000.0, 30_000.0])
+def test_query_radius_and_limit(catalog: IngvCatalog, radius: float) -> None:
+    """Test radius queries against a brute force scan, with limit and count."""
+    rnd = random.Random(radius)
+    events = [
+        make_event(
+            str(index),
+            timedelta(minutes=index),
+            rnd.uniform(35.0, 48.0),
+            rnd.uniform(5.0, 20.0),
+        )
+        for index in range(500)
+    ]
+    catalog.write(events, NOW)
+    expected = [
+        event.event_id
+        for event in events
+        if haversine_km(*HOME, event.latitude, event.longitude) <= radius
+    ]
+    criteria = {"latitude": HOME[0], "longitude": HOME[1], "radius": radius}
+
+    matches = catalog.query(**criteria)
+    assert [event.event_id for event in matches] == expected
+    for event in matches:
+        assert event.distance == pytest.approx(
+            haversine_km(*HOME, event.latitude, event.longitude)
+        )
+    assert catalog.count(**criteria) == len(expected)
+    assert [
+        event.event_id for event in catalog.query(**criteria, limit=5)
+    ] == expected[:5]
+
+
+def test_compact(catalog: IngvCatalog) -> None:
+    """Test that compacting purges old events and their revisions."""
+    catalog.write(
+        [make_event("old", timedelta(days=31)), make_event("new", timedelta(days=1))],
+        NOW,
+    )
+    assert catalog.compact(NOW - timedelta(days=30)) == 1
+    assert [event.event_id for event in catalog.query()] == ["new"]
+    with catalog._lock:
+        revisions = catalog._connect().execute("SELECT event_id FROM revisions")
+        assert [row[0] for row in revisions] == ["new"]
+    assert catalog.compact(NOW - timedelta(days=30)) == 0
+
+
+async def test_query_events_service(hass: HomeAssistant, tmp_path) -> None:
+    """Test that the service returns the total count and limited events."""
+    hass.config.config_dir = str(tmp_path)
+    now = dt_util.utcnow()
+    client = MockFdsnClient(
+        text_body(
+            *(
+                text_line(str(index), now - timedelta(minutes=index))
+                for index in range(1, 6)
+            ),
+            text_line("9", now - timedelta(minutes=9), latitude=HOME[0] + 2.0),
+        )
+    )
+    entry, coordinator = await async_setup_feed(hass, client)
+    await async_refresh(hass, coordinator)
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_QUERY_EVENTS,
+        {"latitude": HOME[0], "longitude": HOME[1], "radius": 50.0, "limit": 2},
+        blocking=True,
+        return_response=True,
+    )
+    assert response["count"] == 5
+    assert [event["event_id"] for event in response["events"]] == ["1", "2"]
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
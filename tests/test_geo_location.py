@@ -0,0 +1,127 @@
+"""Tests for the INGV Earthquakes geolocation entities."""
+
+from unittest.mock import patch
+
+import pytest
+from homeassistant.const import EVENT_STATE_CHANGED, STATE_UNAVAILABLE
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.ingv_centro_nazionale_terremoti.const import (
+    CONF_MAX_ENTITIES,
+    CONF_MINIMUM_MAGNITUDE,
+)
+from custom_components.ingv_centro_nazionale_terremoti.hub import IngvFeedHub
+
+from .common import (
+    MockFdsnClient,
+    async_refresh,
+    async_setup_feed,
+    text_body,
+    text_line,
+)
+
+
+async def test_availability_follows_refreshes(hass: HomeAssistant) -> None:
+    """Test that entities are only written when a refresh changes them."""
+    body = text_body(text_line("40000001"), text_line("40000002"))
+    entry, coordinator = await async_setup_feed(hass, MockFdsnClient(body))
+    await async_refresh(hass, coordinator)
+    entity_ids = hass.states.async_entity_ids("geo_location")
+    assert len(entity_ids) == 2
+
+    writes = []
+    hass.bus.async_listen(
+        EVENT_STATE_CHANGED,
+        lambda event: writes.append(event.data["entity_id"]),
+    )
+    await async_refresh(hass, coordinator)
+    assert not [entity_id for entity_id in writes if entity_id in entity_ids]
+
+    with patch.object(IngvFeedHub, "async_fetch", side_effect=RuntimeError):
+        await async_refresh(hass, coordinator)
+    assert not coordinator.last_update_success
+    for entity_id in entity_ids:
+        assert hass.states.get(entity_id).state == STATE_UNAVAILABLE
+
+    await async_refresh(hass, coordinator)
+    for entity_id in entity_ids:
+        assert hass.states.get(entity_id).state != STATE_UNAVAILABLE
+    assert coordinator.counters["availability_writes"] == 4
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+def magnitudes_body(magnitudes: dict[str, float]) -> bytes:
+    """Return events of the same place and time with the given magnitudes."""
+    time = dt_util.utcnow().replace(minute=0, second=0, microsecond=0)
+    return text_body(
+        *(
+            text_line(event_id, time, magnitude=magnitude)
+            for event_id, magnitude in magnitudes.items()
+        )
+    )
+
+
+def entity_event_ids(hass: HomeAssistant) -> list[str]:
+    """Return the sorted event ids of the geolocation entities."""
+    return sorted(
+        hass.states.get(entity_id).attributes["event_id"]
+        for entity_id in hass.states.async_entity_ids("geo_location")
+    )
+
+
+@pytest.mark.parametrize(
+    ("max_entities", "event_ids"), [(2, ["3", "4"]), (0, ["1", "2", "3", "4"])]
+)
+async def test_entity_budget(
+    hass: HomeAssistant, max_entities: int, event_ids: list[str]
+) -> None:
+    """Test that only the strongest events get an entity, 0 meaning no limit."""
+    body = magnitudes_body({"1": 1.0, "2": 2.0, "3": 3.0, "4": 4.0})
+    entry, coordinator = await async_setup_feed(
+        hass,
+        MockFdsnClient(body),
+        **{CONF_MAX_ENTITIES: max_entities, CONF_MINIMUM_MAGNITUDE: 0.0},
+    )
+
+    assert len(coordinator.data) == 4
+    assert entity_event_ids(hass) == event_ids
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_demoted_events_are_promoted_back(hass: HomeAssistant) -> None:
+    """Test that demoted events get their entity back once they rank high enough."""
+    client = MockFdsnClient(
+        magnitudes_body({"1": 3.0, "2": 2.0, "3": 1.0}),
+        # Event "3" is revised above the active events and takes an entity.
+        magnitudes_body({"3": 3.5}),
+        # Slightly outranking an active event is not enough to take its entity.
+        magnitudes_body({"2": 3.2}),
+        # Event "3" is revised down, event "2" is promoted back.
+        magnitudes_body({"3": 1.0}),
+    )
+    entry, coordinator = await async_setup_feed(
+        hass, client, **{CONF_MAX_ENTITIES: 2, CONF_MINIMUM_MAGNITUDE: 0.0}
+    )
+    assert entity_event_ids(hass) == ["1", "2"]
+
+    await async_refresh(hass, coordinator)
+    assert entity_event_ids(hass) == ["1", "3"]
+
+    await async_refresh(hass, coordinator)
+    assert entity_event_ids(hass) == ["1", "3"]
+
+    await async_refresh(hass, coordinator)
+    assert entity_event_ids(hass) == ["1", "2"]
+    assert hass.states.get(
+        next(
+            entity_id
+            for entity_id in hass.states.async_entity_ids("geo_location")
+            if hass.states.get(entity_id).attributes["event_id"] == "2"
+        )
+    ).attributes["magnitude"] == 3.2
+    assert len(coordinator.data) == 3
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
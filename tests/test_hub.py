@@ -0,0 +1,180 @@
+"""Tests for the shared feed hub."""
+
+from datetime import timedelta
+from http import HTTPStatus
+from unittest.mock import Mock, patch
+
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.ingv_centro_nazionale_terremoti.const import (
+    FEED_FORMAT_QUAKEML,
+    FEED_FORMAT_TEXT,
+    FULL_RESYNC_INTERVAL,
+    UPDATE_ERROR,
+    UPDATE_OK,
+    WATERMARK_OVERLAP,
+)
+from custom_components.ingv_centro_nazionale_terremoti.fdsn import (
+    FdsnError,
+    format_time,
+)
+from custom_components.ingv_centro_nazionale_terremoti.hub import (
+    FeedFilter,
+    IngvFeedHub,
+)
+from custom_components.ingv_centro_nazionale_terremoti.parser import (
+    PARSERS,
+    parse_text,
+)
+
+from .common import HOME, MockFdsnClient, text_body, text_line
+
+QUAKEML = b"""<?xml version="1.0" encoding="UTF-8"?>
+<q:quakeml xmlns="http://quakeml.org/xmlns/bed/1.2" xmlns:q="http://quakeml.org/xmlns/quakeml/1.2">
+<eventParameters publicID="smi:webservices.ingv.it/fdsnws/event/1/query">
+<event publicID="smi:webservices.ingv.it/fdsnws/event/1/query?eventId=40000001">
+<type>earthquake</type>
+<description><type>region name</type><text>3 km E Norcia (PG)</text></description>
+<preferredOriginID>smi:o/40000001</preferredOriginID>
+<preferredMagnitudeID>smi:m/40000001</preferredMagnitudeID>
+<origin publicID="smi:o/40000001">
+<time><value>2024-01-01T12:00:00.000000</value></time>
+<latitude><value>42.79</value></latitude>
+<longitude><value>13.13</value></longitude>
+<depth><value>9000</value></depth>
+<evaluationMode>automatic</evaluationMode>
+<evaluationStatus>preliminary</evaluationStatus>
+</origin>
+<magnitude publicID="smi:m/40000001">
+<mag><value>3.1</value></mag>
+</magnitude>
+</event>
+</eventParameters>
+</q:quakeml>
+"""
+
+TEXT = text_body(text_line("40000001"))
+
+
+async def test_unchanged_quakeml_is_dropped(hass: HomeAssistant) -> None:
+    """Test that the events of an unchanged QuakeML body are dropped."""
+    hub = IngvFeedHub(hass)
+    hub._client = MockFdsnClient(QUAKEML, QUAKEML)
+
+    events, fingerprint = await hub._async_fetch_events(
+        None, format=FEED_FORMAT_QUAKEML
+    )
+    unchanged, same = await hub._async_fetch_events(
+        fingerprint, format=FEED_FORMAT_QUAKEML
+    )
+
+    assert [event.event_id for event in events] == ["40000001"]
+    assert unchanged is None
+    assert same == fingerprint
+    # Both bodies were parsed as they streamed in, never buffered whole.
+    assert hub._client.streamed == 2
+    assert hub.counters["parses"] == 2
+
+
+async def test_unchanged_text_is_not_parsed(hass: HomeAssistant) -> None:
+    """Test that a text body identical to the previous one is not parsed."""
+    hub = IngvFeedHub(hass)
+    hub._client = MockFdsnClient(TEXT, TEXT)
+    parser = Mock(wraps=parse_text)
+
+    with patch.dict(PARSERS, {FEED_FORMAT_TEXT: parser}):
+        events, fingerprint = await hub._async_fetch_events(
+            None, format=FEED_FORMAT_TEXT
+        )
+        unchanged, same = await hub._async_fetch_events(
+            fingerprint, format=FEED_FORMAT_TEXT
+        )
+
+    assert [event.event_id for event in events] == ["40000001"]
+    assert unchanged is None
+    assert same == fingerprint
+    assert parser.call_count == 1
+    assert hub.counters["parses"] == 1
+
+
+FEED_FILTER = FeedFilter(
+    latitude=HOME[0],
+    longitude=HOME[1],
+    radius=100.0,
+    minimum_magnitude=0.0,
+    starttime_delta=timedelta(hours=2),
+)
+
+
+async def test_incremental_merge_and_resync(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test merging incremental fetches, full resyncs and expiry."""
+    start = dt_util.utcnow()
+    first = text_line("1", start - timedelta(minutes=110))
+    second = text_line("2", start - timedelta(minutes=30), magnitude=2.0)
+    revised = text_line("2", start - timedelta(minutes=30), magnitude=2.4)
+    third = text_line("3", start - timedelta(minutes=1))
+    hub = IngvFeedHub(hass)
+    hub._client = client = MockFdsnClient(
+        text_body(first, second),
+        text_body(revised, third),
+        text_body(),
+        text_body(revised, third),
+    )
+    hub.async_register("entry", FEED_FILTER, FEED_FORMAT_TEXT)
+
+    status, events = await hub.async_fetch(0)
+    assert status == UPDATE_OK
+    assert {event.event_id for event in events} == {"1", "2"}
+    assert "updatedafter" not in client.queries[-1]
+    generation = hub.generation
+
+    # Only events updated since the last fetch, minus the overlap, are asked
+    # for, and merged into the store.
+    freezer.tick(timedelta(minutes=5))
+    _, events = await hub.async_fetch(0)
+    assert client.queries[-1]["updatedafter"] == format_time(
+        start - WATERMARK_OVERLAP
+    )
+    assert {event.event_id: event.magnitude for event in events} == {
+        "1": 3.1,
+        "2": 2.4,
+        "3": 3.1,
+    }
+    assert hub.generation > generation
+
+    # An event leaves the start time window without any fetch mentioning it.
+    freezer.tick(timedelta(minutes=10))
+    generation = hub.generation
+    _, events = await hub.async_fetch(0)
+    assert client.queries[-1]["updatedafter"] == format_time(
+        start + timedelta(minutes=5) - WATERMARK_OVERLAP
+    )
+    assert {event.event_id for event in events} == {"2", "3"}
+    assert hub.generation > generation
+
+    # The hourly full resync drops the events the service no longer returns.
+    hub._client = MockFdsnClient(text_body(third))
+    freezer.tick(FULL_RESYNC_INTERVAL)
+    _, events = await hub.async_fetch(0)
+    assert "updatedafter" not in hub._client.queries[-1]
+    assert [event.event_id for event in events] == ["3"]
+    assert [event.event_id for event in hub.async_events_near(*HOME, 10)] == ["3"]
+
+
+async def test_incremental_queries_rejected(hass: HomeAssistant) -> None:
+    """Test falling back to full fetches when updatedafter is rejected."""
+    hub = IngvFeedHub(hass)
+    hub._client = MockFdsnClient(
+        text_body(text_line("1")),
+        FdsnError("Bad request", HTTPStatus.BAD_REQUEST),
+        text_body(text_line("1")),
+    )
+    hub.async_register("entry", FEED_FILTER, FEED_FORMAT_TEXT)
+
+    assert (await hub.async_fetch(0))[0] == UPDATE_OK
+    assert (await hub.async_fetch(0))[0] == UPDATE_ERROR
+    assert not hub._incremental
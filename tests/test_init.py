@@ -0,0 +1,110 @@
+"""Tests for the setup and options of INGV Earthquakes entries."""
+
+from homeassistant.const import (
+    CONF_LATITUDE,
+    CONF_LOCATION,
+    CONF_LONGITUDE,
+    CONF_RADIUS,
+)
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.ingv_centro_nazionale_terremoti.const import DOMAIN, FEED
+
+from .common import (
+    HOME,
+    MockFdsnClient,
+    async_refresh,
+    async_setup_feed,
+    text_body,
+    text_line,
+)
+
+
+async def test_options_changed_before_first_refresh(hass: HomeAssistant) -> None:
+    """Test that changing options before the first refresh keeps the entities."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        version=3,
+        unique_id="home",
+        title="home",
+        data={CONF_LATITUDE: 42.79, CONF_LONGITUDE: 13.13, CONF_LOCATION: "home"},
+        options={CONF_RADIUS: 100.0},
+    )
+    entry.add_to_hass(hass)
+    entity_registry = er.async_get(hass)
+    geolocation = entity_registry.async_get_or_create(
+        "geo_location", DOMAIN, "home_40000001", config_entry=entry
+    )
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][FEED][entry.entry_id]
+
+    hass.config_entries.async_update_entry(entry, options={CONF_RADIUS: 50.0})
+    await hass.async_block_till_done()
+
+    # No refresh ran yet, so the entry is reloaded instead of pruning its
+    # entities against the events restored at setup.
+    assert hass.data[DOMAIN][FEED][entry.entry_id] is not coordinator
+    assert entity_registry.async_get(geolocation.entity_id) is not None
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_tightened_options_filter_cached_events(hass: HomeAssistant) -> None:
+    """Test that tightened options only remove the entities that left."""
+    client = MockFdsnClient(
+        text_body(text_line("1"), text_line("2", latitude=HOME[0] + 0.45))
+    )
+    entry, coordinator = await async_setup_feed(hass, client)
+    await async_refresh(hass, coordinator)
+    assert len(hass.states.async_entity_ids("geo_location")) == 2
+    assert len(coordinator.statistics) == 2
+    queries = len(client.queries)
+
+    hass.config_entries.async_update_entry(
+        entry, options={**entry.options, CONF_RADIUS: 20.0}
+    )
+    await hass.async_block_till_done()
+
+    assert hass.data[DOMAIN][FEED][entry.entry_id] is coordinator
+    assert len(client.queries) == queries
+    assert len(coordinator.statistics) == 1
+    assert [
+        hass.states.get(entity_id).attributes["event_id"]
+        for entity_id in hass.states.async_entity_ids("geo_location")
+    ] == ["1"]
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_widened_options_fetch_the_widened_part(hass: HomeAssistant) -> None:
+    """Test that widened options only fetch the widened ring and merge it."""
+    far = text_line("3", latitude=HOME[0] + 1.35)
+    client = MockFdsnClient(
+        text_body(text_line("1"), text_line("2", latitude=HOME[0] + 0.45)),
+        text_body(far),
+        text_body(),
+    )
+    entry, coordinator = await async_setup_feed(hass, client)
+    await async_refresh(hass, coordinator)
+    queries = len(client.queries)
+
+    hass.config_entries.async_update_entry(
+        entry, options={**entry.options, CONF_RADIUS: 200.0}
+    )
+    await hass.async_block_till_done()
+
+    assert hass.data[DOMAIN][FEED][entry.entry_id] is coordinator
+    widened, incremental = client.queries[queries:]
+    assert widened["minradiuskm"] == 100.0
+    assert widened["maxradiuskm"] == 200.0
+    assert "updatedafter" not in widened
+    assert "updatedafter" in incremental
+    assert sorted(
+        hass.states.get(entity_id).attributes["event_id"]
+        for entity_id in hass.states.async_entity_ids("geo_location")
+    ) == ["1", "2", "3"]
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
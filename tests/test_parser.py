@@ -0,0 +1,159 @@
+"""Tests for the INGV feed parsers."""
+
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+from custom_components.ingv_centro_nazionale_terremoti.parser import (
+    IngvEvent,
+    QuakeMLStreamParser,
+    extract_event_id,
+    extract_region,
+    parse_geojson,
+    parse_quakeml,
+    parse_text,
+    parse_time,
+)
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def load_fixture(name: str) -> bytes:
+    """Return the content of a fixture file."""
+    return (FIXTURES / name).read_bytes()
+
+
+def test_parse_quakeml() -> None:
+    """Test parsing a QuakeML document."""
+    first, second = parse_quakeml(load_fixture("quakeml.xml"))
+
+    assert first.event_id == "37305891"
+    # The preferred origin wins over the first one.
+    assert (first.latitude, first.longitude) == (42.7926, 13.1293)
+    assert first.depth == pytest.approx(9.3)
+    assert first.magnitude == 3.4
+    assert first.time == datetime(2024, 1, 1, 12, 0, 0, 430000, timezone.utc)
+    assert (first.status, first.mode) == ("reviewed", "manual")
+    assert first.region == "3 km E Norcia (PG)"
+    assert first.updated == datetime(2024, 1, 1, 12, 30, tzinfo=timezone.utc)
+
+    # An event id without a query is taken from the end of the public id.
+    assert second.event_id == "37305892"
+    assert second.depth is None
+    assert second.magnitude is None
+    assert second.time == datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+    assert second.region == "Costa Calabra sud-orientale (Reggio di Calabria)"
+    assert second.updated is None
+
+
+def test_parse_quakeml_in_chunks() -> None:
+    """Test that the document parses the same whatever its chunking."""
+    data = load_fixture("quakeml.xml")
+    parser = QuakeMLStreamParser()
+    events = []
+    for offset in range(0, len(data), 7):
+        events.extend(parser.feed(data[offset : offset + 7]))
+    events.extend(parser.close())
+    assert [event.as_list() for event in events] == [
+        event.as_list() for event in parse_quakeml(data)
+    ]
+    assert parse_quakeml(b"") == []
+
+
+def test_parse_text() -> None:
+    """Test parsing an FDSN text document."""
+    first, second = parse_text(load_fixture("text.txt"))
+
+    assert first.event_id == "37305891"
+    assert (first.latitude, first.longitude) == (42.7926, 13.1293)
+    assert first.depth == 9.3
+    assert first.magnitude == 3.4
+    assert first.time == datetime(2024, 1, 1, 12, 0, 0, 430000, timezone.utc)
+    assert first.region == "3 km E Norcia (PG)"
+    assert (first.status, first.mode, first.updated) == (None, None, None)
+
+    assert second.event_id == "37305892"
+    assert second.depth is None
+    assert second.magnitude is None
+    assert second.time == datetime(2024, 1, 1, 13, 0, tzinfo=timezone.utc)
+
+
+def test_parse_geojson() -> None:
+    """Test parsing a GeoJSON document."""
+    first, second = parse_geojson(load_fixture("geojson.json"))
+
+    assert first.event_id == "37305891"
+    assert (first.latitude, first.longitude) == (42.7926, 13.1293)
+    assert first.depth == 9.3
+    assert first.magnitude == 3.4
+    assert first.time == datetime(2024, 1, 1, 12, 0, 0, 430000, timezone.utc)
+    assert first.region == "3 km E Norcia (PG)"
+
+    # Without an eventId property, the feature id is used.
+    assert second.event_id == "37305892"
+    assert (second.latitude, second.longitude) == (37.95, 16.21)
+    assert second.depth is None
+    assert second.magnitude is None
+    assert second.time == datetime(2024, 1, 1, 13, 0, tzinfo=timezone.utc)
+    assert parse_geojson(b"") == []
+
+
+@pytest.mark.parametrize(
+    ("public_id", "event_id"),
+    [
+        ("smi:webservices.ingv.it/fdsnws/event/1/query?eventId=37305891", "37305891"),
+        (
+            "smi:webservices.ingv.it/fdsnws/event/1/query?format=xml&eventId=1",
+            "1",
+        ),
+        ("smi:webservices.ingv.it/fdsnws/event/1/37305892", "37305892"),
+        ("smi:webservices.ingv.it/fdsnws/event/1/query?eventId=", "query?eventId="),
+        ("37305893", "37305893"),
+    ],
+)
+def test_extract_event_id(public_id: str, event_id: str) -> None:
+    """Test how QuakeML public ids map to event ids."""
+    assert extract_event_id(public_id) == event_id
+
+
+@pytest.mark.parametrize(
+    ("description", "region"),
+    [
+        ("Region name: 3 km E Norcia (PG)", "3 km E Norcia (PG)"),
+        (" 3 km E Norcia (PG) ", "3 km E Norcia (PG)"),
+        ("region name:", None),
+        (None, None),
+    ],
+)
+def test_extract_region(description: str | None, region: str | None) -> None:
+    """Test stripping the type prefix from region descriptions."""
+    assert extract_region(description) == region
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        ("2024-01-01T12:00:00", datetime(2024, 1, 1, 12, tzinfo=timezone.utc)),
+        (
+            "2024-01-01T12:00:00.123456",
+            datetime(2024, 1, 1, 12, 0, 0, 123456, timezone.utc),
+        ),
+        ("2024-01-01T12:00:00Z", datetime(2024, 1, 1, 12, tzinfo=timezone.utc)),
+        ("2024-01-01T14:00:00+02:00", datetime(2024, 1, 1, 12, tzinfo=timezone.utc)),
+        ("not a time", None),
+        ("", None),
+        (None, None),
+    ],
+)
+def test_parse_time(value: str | None, expected: datetime | None) -> None:
+    """Test the FDSN time formats, assumed UTC without an offset."""
+    assert parse_time(value) == expected
+
+
+def test_event_round_trip() -> None:
+    """Test that a stored event is restored unchanged."""
+    event, _ = parse_quakeml(load_fixture("quakeml.xml"))
+    restored = IngvEvent.from_list(event.as_list())
+    assert restored.as_dict() == event.as_dict()
+    assert restored.revision == event.revision
@@ -0,0 +1,136 @@
+"""Tests for the spatial index of events."""
+
+import random
+
+import pytest
+
+from custom_components.ingv_centro_nazionale_terremoti.parser import IngvEvent
+from custom_components.ingv_centro_nazionale_terremoti.spatial import (
+    SpatialIndex,
+    haversine_km,
+)
+
+
+def make_event(event_id: str, latitude: float | None, longitude: float | None):
+    """Return an event at a location."""
+    return IngvEvent(event_id, latitude, longitude, 10.0, 2.0, None)
+
+
+def brute_force(
+    events: list[IngvEvent], latitude: float, longitude: float, radius: float
+) -> list[str]:
+    """Return the sorted ids of the events within radius of a point."""
+    return sorted(
+        event.event_id
+        for event in events
+        if haversine_km(latitude, longitude, event.latitude, event.longitude)
+        <= radius
+    )
+
+
+def query_ids(
+    index: SpatialIndex, latitude: float, longitude: float, radius: float
+) -> list[str]:
+    """Return the sorted ids of the events the index finds."""
+    return sorted(
+        event.event_id for _, event in index.query(latitude, longitude, radius)
+    )
+
+
+def test_cell_bucketing() -> None:
+    """Test that events are bucketed by cell, including cell edges."""
+    index = SpatialIndex(cell_degrees=1.0)
+    index.update(
+        [
+            make_event("a", 42.1, 13.1),
+            make_event("b", 42.9, 13.9),
+            make_event("c", 43.0, 13.5),
+            make_event("d", -0.5, -0.5),
+        ]
+    )
+    assert len(index) == 4
+    assert index.buckets == 3
+    assert index._cells == {
+        "a": (42, 13),
+        "b": (42, 13),
+        "c": (43, 13),
+        "d": (-1, 359),
+    }
+
+
+@pytest.mark.parametrize(
+    ("latitude", "longitude", "radius"),
+    [
+        (42.0, 13.0, 20.0),
+        (42.0, 13.0, 120.0),
+        # Centered on cell corners, so the circle spans four cells.
+        (40.0, 10.0, 60.0),
+        (38.5, 15.5, 300.0),
+        (36.0, 6.0, 500.0),
+    ],
+)
+def test_query_matches_brute_force(
+    latitude: float, longitude: float, radius: float
+) -> None:
+    """Test queries across cell boundaries against a brute force scan."""
+    rnd = random.Random(radius)
+    events = [
+        make_event(str(index), rnd.uniform(35.0, 48.0), rnd.uniform(5.0, 20.0))
+        for index in range(5_000)
+    ]
+    index = SpatialIndex(cell_degrees=0.5)
+    index.update(events)
+
+    expected = brute_force(events, latitude, longitude, radius)
+    assert expected
+    assert query_ids(index, latitude, longitude, radius) == expected
+    for distance, event in index.query(latitude, longitude, radius):
+        assert distance == haversine_km(
+            latitude, longitude, event.latitude, event.longitude
+        )
+
+
+@pytest.mark.parametrize("longitude", [179.95, -179.95, 180.0])
+def test_query_across_antimeridian(longitude: float) -> None:
+    """Test that queries wrap around ±180° longitude."""
+    events = [
+        make_event("east", -17.0, 179.9),
+        make_event("west", -17.0, -179.9),
+        make_event("far", -17.0, 170.0),
+    ]
+    # Enough far away events that the index looks cells up instead of
+    # scanning them all.
+    events += [
+        make_event(f"filler_{index}", 40.0 + index / 10, 10.0 + index / 10)
+        for index in range(200)
+    ]
+    index = SpatialIndex(cell_degrees=0.5)
+    index.update(events)
+
+    assert query_ids(index, -17.0, longitude, 50.0) == ["east", "west"]
+    assert query_ids(index, -17.0, longitude, 50.0) == brute_force(
+        events, -17.0, longitude, 50.0
+    )
+
+
+def test_removal_and_revisions() -> None:
+    """Test removing events and moving them when a revision relocates them."""
+    index = SpatialIndex(cell_degrees=1.0)
+    index.update([make_event("a", 42.5, 13.5), make_event("b", 42.6, 13.6)])
+
+    # A revision in another cell moves the event.
+    index.add(make_event("a", 44.5, 13.5))
+    assert query_ids(index, 42.5, 13.5, 50.0) == ["b"]
+    assert query_ids(index, 44.5, 13.5, 50.0) == ["a"]
+    assert index.buckets == 2
+
+    # A revision without a location leaves the index.
+    index.add(make_event("a", None, None))
+    assert len(index) == 1
+    assert index.buckets == 1
+
+    index.discard("b")
+    index.discard("b")
+    assert len(index) == 0
+    assert index.buckets == 0
+    assert index.query(42.5, 13.5, 50.0) == []
@@ -0,0 +1,146 @@
+"""Tests for the seismic statistics of an entry."""
+
+import math
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from custom_components.ingv_centro_nazionale_terremoti.parser import IngvEvent
+from custom_components.ingv_centro_nazionale_terremoti.statistics import (
+    HEAP_SLACK,
+    MAGNITUDE_BIN_NAMES,
+    EventStatistics,
+    magnitude_bin,
+    seismic_energy,
+    seismic_moment,
+)
+
+NOW = datetime(2024, 1, 10, tzinfo=timezone.utc)
+
+
+def make_event(
+    event_id: str,
+    magnitude: float | None,
+    distance: float | None = 10.0,
+    age: timedelta = timedelta(hours=1),
+) -> IngvEvent:
+    """Return an event that happened age before NOW, at a distance."""
+    event = IngvEvent(event_id, 42.0, 13.0, 10.0, magnitude, NOW - age)
+    return event if distance is None else event.localize(distance)
+
+
+@pytest.mark.parametrize(
+    ("magnitude", "name"),
+    [
+        (-0.5, "below_2"),
+        (1.99, "below_2"),
+        (2.0, "2_to_3"),
+        (4.5, "4_to_5"),
+        (5.0, "5_and_above"),
+        (7.1, "5_and_above"),
+    ],
+)
+def test_magnitude_bin(magnitude: float, name: str) -> None:
+    """Test that bins include their lower edge."""
+    assert MAGNITUDE_BIN_NAMES[magnitude_bin(magnitude)] == name
+
+
+def test_add_revise_and_remove() -> None:
+    """Test the aggregates as events are added, revised and removed."""
+    statistics = EventStatistics()
+    statistics.add(make_event("1", 2.5))
+    statistics.add(make_event("2", 4.2, distance=50.0))
+    # Events without a magnitude are only counted in the rolling windows.
+    statistics.add(make_event("3", None))
+    assert len(statistics) == 2
+    assert statistics.bins == [0, 1, 0, 1, 0]
+    assert statistics.energy == pytest.approx(
+        seismic_energy(2.5) + seismic_energy(4.2)
+    )
+    assert statistics.moment == pytest.approx(
+        seismic_moment(2.5) + seismic_moment(4.2)
+    )
+    assert statistics.largest.event_id == "2"
+    assert statistics.nearest.event_id == "1"
+    assert statistics.count_since(NOW - timedelta(days=1)) == 3
+
+    # A revision replaces the contribution of the event.
+    statistics.add(make_event("1", 5.1, distance=80.0))
+    assert statistics.bins == [0, 0, 0, 1, 1]
+    assert statistics.energy == pytest.approx(
+        seismic_energy(5.1) + seismic_energy(4.2)
+    )
+    assert statistics.largest.event_id == "1"
+    assert statistics.nearest.event_id == "2"
+    assert statistics.count_since(NOW - timedelta(days=1)) == 3
+
+    statistics.remove("1", expired=False)
+    statistics.remove("2", expired=False)
+    assert statistics.bins == [0] * len(MAGNITUDE_BIN_NAMES)
+    # Removing the last event starts over from exact zeros.
+    assert (statistics.energy, statistics.moment) == (0.0, 0.0)
+    assert statistics.largest is None
+    assert statistics.nearest is None
+    assert statistics.count_since(NOW - timedelta(days=1)) == 1
+
+
+def test_stale_heap_entries() -> None:
+    """Test that stale heap entries are skipped and eventually rebuilt."""
+    statistics = EventStatistics()
+    statistics.add(make_event("1", 3.0))
+    statistics.add(make_event("2", 4.0, distance=5.0))
+    statistics.add(make_event("2", 2.0, distance=90.0))
+    # The entries of the first record of "2" are stale.
+    assert statistics.largest.event_id == "1"
+    assert statistics.nearest.event_id == "1"
+
+    for revision in range(100):
+        statistics.add(make_event("1", 3.0 + revision / 100))
+    assert len(statistics._largest) <= HEAP_SLACK * len(statistics) + 16
+    assert statistics.largest.magnitude == 3.99
+    # The rebuild also drops the rounding drift of the sums.
+    assert statistics.energy == math.fsum(
+        (seismic_energy(3.99), seismic_energy(2.0))
+    )
+
+
+def test_rolling_windows() -> None:
+    """Test that expired events stay counted until they leave the window."""
+    statistics = EventStatistics()
+    statistics.add(make_event("1", 2.0, age=timedelta(days=2)))
+    statistics.add(make_event("2", 2.0, age=timedelta(hours=2)))
+    statistics.add(make_event("3", 2.0, age=timedelta(minutes=5)))
+    assert statistics.count_since(NOW - timedelta(hours=1)) == 1
+    assert statistics.count_since(NOW - timedelta(days=7)) == 3
+
+    # Event "1" left the entry's start time, event "3" was deleted.
+    statistics.remove("1", expired=True)
+    statistics.remove("3", expired=False)
+    assert len(statistics) == 1
+    assert statistics.count_since(NOW - timedelta(days=7)) == 2
+    assert statistics.count_since(NOW - timedelta(hours=1)) == 0
+
+    statistics.expire(NOW - timedelta(days=1))
+    assert statistics.count_since(NOW - timedelta(days=7)) == 1
+    assert statistics._timed.keys() == {"2"}
+
+
+def test_seed() -> None:
+    """Test that seeded events are counted in the rolling windows only."""
+    statistics = EventStatistics()
+    statistics.seed(
+        [
+            make_event("1", 4.0, age=timedelta(days=3)),
+            make_event("2", 3.0, age=timedelta(days=5)),
+            IngvEvent("3", 42.0, 13.0, 10.0, 3.0, None),
+        ]
+    )
+    assert len(statistics) == 0
+    assert statistics.largest is None
+    assert statistics.count_since(NOW - timedelta(days=4)) == 1
+    assert statistics.count_since(NOW - timedelta(days=7)) == 2
+
+    # An event that enters the entry is not counted twice.
+    statistics.add(make_event("1", 4.0, age=timedelta(days=3)))
+    assert statistics.count_since(NOW - timedelta(days=7)) == 2
+    assert statistics.largest.event_id == "1"
@@ -0,0 +1,143 @@
+"""Tests for the vectorized filter engine of the feed hub."""
+
+import random
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.const import CONF_RADIUS
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.ingv_centro_nazionale_terremoti.const import (
+    CONF_MAX_ENTITIES,
+    CONF_MINIMUM_MAGNITUDE,
+    CONF_START_TIME,
+    VECTORIZE_MIN_EVENTS,
+)
+from custom_components.ingv_centro_nazionale_terremoti.hub import async_get_hub
+from custom_components.ingv_centro_nazionale_terremoti.spatial import haversine_km
+
+from .common import (
+    HOME,
+    MockFdsnClient,
+    async_refresh,
+    async_setup_feed,
+    text_body,
+    text_line,
+)
+
+EVENTS = 4 * VECTORIZE_MIN_EVENTS
+
+FILTERS = pytest.mark.parametrize(
+    ("radius", "minimum_magnitude", "start_time"),
+    [(50.0, 0.0, 48), (150.0, 2.0, 24), (400.0, 3.0, 6)],
+)
+
+
+def random_body(start_time: int) -> bytes:
+    """Return random events around home, half of them within start_time hours."""
+    rnd = random.Random(EVENTS)
+    now = dt_util.utcnow()
+    return text_body(
+        *(
+            text_line(
+                str(index),
+                now - timedelta(hours=rnd.uniform(0, 2 * start_time)),
+                latitude=round(rnd.uniform(39.0, 46.5), 4),
+                longitude=round(rnd.uniform(9.0, 17.0), 4),
+                magnitude=round(rnd.uniform(0.5, 4.5), 1),
+            )
+            for index in range(EVENTS)
+        )
+    )
+
+
+def expected_event_ids(
+    hass: HomeAssistant, radius: float, minimum_magnitude: float, start_time: int
+) -> list[str]:
+    """Return the sorted ids of the stored events matching a filter."""
+    starttime = dt_util.utcnow() - timedelta(hours=start_time)
+    return sorted(
+        event.event_id
+        for event in async_get_hub(hass).events
+        if event.time >= starttime
+        and event.magnitude >= minimum_magnitude
+        and haversine_km(*HOME, event.latitude, event.longitude) <= radius
+    )
+
+
+@FILTERS
+async def test_vectorized_matches_scalar(
+    hass: HomeAssistant,
+    freezer: FrozenDateTimeFactory,
+    radius: float,
+    minimum_magnitude: float,
+    start_time: int,
+) -> None:
+    """Test that both filter paths select the same events at the same distance."""
+    pytest.importorskip("numpy")
+    entry, coordinator = await async_setup_feed(
+        hass,
+        MockFdsnClient(random_body(start_time)),
+        **{
+            CONF_RADIUS: radius,
+            CONF_MINIMUM_MAGNITUDE: minimum_magnitude,
+            CONF_START_TIME: start_time,
+            CONF_MAX_ENTITIES: 5,
+        },
+    )
+    await async_refresh(hass, coordinator)
+    hub = async_get_hub(hass)
+    # Some stored events leave the start time window.
+    freezer.tick(timedelta(hours=start_time / 4))
+    starttime = dt_util.utcnow() - timedelta(hours=start_time)
+    assert hub.async_match_events(entry.entry_id, starttime) is not None
+
+    vectorized, _ = coordinator._filter_events(hub.events)
+    # Filter from scratch, without reusing the records filtered above.
+    with patch.object(hub, "async_match_events", return_value=None), patch.object(
+        coordinator, "_events", {}
+    ):
+        scalar, changed = coordinator._filter_events(hub.events)
+    assert len(changed) == len(scalar)
+
+    assert sorted(vectorized) == sorted(scalar)
+    assert sorted(scalar) == expected_event_ids(
+        hass, radius, minimum_magnitude, start_time
+    )
+    for event_id, event in scalar.items():
+        assert vectorized[event_id].distance == pytest.approx(event.distance)
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+@FILTERS
+async def test_filter_without_numpy(
+    hass: HomeAssistant, radius: float, minimum_magnitude: float, start_time: int
+) -> None:
+    """Test that events are filtered one at a time without NumPy."""
+    with patch(
+        "custom_components.ingv_centro_nazionale_terremoti.hub.load_event_arrays",
+        return_value=None,
+    ):
+        entry, coordinator = await async_setup_feed(
+            hass,
+            MockFdsnClient(random_body(start_time)),
+            **{
+                CONF_RADIUS: radius,
+                CONF_MINIMUM_MAGNITUDE: minimum_magnitude,
+                CONF_START_TIME: start_time,
+                CONF_MAX_ENTITIES: 5,
+            },
+        )
+        await async_refresh(hass, coordinator)
+    hub = async_get_hub(hass)
+    assert hub.async_match_events(entry.entry_id, dt_util.utcnow()) is None
+
+    assert sorted(coordinator._events) == expected_event_ids(
+        hass, radius, minimum_magnitude, start_time
+    )
+
+    assert await hass.config_entries.async_unload(entry.entry_id)